@@ -0,0 +1,85 @@
+from adrf.viewsets import GenericViewSet
+from asgiref.sync import sync_to_async
+from django.core.exceptions import ValidationError
+from django.http import Http404
+from rest_framework import status
+from rest_framework.response import Response
+
+
+async def ais_valid(serializer) -> None:
+    # Проверка связанных объектов (PrimaryKeyRelatedField) обращается к базе синхронно
+    await sync_to_async(serializer.is_valid)(raise_exception=True)
+
+
+async def asave(serializer, **kwargs):
+    """serializer.save() для ModelSerializer без many-to-many полей через асинхронный ORM."""
+    validated_data = {**serializer.validated_data, **kwargs}
+    instance = serializer.instance
+    if instance is None:
+        instance = serializer.Meta.model(**validated_data)
+        await instance.asave(force_insert=True)
+    else:
+        for attr, value in validated_data.items():
+            setattr(instance, attr, value)
+        await instance.asave()
+    serializer.instance = instance
+    return instance
+
+
+class AsyncViewSetMixin(GenericViewSet):
+    """
+    Асинхронные list/retrieve/partial_update/destroy поверх синхронного ViewSet.
+
+    Ставится первым базовым классом: get_queryset, сериализаторы, фильтры и
+    пагинатор берутся из синхронного ViewSet, а запросы к базе выполняются через
+    асинхронный ORM. Не переопределённые действия adrf выполняет в потоке.
+    """
+
+    async def aget_object(self):
+        queryset = self.filter_queryset(self.get_queryset())
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        try:
+            obj = await queryset.aget(**{self.lookup_field: self.kwargs[lookup_url_kwarg]})
+        except queryset.model.DoesNotExist:
+            raise Http404(
+                f"No {queryset.model._meta.object_name} matches the given query."
+            ) from None
+        except (TypeError, ValueError, ValidationError):
+            raise Http404 from None
+        self.check_object_permissions(self.request, obj)
+        return obj
+
+    async def list(self, request, *args, **kwargs):
+        return await self.aconditional_response(self._alist, request, *args, **kwargs)
+
+    async def retrieve(self, request, *args, **kwargs):
+        return await self.aconditional_response(self._aretrieve, request, *args, **kwargs)
+
+    async def _alist(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        if self.paginator is None:
+            serializer = self.get_serializer([obj async for obj in queryset], many=True)
+            return Response(serializer.data)
+
+        page = await self.paginator.apaginate_queryset(queryset, request, view=self)
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
+
+    async def _aretrieve(self, request, *args, **kwargs):
+        instance = await self.aget_object()
+        return Response(self.get_serializer(instance).data)
+
+    async def partial_update(self, request, *args, **kwargs):
+        instance = await self.aget_object()
+        serializer = self.get_serializer(instance, data=request.data, partial=True)
+        await ais_valid(serializer)
+        await self.aperform_update(serializer)
+        return Response(serializer.data)
+
+    async def aperform_update(self, serializer):
+        await asave(serializer)
+
+    async def destroy(self, request, *args, **kwargs):
+        instance = await self.aget_object()
+        await instance.adelete()
+        return Response(status=status.HTTP_204_NO_CONTENT)
@@ -1,18 +1,28 @@
 from categories.models import Category
 from rest_framework import serializers
 
+from api.v1.sparse import SparseFieldsetSerializerMixin
+
+
+class CategorySerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
+    # Есть только у категорий из get_queryset; в ответе на создание не выводятся
+    task_count = serializers.IntegerField(read_only=True)
+    open_task_count = serializers.IntegerField(read_only=True)
 
-class CategorySerializer(serializers.ModelSerializer):
     class Meta:
         model = Category
         fields = [
             "id",
             "name",
             "telegram_id",
+            "task_count",
+            "open_task_count",
             "created_at",
             "updated_at",
         ]
         read_only_fields = ["id", "telegram_id", "created_at", "updated_at"]
+        # Счётчики — аннотации запроса, а не колонки модели
+        sparse_only = {"task_count": (), "open_task_count": ()}
 
 
 class CategoryListSerializer(serializers.ModelSerializer):
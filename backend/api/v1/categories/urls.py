@@ -1,8 +1,11 @@
+from django.conf import settings
 from rest_framework.routers import DefaultRouter
 
-from api.v1.categories.views import CategoryViewSet
+from api.v1.categories.views import AsyncCategoryViewSet, CategoryViewSet
 
 router = DefaultRouter()
-router.register("", CategoryViewSet, basename="category")
+router.register(
+    "", AsyncCategoryViewSet if settings.API_ASYNC_VIEWS else CategoryViewSet, basename="category"
+)
 
 urlpatterns = router.urls
@@ -1,11 +1,18 @@
 from categories.models import Category
 from rest_framework import status, viewsets
 from rest_framework.response import Response
+from tasks.stats import annotate_task_counts
 
+from api.v1.async_views import AsyncViewSetMixin, ais_valid, asave
 from api.v1.categories.serializers import CategorySerializer
+from api.v1.conditional import UserETagMixin
+from api.v1.idempotency import IdempotencyMixin
+from api.v1.sparse import SparseFieldsetViewMixin
 
 
-class CategoryViewSet(viewsets.ModelViewSet):
+class CategoryViewSet(
+    IdempotencyMixin, UserETagMixin, SparseFieldsetViewMixin, viewsets.ModelViewSet
+):
     serializer_class = CategorySerializer
 
     def get_telegram_id(self) -> int | None:
@@ -21,7 +28,9 @@ class CategoryViewSet(viewsets.ModelViewSet):
         telegram_id = self.get_telegram_id()
         if telegram_id is None:
             return Category.objects.none()
-        return Category.objects.filter(telegram_id=telegram_id)
+        return self.sparse_queryset(
+            annotate_task_counts(Category.objects.filter(telegram_id=telegram_id))
+        )
 
     def create(self, request, *args, **kwargs):
         telegram_id = self.get_telegram_id()
@@ -36,3 +45,21 @@ class CategoryViewSet(viewsets.ModelViewSet):
         serializer.save(telegram_id=telegram_id)
         headers = self.get_success_headers(serializer.data)
         return Response(serializer.data, status=status.HTTP_201_CREATED, headers=headers)
+
+
+class AsyncCategoryViewSet(AsyncViewSetMixin, CategoryViewSet):
+    """Асинхронный вариант CategoryViewSet для ASGI, включается настройкой API_ASYNC_VIEWS."""
+
+    async def create(self, request, *args, **kwargs):
+        telegram_id = self.get_telegram_id()
+        if telegram_id is None:
+            return Response(
+                {"error": "X-Telegram-ID header is required"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        serializer = self.get_serializer(data=request.data)
+        await ais_valid(serializer)
+        await asave(serializer, telegram_id=telegram_id)
+        headers = self.get_success_headers(serializer.data)
+        return Response(serializer.data, status=status.HTTP_201_CREATED, headers=headers)
@@ -0,0 +1,129 @@
+import hashlib
+import logging
+
+from asgiref.sync import sync_to_async
+from core.versioning import get_user_version
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.utils.http import parse_etags
+from rest_framework import status
+from rest_framework.response import Response
+
+from api.v1 import metrics
+
+logger = logging.getLogger(__name__)
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    etags = parse_etags(if_none_match)
+    if "*" in etags:
+        return True
+    # Для If-None-Match используется слабое сравнение (RFC 9110, 13.1.2)
+    return etag.removeprefix("W/") in {tag.removeprefix("W/") for tag in etags}
+
+
+class UserETagMixin:
+    """
+    Условный GET и кеш ответов для list/retrieve. ETag строится из токена версии данных
+    пользователя, поэтому ответ 304 отдаётся без запросов к базе и без сериализации,
+    а готовое тело ответа кешируется в Redis под тем же ETag. Запись задач или категорий
+    меняет версию (см. core.versioning), и старые записи кеша просто перестают читаться.
+    """
+
+    def get_etag(self) -> str | None:
+        telegram_id = self.get_telegram_id()
+        if telegram_id is None:
+            return None
+
+        version = get_user_version(telegram_id)
+        if version is None:
+            return None
+
+        request = self.request
+        raw = f"{version}|{request.get_full_path()}|{request.accepted_media_type}"
+        return f'"{hashlib.md5(raw.encode(), usedforsecurity=False).hexdigest()}"'
+
+    def response_cache_enabled(self) -> bool:
+        # Browsable API содержит CSRF-токен и данные сессии, его не кешируем
+        return settings.API_CACHE_ENABLED and self.request.accepted_renderer.format != "api"
+
+    def _get_cached_response(self, key: str) -> HttpResponse | None:
+        try:
+            cached = cache.get(key)
+        except Exception as e:
+            logger.warning(f"Failed to read API response cache: {e}")
+            return None
+
+        outcome = "miss" if cached is None else "hit"
+        metrics.RESPONSE_CACHE.labels(
+            resource=self.basename, action=self.action, outcome=outcome
+        ).inc()
+        if cached is None:
+            return None
+        content, content_type = cached
+        return HttpResponse(content, content_type=content_type)
+
+    @staticmethod
+    def _store_response(key: str, response) -> None:
+        if response.status_code != status.HTTP_200_OK:
+            return
+        try:
+            cache.set(key, (response.content, response["Content-Type"]), settings.API_CACHE_TTL)
+        except Exception as e:
+            logger.warning(f"Failed to write API response cache: {e}")
+
+    def _lookup_response(self, request) -> tuple[str | None, str | None, HttpResponse | None]:
+        """ETag, ключ кеша и готовый ответ (304 или из кеша), если его можно отдать сразу."""
+        etag = self.get_etag()
+        cache_key = None
+        if etag is not None and self.response_cache_enabled():
+            cache_key = f"api-response:{etag[1:-1]}"
+
+        response = None
+        if etag is not None and etag_matches(request.headers.get("If-None-Match"), etag):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        elif cache_key is not None:
+            response = self._get_cached_response(cache_key)
+        return etag, cache_key, response
+
+    def _finalize_conditional(self, response, etag: str | None, cache_key: str | None, fresh: bool):
+        if fresh and cache_key is not None:
+            response.add_post_render_callback(
+                lambda rendered: self._store_response(cache_key, rendered)
+            )
+
+        if etag is not None and response.status_code in (
+            status.HTTP_200_OK,
+            status.HTTP_304_NOT_MODIFIED,
+        ):
+            response["ETag"] = etag
+            patch_cache_control(response, private=True, no_cache=True)
+        patch_vary_headers(response, ["Accept", "X-Telegram-ID"])
+        return response
+
+    def conditional_response(self, handler, request, *args, **kwargs) -> Response:
+        etag, cache_key, response = self._lookup_response(request)
+        fresh = response is None
+        if fresh:
+            response = handler(request, *args, **kwargs)
+        return self._finalize_conditional(response, etag, cache_key, fresh)
+
+    async def aconditional_response(self, handler, request, *args, **kwargs) -> Response:
+        # Клиент кеша Django синхронный: версия, проверка ETag и чтение кеша идут одним
+        # переходом в поток. Запись в кеш выполняется при рендеринге, который Django
+        # и так запускает в потоке.
+        etag, cache_key, response = await sync_to_async(self._lookup_response)(request)
+        fresh = response is None
+        if fresh:
+            response = await handler(request, *args, **kwargs)
+        return self._finalize_conditional(response, etag, cache_key, fresh)
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional_response(super().retrieve, request, *args, **kwargs)
@@ -0,0 +1,194 @@
+import base64
+import binascii
+import hashlib
+import logging
+import re
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse, JsonResponse
+from rest_framework import status
+
+from api.v1 import metrics
+
+logger = logging.getLogger(__name__)
+
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+IDEMPOTENCY_KEY_MAX_LENGTH = 255
+IDEMPOTENT_METHODS = ("POST", "PUT", "PATCH", "DELETE")
+CONTENT_DIGEST_HEADER = "Content-Digest"
+CONTENT_DIGEST_SHA256 = re.compile(r"(?:^|,)\s*sha-256=:([A-Za-z0-9+/=]+):")
+# Запись «в работе» живёт недолго: если воркер упал посреди запроса, ключ освободится сам
+PENDING_TIMEOUT = 60
+
+PENDING = "pending"
+DONE = "done"
+
+
+def parse_content_digest(value: str) -> bytes | None:
+    """SHA-256 из заголовка Content-Digest (RFC 9530) или None, если его нет."""
+    match = CONTENT_DIGEST_SHA256.search(value)
+    if match is None:
+        return None
+    try:
+        digest = base64.b64decode(match.group(1), validate=True)
+    except binascii.Error:
+        return None
+    return digest if len(digest) == hashlib.sha256().digest_size else None
+
+
+class IdempotencyMixin:
+    """
+    Заголовок Idempotency-Key для запросов на запись.
+
+    Первый ответ на ключ хранится в кеше (Redis) API_IDEMPOTENCY_TTL секунд, повтор с тем же
+    ключом получает его без повторной записи и с заголовком Idempotent-Replayed. Повтор,
+    пришедший, пока первый запрос ещё выполняется (например, хеджированный клиентом), сразу
+    получает 409 с Retry-After, не занимая воркер ожиданием. Ключи свои у каждого
+    пользователя; тот же ключ с другим методом, путём или телом запроса даёт 422.
+    Ответы 5xx не сохраняются, такой запрос можно повторить с тем же ключом.
+
+    Тело действий из streaming_body_actions читается потоком и в память целиком не
+    загружается, поэтому с ключом они требуют заголовок Content-Digest (sha-256), и в
+    отпечаток входит он. Совпадение заголовка с телом проверяет само действие при чтении.
+    """
+
+    streaming_body_actions: tuple[str, ...] = ()
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.method not in IDEMPOTENT_METHODS or IDEMPOTENCY_HEADER not in request.headers:
+            return super().dispatch(request, *args, **kwargs)
+
+        key = request.headers[IDEMPOTENCY_HEADER]
+        telegram_id = request.headers.get("X-Telegram-ID", "")
+        if not key or len(key) > IDEMPOTENCY_KEY_MAX_LENGTH or not telegram_id.isdigit():
+            return super().dispatch(request, *args, **kwargs)
+
+        raw = f"{telegram_id}|{key}".encode()
+        cache_key = f"idempotency:{hashlib.sha256(raw).hexdigest()}"
+        action = getattr(self, "action_map", {}).get(request.method.lower())
+        if action in self.streaming_body_actions:
+            body = parse_content_digest(request.headers.get(CONTENT_DIGEST_HEADER, ""))
+            if body is None:
+                response = JsonResponse(
+                    {
+                        "error": f"{CONTENT_DIGEST_HEADER} header with sha-256 is required "
+                        f"together with {IDEMPOTENCY_HEADER} for this request"
+                    },
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+                if getattr(self, "view_is_async", False):
+                    return self._aresponse(response)
+                return response
+        else:
+            body = request.body
+        fingerprint = hashlib.sha256(
+            b"|".join([request.method.encode(), request.get_full_path().encode(), body])
+        ).hexdigest()
+
+        if getattr(self, "view_is_async", False):
+            return self._adispatch_idempotent(cache_key, fingerprint, request, *args, **kwargs)
+
+        response = self._claim_or_conflict(cache_key, fingerprint)
+        if response is not None:
+            return response
+        try:
+            response = super().dispatch(request, *args, **kwargs)
+        except Exception:
+            self._release(cache_key)
+            raise
+        return self._store_on_render(response, cache_key, fingerprint)
+
+    async def _adispatch_idempotent(self, cache_key, fingerprint, request, *args, **kwargs):
+        response = await sync_to_async(self._claim_or_conflict)(cache_key, fingerprint)
+        if response is not None:
+            return response
+        try:
+            response = await super().dispatch(request, *args, **kwargs)
+        except Exception:
+            await sync_to_async(self._release)(cache_key)
+            raise
+        return self._store_on_render(response, cache_key, fingerprint)
+
+    @staticmethod
+    async def _aresponse(response):
+        return response
+
+    def _claim(self, cache_key: str, fingerprint: str):
+        """None, если ключ захвачен этим запросом; иначе ответ или False, пока идёт первый."""
+        try:
+            if cache.add(cache_key, (PENDING, fingerprint), PENDING_TIMEOUT):
+                return None
+            entry = cache.get(cache_key)
+            # Запись истекла между add и get: пробуем захватить ключ ещё раз
+            if entry is None and cache.add(cache_key, (PENDING, fingerprint), PENDING_TIMEOUT):
+                return None
+        except Exception as e:
+            # Без кеша запрос выполняется как обычно, без защиты от повторов
+            logger.warning(f"Failed to read idempotency key: {e}")
+            return None
+
+        if entry is None:
+            return False
+        if entry[1] != fingerprint:
+            self._count("mismatch")
+            return JsonResponse(
+                {"error": f"{IDEMPOTENCY_HEADER} was already used with a different request"},
+                status=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            )
+        if entry[0] == PENDING:
+            return False
+
+        _, _, status_code, content, content_type = entry
+        self._count("replayed")
+        response = HttpResponse(content, status=status_code, content_type=content_type)
+        response["Idempotent-Replayed"] = "true"
+        return response
+
+    def _conflict(self):
+        self._count("conflict")
+        response = JsonResponse(
+            {"error": f"A request with this {IDEMPOTENCY_HEADER} is still in progress"},
+            status=status.HTTP_409_CONFLICT,
+        )
+        response["Retry-After"] = "1"
+        return response
+
+    def _claim_or_conflict(self, cache_key: str, fingerprint: str):
+        response = self._claim(cache_key, fingerprint)
+        if response is False:
+            return self._conflict()
+        return response
+
+    def _store_on_render(self, response, cache_key: str, fingerprint: str):
+        def store(rendered):
+            if rendered.status_code >= 500:
+                self._release(cache_key)
+                return
+            entry = (
+                DONE,
+                fingerprint,
+                rendered.status_code,
+                rendered.content,
+                rendered.get("Content-Type", ""),
+            )
+            try:
+                cache.set(cache_key, entry, settings.API_IDEMPOTENCY_TTL)
+            except Exception as e:
+                logger.warning(f"Failed to store idempotent response: {e}")
+                return
+            self._count("stored")
+
+        response.add_post_render_callback(store)
+        return response
+
+    @staticmethod
+    def _release(cache_key: str) -> None:
+        try:
+            cache.delete(cache_key)
+        except Exception as e:
+            logger.warning(f"Failed to release idempotency key: {e}")
+
+    def _count(self, outcome: str) -> None:
+        metrics.IDEMPOTENCY.labels(resource=self.basename, outcome=outcome).inc()
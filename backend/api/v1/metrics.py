@@ -0,0 +1,14 @@
+from prometheus_client import Counter
+
+# Отдаются сервером метрик из gunicorn.conf.py на внутреннем порту API_METRICS_PORT
+RESPONSE_CACHE = Counter(
+    "todo_api_response_cache",
+    "API response cache lookups by resource, action and outcome (hit, miss)",
+    ["resource", "action", "outcome"],
+)
+
+IDEMPOTENCY = Counter(
+    "todo_api_idempotency",
+    "Idempotency-Key handling by resource and outcome (stored, replayed, conflict, mismatch)",
+    ["resource", "outcome"],
+)
@@ -0,0 +1,70 @@
+from rest_framework import serializers
+from rest_framework.permissions import SAFE_METHODS
+
+
+def _parse_field_list(value: str | None) -> set[str] | None:
+    if value is None:
+        return None
+    return {name.strip() for name in value.split(",") if name.strip()}
+
+
+class SparseFieldsetSerializerMixin:
+    """
+    Урезает вывод сериализатора по ?fields= / ?exclude= в GET-запросах.
+
+    Meta.sparse_aliases задаёт поля, которые выводятся под другим именем
+    (например, category_detail отдаётся как category), а Meta.sparse_only —
+    колонки модели для полей, которые не берутся напрямую из одноимённого поля.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        request = self.context.get("request")
+        if request is None or request.method not in SAFE_METHODS:
+            return
+
+        requested = _parse_field_list(request.query_params.get("fields"))
+        excluded = _parse_field_list(request.query_params.get("exclude")) or set()
+        aliases = getattr(self.Meta, "sparse_aliases", {})
+
+        def expand(names: set[str]) -> set[str]:
+            return names | {aliases[name] for name in names if name in aliases}
+
+        for name in list(self.fields):
+            if (requested is not None and name not in expand(requested)) or name in expand(
+                excluded
+            ):
+                self.fields.pop(name)
+
+    def get_only_fields(self) -> tuple[set[str], set[str]]:
+        """Колонки для .only() и связи для select_related под оставшиеся поля."""
+        sparse_only = getattr(self.Meta, "sparse_only", {})
+        only: set[str] = set()
+        for name, field in self.fields.items():
+            if name in sparse_only:
+                only.update(sparse_only[name])
+            elif isinstance(field, serializers.Serializer):
+                only.update(f"{field.source}__{child.source}" for child in field.fields.values())
+            elif field.source != "*" and not isinstance(field, serializers.SerializerMethodField):
+                only.add(field.source)
+
+        related = {path.rsplit("__", 1)[0] for path in only if "__" in path}
+        return only, related
+
+
+class SparseFieldsetViewMixin:
+    """Сужает SQL под запрошенные поля: .only() и select_related только нужных связей."""
+
+    def sparse_queryset(self, queryset, select_related: tuple[str, ...] = ()):
+        if self.request.method not in SAFE_METHODS or self.action not in ("list", "retrieve"):
+            return queryset.select_related(*select_related)
+
+        only, related = self.get_serializer().get_only_fields()
+        # Поля сортировки нужны пагинатору, чтобы построить курсор следующей страницы
+        ordering = ()
+        if self.paginator is not None and hasattr(self.paginator, "get_ordering"):
+            ordering = self.paginator.get_ordering(self.request, queryset, self)
+        only.update(field.lstrip("-") for field in ordering)
+        return queryset.select_related(*(name for name in select_related if name in related)).only(
+            *only
+        )
@@ -0,0 +1,141 @@
+from categories.models import Category
+from core.versioning import bump_user_version
+from django.db import transaction
+from django.db.models import Case, Value, When
+from django.utils import timezone
+from tasks.models import Task
+from tasks.scheduler import publish_reminders
+
+from api.v1.tasks.serializers import TaskBulkCreateSerializer, TaskBulkOperationSerializer
+
+CATEGORY_NOT_OWNED = "Category does not belong to this user."
+
+# Поля, нужные для публикации напоминаний в планировщик
+REMINDER_FIELDS = (
+    "id",
+    "telegram_id",
+    "due_date",
+    "is_completed",
+    "notification_sent",
+    "notification_failed",
+    "notification_next_attempt_at",
+)
+
+
+def _error(index: int, op: str | None, errors) -> dict:
+    return {"index": index, "op": op, "status": "error", "errors": errors}
+
+
+def run_bulk_operations(telegram_id: int, operations: list) -> list[dict]:
+    """
+    Выполняет пачку операций над задачами пользователя за постоянное число запросов:
+    категории и задачи проверяются одним запросом каждые, изменения применяются
+    bulk_create и queryset.update/delete в одной транзакции. Ошибочные элементы
+    пропускаются и возвращаются в результатах со списком ошибок.
+    """
+    results: list[dict | None] = [None] * len(operations)
+    creates: list[tuple[int, dict]] = []
+    changes: dict = {}
+
+    for index, item in enumerate(operations):
+        serializer = TaskBulkOperationSerializer(data=item)
+        if not serializer.is_valid():
+            op = item.get("op") if isinstance(item, dict) else None
+            results[index] = _error(index, op, serializer.errors)
+            continue
+
+        data = serializer.validated_data
+        op = data["op"]
+        if op == "create":
+            create_serializer = TaskBulkCreateSerializer(data=item)
+            if not create_serializer.is_valid():
+                results[index] = _error(index, op, create_serializer.errors)
+                continue
+            creates.append((index, create_serializer.validated_data))
+        elif data["id"] in changes:
+            results[index] = _error(index, op, {"id": ["Task is already changed in this batch."]})
+        else:
+            changes[data["id"]] = (index, data)
+
+    category_ids = {data.get("category") for _, data in creates}
+    category_ids |= {data["category"] for _, data in changes.values() if data["op"] == "move"}
+    category_ids.discard(None)
+    owned_categories = set(
+        Category.objects.filter(telegram_id=telegram_id, id__in=category_ids).values_list(
+            "id", flat=True
+        )
+    )
+    tasks = {
+        task.id: task
+        for task in Task.objects.filter(telegram_id=telegram_id, id__in=changes).only(
+            *REMINDER_FIELDS
+        )
+    }
+
+    new_tasks = []
+    for index, data in creates:
+        category_id = data.pop("category", None)
+        if category_id is not None and category_id not in owned_categories:
+            results[index] = _error(index, "create", {"category": [CATEGORY_NOT_OWNED]})
+            continue
+        task = Task(telegram_id=telegram_id, category_id=category_id, **data)
+        new_tasks.append(task)
+        results[index] = {"index": index, "op": "create", "status": "ok", "id": str(task.id)}
+
+    ids_by_op: dict[str, list] = {op: [] for op in ("complete", "uncomplete", "delete")}
+    moves = {}
+    for task_id, (index, data) in changes.items():
+        op = data["op"]
+        if task_id not in tasks:
+            results[index] = _error(index, op, {"id": ["Task not found."]})
+            continue
+        if op == "move":
+            category_id = data["category"]
+            if category_id is not None and category_id not in owned_categories:
+                results[index] = _error(index, op, {"category": [CATEGORY_NOT_OWNED]})
+                continue
+            moves[task_id] = category_id
+        else:
+            ids_by_op[op].append(task_id)
+        results[index] = {"index": index, "op": op, "status": "ok", "id": str(task_id)}
+
+    now = timezone.now()
+    with transaction.atomic():
+        if new_tasks:
+            Task.objects.bulk_create(new_tasks)
+        if ids_by_op["complete"]:
+            Task.objects.filter(id__in=ids_by_op["complete"]).update(
+                is_completed=True, updated_at=now
+            )
+        if ids_by_op["uncomplete"]:
+            Task.objects.filter(id__in=ids_by_op["uncomplete"]).update(
+                is_completed=False, updated_at=now
+            )
+        if moves:
+            # Без явного типа значения уходят в PostgreSQL как text, а колонка — uuid
+            category_pk = Category._meta.pk
+            Task.objects.filter(id__in=moves).update(
+                category_id=Case(
+                    *(
+                        When(id=task_id, then=Value(category_id, output_field=category_pk))
+                        for task_id, category_id in moves.items()
+                    ),
+                    output_field=category_pk,
+                ),
+                updated_at=now,
+            )
+        if ids_by_op["delete"]:
+            Task.objects.filter(id__in=ids_by_op["delete"]).delete()
+
+        # bulk_create и update не шлют сигналы моделей
+        bump_user_version(telegram_id)
+
+        for task_id in ids_by_op["complete"]:
+            tasks[task_id].is_completed = True
+        for task_id in ids_by_op["uncomplete"]:
+            tasks[task_id].is_completed = False
+        changed = new_tasks + [tasks[i] for i in ids_by_op["complete"] + ids_by_op["uncomplete"]]
+        if changed:
+            transaction.on_commit(lambda: publish_reminders(changed))
+
+    return results
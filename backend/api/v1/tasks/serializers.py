@@ -1,5 +1,11 @@
+from django_ulid.serializers import ULIDField
 from rest_framework import serializers
-from tasks.models import Task
+from tasks.models import ArchivedTask, Task, TaskImportJob
+
+from api.v1.sparse import SparseFieldsetSerializerMixin
+
+BULK_OPERATIONS = ("create", "complete", "uncomplete", "move", "delete")
+BULK_MAX_OPERATIONS = 500
 
 
 class CategoryListSerializer(serializers.Serializer):
@@ -7,7 +13,7 @@ class CategoryListSerializer(serializers.Serializer):
     name = serializers.CharField()
 
 
-class TaskSerializer(serializers.ModelSerializer):
+class TaskSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     category_detail = CategoryListSerializer(source="category", read_only=True)
 
     class Meta:
@@ -32,16 +38,13 @@ class TaskSerializer(serializers.ModelSerializer):
             "created_at",
             "updated_at",
         ]
+        sparse_aliases = {"category": "category_detail"}
 
     def to_representation(self, instance):
         data = super().to_representation(instance)
-        if "category" in data:
-            del data["category"]
-        if data.get("category_detail"):
+        data.pop("category", None)
+        if "category_detail" in data:
             data["category"] = data.pop("category_detail")
-        else:
-            data["category"] = None
-            data.pop("category_detail", None)
         return data
 
 
@@ -65,7 +68,52 @@ class TaskCreateSerializer(serializers.ModelSerializer):
         return value
 
 
-class TaskListSerializer(serializers.ModelSerializer):
+class TaskBulkSerializer(serializers.Serializer):
+    operations = serializers.ListField(allow_empty=False, max_length=BULK_MAX_OPERATIONS)
+
+
+class TaskBulkOperationSerializer(serializers.Serializer):
+    op = serializers.ChoiceField(choices=BULK_OPERATIONS)
+    id = ULIDField(required=False)
+    category = ULIDField(required=False, allow_null=True)
+
+    def validate(self, attrs):
+        op = attrs["op"]
+        if op != "create" and "id" not in attrs:
+            raise serializers.ValidationError({"id": "This field is required."})
+        if op == "move" and "category" not in attrs:
+            raise serializers.ValidationError({"category": "This field is required."})
+        return attrs
+
+
+class TaskBulkCreateSerializer(TaskCreateSerializer):
+    category = ULIDField(required=False, allow_null=True)
+
+    def validate_category(self, value):
+        # Принадлежность категорий проверяется одним запросом на всю пачку
+        return value
+
+
+class TaskImportSerializer(serializers.Serializer):
+    """Строка /tasks/import/; id нужен для пропуска повторов, даты создания игнорируются."""
+
+    id = ULIDField(required=False, allow_null=True)
+    title = serializers.CharField(max_length=255)
+    description = serializers.CharField(required=False, allow_blank=True, default="")
+    category = ULIDField(required=False, allow_null=True)
+    category_name = serializers.CharField(required=False, allow_null=True, allow_blank=True)
+    due_date = serializers.DateTimeField(required=False, allow_null=True)
+    is_completed = serializers.BooleanField(required=False, default=False)
+
+
+class TaskImportJobSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = TaskImportJob
+        fields = ["id", "status", "result", "created_at", "finished_at"]
+        read_only_fields = fields
+
+
+class TaskListSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     category_name = serializers.SerializerMethodField()
 
     class Meta:
@@ -78,6 +126,20 @@ class TaskListSerializer(serializers.ModelSerializer):
             "is_completed",
             "created_at",
         ]
+        sparse_only = {"category_name": ["category__name"]}
 
     def get_category_name(self, obj):
         return obj.category.name if obj.category else None
+
+
+class ArchivedTaskSerializer(TaskSerializer):
+    class Meta(TaskSerializer.Meta):
+        model = ArchivedTask
+        fields = [*TaskSerializer.Meta.fields, "archived_at"]
+        read_only_fields = fields
+
+
+class ArchivedTaskListSerializer(TaskListSerializer):
+    class Meta(TaskListSerializer.Meta):
+        model = ArchivedTask
+        fields = [*TaskListSerializer.Meta.fields, "archived_at"]
@@ -0,0 +1,308 @@
+import csv
+import hashlib
+
+import orjson
+import ulid
+from asgiref.sync import sync_to_async
+from categories.models import Category
+from core.versioning import bump_user_version
+from django.core.files import File
+from django.db import transaction
+from django.utils import timezone
+from rest_framework import serializers
+from rest_framework.exceptions import ParseError
+from tasks.models import ArchivedTask, Task, TaskImportJob
+from tasks.scheduler import publish_reminders
+from tasks.tasks import import_tasks_job
+
+from api.v1.tasks.bulk import CATEGORY_NOT_OWNED
+from api.v1.tasks.serializers import TaskImportSerializer
+
+# Колонки экспорта: поля задачи и название категории, чтобы выгрузку можно было
+# загрузить другому пользователю, у которого те же категории имеют другие id
+EXPORT_FIELDS = (
+    "id",
+    "title",
+    "description",
+    "category",
+    "category_name",
+    "due_date",
+    "is_completed",
+    "created_at",
+    "updated_at",
+)
+EXPORT_COLUMNS = (
+    "id",
+    "title",
+    "description",
+    "category_id",
+    "category__name",
+    "due_date",
+    "is_completed",
+    "created_at",
+    "updated_at",
+)
+# Строк из курсора базы за одно обращение и строк в одном отправляемом куске ответа
+EXPORT_FETCH_SIZE = 2000
+EXPORT_CHUNK_ROWS = 500
+
+IMPORT_BATCH_SIZE = 1000
+IMPORT_MAX_LINE_BYTES = 64 * 1024
+IMPORT_MAX_ERRORS = 100
+
+
+def export_queryset(queryset):
+    # Кортежи вместо моделей и порядок по индексу (telegram_id, created_at, id)
+    return queryset.order_by("created_at", "id").values_list(*EXPORT_COLUMNS)
+
+
+class _Echo:
+    def write(self, value):
+        return value
+
+
+# Ячейки, которые Excel и LibreOffice выполняют как формулу
+CSV_FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+
+def _csv_value(value):
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    value = str(value)
+    if value.startswith(CSV_FORMULA_PREFIXES):
+        # Апостроф делает ячейку текстом, а не формулой (CSV injection)
+        return "'" + value
+    return value
+
+
+class ExportEncoder:
+    """Кодирует строки values_list в куски NDJSON или CSV (CSV начинается с заголовка)."""
+
+    def __init__(self, fmt: str):
+        self.fmt = fmt
+        self.writer = csv.writer(_Echo())
+
+    def header(self) -> bytes:
+        if self.fmt == "csv":
+            return self.writer.writerow(EXPORT_FIELDS).encode()
+        return b""
+
+    def encode(self, rows: list[tuple]) -> bytes:
+        if self.fmt == "csv":
+            return "".join(
+                self.writer.writerow([_csv_value(value) for value in row]) for row in rows
+            ).encode()
+        # Даты orjson пишет сам в ISO 8601, остаются ULID, которые отдаются строкой
+        return b"".join(
+            orjson.dumps(dict(zip(EXPORT_FIELDS, row, strict=True)), default=str) + b"\n"
+            for row in rows
+        )
+
+
+def stream_export(queryset, fmt: str):
+    """
+    Генератор кусков ответа. iterator() на PostgreSQL читает строки из серверного курсора
+    по EXPORT_FETCH_SIZE, поэтому память не зависит от числа задач пользователя.
+    """
+    encoder = ExportEncoder(fmt)
+    yield encoder.header()
+    rows = []
+    for row in export_queryset(queryset).iterator(chunk_size=EXPORT_FETCH_SIZE):
+        rows.append(row)
+        if len(rows) >= EXPORT_CHUNK_ROWS:
+            yield encoder.encode(rows)
+            rows = []
+    if rows:
+        yield encoder.encode(rows)
+
+
+async def astream_export(queryset, fmt: str):
+    """
+    stream_export для ASGI: синхронный итератор StreamingHttpResponse там сначала читается
+    целиком, поэтому куски забираются по одному в потоке, где открыт серверный курсор
+    (aiterator() для values_list выполняет первый запрос прямо в цикле событий).
+    """
+    chunks = stream_export(queryset, fmt)
+    next_chunk = sync_to_async(next, thread_sensitive=True)
+    while (chunk := await next_chunk(chunks, None)) is not None:
+        yield chunk
+
+
+def _read_lines(stream):
+    """Строки тела запроса по одной; вместо строк длиннее IMPORT_MAX_LINE_BYTES — None."""
+    while True:
+        line = stream.readline(IMPORT_MAX_LINE_BYTES + 1)
+        if not line:
+            return
+        if len(line) > IMPORT_MAX_LINE_BYTES and not line.endswith(b"\n"):
+            while line and not line.endswith(b"\n"):
+                line = stream.readline(IMPORT_MAX_LINE_BYTES + 1)
+            yield None
+            continue
+        yield line
+
+
+class _HashingReader:
+    """Обёртка потока, считающая SHA-256 прочитанного."""
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.hash = hashlib.sha256()
+
+    def read(self, size=-1):
+        data = self.stream.read(size)
+        self.hash.update(data)
+        return data
+
+
+def imported_task_id(telegram_id: int, source_id) -> ulid.ULID:
+    """
+    id задачи для строки выгрузки с id source_id: время из source_id, остальные 80 бит —
+    хеш пользователя и source_id. Повторная загрузка той же выгрузки тем же пользователем
+    даёт те же id, поэтому уже загруженные строки распознаются и пропускаются.
+    """
+    digest = hashlib.sha256(f"{telegram_id}:{source_id}".encode()).digest()
+    return ulid.from_bytes(source_id.bytes[:6] + digest[:10])
+
+
+def _save_batch(telegram_id: int, batch: dict[str, tuple[Task, str | None]]) -> int:
+    """
+    Вставляет пачку, кроме задач, которые уже есть у пользователя (в том числе в архиве):
+    строк его собственной выгрузки (по id источника) и загруженных раньше (по
+    imported_task_id). Возвращает число вставленных задач.
+    """
+    ids = [source_id for _, source_id in batch.values() if source_id is not None]
+    ids += [task_id for task_id, (_, source_id) in batch.items() if source_id is not None]
+    existing = set()
+    if ids:
+        user_ids = Task.objects.filter(telegram_id=telegram_id, id__in=ids).values_list("id")
+        archived_ids = ArchivedTask.objects.filter(telegram_id=telegram_id, id__in=ids)
+        existing = {str(pk) for (pk,) in user_ids.union(archived_ids.values_list("id"))}
+
+    tasks = [
+        task
+        for task_id, (task, source_id) in batch.items()
+        if task_id not in existing and source_id not in existing
+    ]
+    with transaction.atomic():
+        # Конфликт возможен только с параллельной загрузкой той же выгрузки
+        Task.objects.bulk_create(tasks, ignore_conflicts=True)
+        transaction.on_commit(lambda: publish_reminders(tasks))
+    return len(tasks)
+
+
+def import_tasks(telegram_id: int, stream) -> dict:
+    """
+    Загружает задачи из NDJSON-потока: строка читается, проверяется и отбрасывается,
+    а задачи вставляются bulk_create пачками по IMPORT_BATCH_SIZE, каждая в своей
+    транзакции. Категории сверяются со словарём категорий пользователя, загруженным
+    одним запросом, — по id, а если его нет среди категорий пользователя, то по названию.
+    Строки с id, которые пользователь уже загружал или которые взяты из его же выгрузки,
+    пропускаются (skipped), так что загрузку можно безопасно повторить.
+    Ошибочные строки пропускаются; в ответе первые IMPORT_MAX_ERRORS ошибок с номерами строк.
+    Задачи со сроком в прошлом загружаются с notification_sent: напоминание о них уже
+    приходило (или опоздало), и повторная загрузка выгрузки не должна присылать его снова.
+    """
+    categories = {}
+    by_name = {}
+    user_categories = Category.objects.filter(telegram_id=telegram_id).order_by("created_at")
+    for category_id, name in user_categories.values_list("id", "name"):
+        categories[str(category_id)] = category_id
+        by_name.setdefault(name, category_id)
+
+    # Один сериализатор на весь импорт: поля строятся (deepcopy) один раз, а не на строку
+    validator = TaskImportSerializer()
+    now = timezone.now()
+    created = skipped = failed = 0
+    errors = []
+    # id задачи -> (задача, id источника)
+    batch: dict[str, tuple[Task, str | None]] = {}
+
+    def fail(line_number: int, line_errors) -> None:
+        nonlocal failed
+        failed += 1
+        if len(errors) < IMPORT_MAX_ERRORS:
+            errors.append({"line": line_number, "errors": line_errors})
+
+    try:
+        for line_number, line in enumerate(_read_lines(stream), start=1):
+            if line is None:
+                fail(line_number, {"non_field_errors": ["Line is too long."]})
+                continue
+            if not line.strip():
+                continue
+            try:
+                item = orjson.loads(line)
+            except orjson.JSONDecodeError:
+                fail(line_number, {"non_field_errors": ["Invalid JSON."]})
+                continue
+
+            try:
+                data = validator.run_validation(item)
+            except serializers.ValidationError as exc:
+                fail(line_number, serializers.as_serializer_error(exc))
+                continue
+
+            category = data.pop("category", None)
+            category_name = data.pop("category_name", None)
+            category_id = None
+            if category is not None and str(category) in categories:
+                category_id = categories[str(category)]
+            elif category_name:
+                category_id = by_name.get(category_name)
+            if category_id is None and (category is not None or category_name):
+                fail(line_number, {"category": [CATEGORY_NOT_OWNED]})
+                continue
+
+            source_id = data.pop("id", None)
+            due_date = data.get("due_date")
+            task = Task(
+                telegram_id=telegram_id,
+                category_id=category_id,
+                notification_sent=due_date is not None and due_date <= now,
+                **data,
+            )
+            if source_id is not None:
+                task.id = imported_task_id(telegram_id, source_id)
+                source_id = str(source_id)
+            if str(task.id) in batch:
+                skipped += 1
+                continue
+            batch[str(task.id)] = (task, source_id)
+            if len(batch) >= IMPORT_BATCH_SIZE:
+                saved = _save_batch(telegram_id, batch)
+                created += saved
+                skipped += len(batch) - saved
+                batch = {}
+
+        if batch:
+            saved = _save_batch(telegram_id, batch)
+            created += saved
+            skipped += len(batch) - saved
+    finally:
+        if created:
+            bump_user_version(telegram_id)
+
+    return {"created": created, "skipped": skipped, "failed": failed, "errors": errors}
+
+
+def start_import(telegram_id: int, stream, digest: bytes | None = None) -> TaskImportJob:
+    """
+    Копирует тело запроса в хранилище файлов кусками, не загружая его в память, и ставит
+    загрузку в Celery (import_tasks_job) после фиксации транзакции. Если передан digest
+    (SHA-256 из Content-Digest), тело сверяется с ним по ходу копирования.
+    """
+    job = TaskImportJob(telegram_id=telegram_id)
+    name = job.file.field.generate_filename(job, f"{job.id}.ndjson")
+    reader = _HashingReader(stream)
+    job.file.name = job.file.storage.save(name, File(reader))
+    if digest is not None and reader.hash.digest() != digest:
+        job.file.storage.delete(job.file.name)
+        raise ParseError("Content-Digest does not match the request body.")
+    job.save(force_insert=True)
+    transaction.on_commit(lambda: import_tasks_job.delay(str(job.id)))
+    return job
@@ -1,8 +1,9 @@
+from django.conf import settings
 from rest_framework.routers import DefaultRouter
 
-from api.v1.tasks.views import TaskViewSet
+from api.v1.tasks.views import AsyncTaskViewSet, TaskViewSet
 
 router = DefaultRouter()
-router.register("", TaskViewSet, basename="task")
+router.register("", AsyncTaskViewSet if settings.API_ASYNC_VIEWS else TaskViewSet, basename="task")
 
 urlpatterns = router.urls
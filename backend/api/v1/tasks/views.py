@@ -1,12 +1,42 @@
+from asgiref.sync import sync_to_async
+from django.contrib.postgres.search import SearchQuery
+from django.db import transaction
+from django.db.models import Q
+from django.http import StreamingHttpResponse
 from rest_framework import status, viewsets
 from rest_framework.decorators import action
+from rest_framework.exceptions import UnsupportedMediaType
+from rest_framework.filters import OrderingFilter
+from rest_framework.generics import get_object_or_404
 from rest_framework.response import Response
-from tasks.models import Task
+from rest_framework.reverse import reverse
+from tasks.models import SEARCH_CONFIG, ArchivedTask, Task, TaskImportJob
+from tasks.scheduler import publish_reminder
+from tasks.stats import get_task_stats
 
-from api.v1.tasks.serializers import TaskCreateSerializer, TaskListSerializer, TaskSerializer
+from api.v1.async_views import AsyncViewSetMixin, ais_valid, asave
+from api.v1.conditional import UserETagMixin
+from api.v1.idempotency import CONTENT_DIGEST_HEADER, IdempotencyMixin, parse_content_digest
+from api.v1.renderers import CSVRenderer, NDJSONRenderer
+from api.v1.sparse import SparseFieldsetViewMixin
+from api.v1.tasks.bulk import run_bulk_operations
+from api.v1.tasks.serializers import (
+    ArchivedTaskListSerializer,
+    ArchivedTaskSerializer,
+    TaskBulkSerializer,
+    TaskCreateSerializer,
+    TaskImportJobSerializer,
+    TaskListSerializer,
+    TaskSerializer,
+)
+from api.v1.tasks.transfer import astream_export, start_import, stream_export
 
 
-class TaskViewSet(viewsets.ModelViewSet):
+class TaskViewSet(IdempotencyMixin, UserETagMixin, SparseFieldsetViewMixin, viewsets.ModelViewSet):
+    filter_backends = [OrderingFilter]
+    ordering_fields = ["created_at", "is_completed", "title"]
+    streaming_body_actions = ("import_tasks",)
+
     def get_telegram_id(self) -> int | None:
         telegram_id = self.request.headers.get("X-Telegram-ID")
         if telegram_id:
@@ -16,12 +46,22 @@ class TaskViewSet(viewsets.ModelViewSet):
                 return None
         return None
 
+    def is_archive_request(self) -> bool:
+        # Архив только читается и только по явному ?archived=true
+        return self.action in ("list", "retrieve", "export") and (
+            self.request.query_params.get("archived", "").lower() == "true"
+        )
+
     def get_queryset(self):
         telegram_id = self.get_telegram_id()
         if telegram_id is None:
             return Task.objects.none()
 
-        queryset = Task.objects.filter(telegram_id=telegram_id).select_related("category")
+        archived = self.is_archive_request()
+        model = ArchivedTask if archived else Task
+        queryset = self.sparse_queryset(
+            model.objects.filter(telegram_id=telegram_id), select_related=("category",)
+        )
 
         is_completed = self.request.query_params.get("is_completed")
         if is_completed is not None:
@@ -31,9 +71,24 @@ class TaskViewSet(viewsets.ModelViewSet):
         if category_id:
             queryset = queryset.filter(category_id=category_id)
 
+        search = self.request.query_params.get("q", "").strip()
+        if search and archived:
+            # У архива нет поисковых индексов: строки уже отобраны по пользователю
+            queryset = queryset.filter(
+                Q(title__icontains=search) | Q(description__icontains=search)
+            )
+        elif search:
+            # Слова с морфологией по tsvector, части слов в названии по триграммам
+            queryset = queryset.filter(
+                Q(search_vector=SearchQuery(search, config=SEARCH_CONFIG, search_type="websearch"))
+                | Q(title__icontains=search)
+            )
+
         return queryset
 
     def get_serializer_class(self):
+        if self.is_archive_request():
+            return ArchivedTaskListSerializer if self.action == "list" else ArchivedTaskSerializer
         if self.action == "list":
             return TaskListSerializer
         if self.action == "create":
@@ -56,6 +111,7 @@ class TaskViewSet(viewsets.ModelViewSet):
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         task = serializer.save(telegram_id=telegram_id)
+        transaction.on_commit(lambda: publish_reminder(task))
 
         response_serializer = TaskSerializer(task)
         headers = self.get_success_headers(response_serializer.data)
@@ -65,11 +121,16 @@ class TaskViewSet(viewsets.ModelViewSet):
             headers=headers,
         )
 
+    def perform_update(self, serializer):
+        task = serializer.save()
+        transaction.on_commit(lambda: publish_reminder(task))
+
     @action(detail=True, methods=["post"])
     def complete(self, request, pk=None):
         task = self.get_object()
         task.is_completed = True
         task.save(update_fields=["is_completed", "updated_at"])
+        transaction.on_commit(lambda: publish_reminder(task))
         serializer = TaskSerializer(task)
         return Response(serializer.data)
 
@@ -78,5 +139,135 @@ class TaskViewSet(viewsets.ModelViewSet):
         task = self.get_object()
         task.is_completed = False
         task.save(update_fields=["is_completed", "updated_at"])
+        transaction.on_commit(lambda: publish_reminder(task))
         serializer = TaskSerializer(task)
         return Response(serializer.data)
+
+    @action(detail=False, methods=["post"])
+    def bulk(self, request):
+        telegram_id = self.get_telegram_id()
+        if telegram_id is None:
+            return Response(
+                {"error": "X-Telegram-ID header is required"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        serializer = TaskBulkSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        results = run_bulk_operations(telegram_id, serializer.validated_data["operations"])
+        return Response({"results": results})
+
+    @action(detail=False, methods=["get"])
+    def stats(self, request):
+        telegram_id = self.get_telegram_id()
+        if telegram_id is None:
+            return Response(
+                {"error": "X-Telegram-ID header is required"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        return Response(get_task_stats(telegram_id))
+
+    def export_response(self, streaming_content) -> StreamingHttpResponse:
+        renderer = self.request.accepted_renderer
+        response = StreamingHttpResponse(streaming_content, content_type=renderer.media_type)
+        filename = f"tasks-{self.get_telegram_id()}.{renderer.format}"
+        response["Content-Disposition"] = f'attachment; filename="{filename}"'
+        return response
+
+    @action(detail=False, methods=["get"], renderer_classes=[NDJSONRenderer, CSVRenderer])
+    def export(self, request):
+        """Все задачи пользователя одним потоком NDJSON (по умолчанию) или CSV (?format=csv)."""
+        if self.get_telegram_id() is None:
+            return Response(
+                {"error": "X-Telegram-ID header is required"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        queryset = self.filter_queryset(self.get_queryset())
+        return self.export_response(stream_export(queryset, request.accepted_renderer.format))
+
+    @action(detail=False, methods=["post"], url_path="import")
+    def import_tasks(self, request):
+        """Принимает NDJSON и отвечает 202 с заданием загрузки, которое выполняет Celery."""
+        telegram_id = self.get_telegram_id()
+        if telegram_id is None:
+            return Response(
+                {"error": "X-Telegram-ID header is required"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if request.content_type.split(";")[0].strip() != NDJSONRenderer.media_type:
+            raise UnsupportedMediaType(request.content_type)
+        if request.stream is None:
+            return Response({"error": "Request body is empty"}, status=status.HTTP_400_BAD_REQUEST)
+        digest = parse_content_digest(request.headers.get(CONTENT_DIGEST_HEADER, ""))
+        job = start_import(telegram_id, request.stream, digest)
+        location = reverse("task-import-status", kwargs={"job_id": job.id}, request=request)
+        return Response(
+            TaskImportJobSerializer(job).data,
+            status=status.HTTP_202_ACCEPTED,
+            headers={"Location": location},
+        )
+
+    @action(detail=False, methods=["get"], url_path=r"import/(?P<job_id>[^/.]+)")
+    def import_status(self, request, job_id=None):
+        telegram_id = self.get_telegram_id()
+        if telegram_id is None:
+            return Response(
+                {"error": "X-Telegram-ID header is required"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        job = get_object_or_404(TaskImportJob, id=job_id, telegram_id=telegram_id)
+        return Response(TaskImportJobSerializer(job).data)
+
+
+class AsyncTaskViewSet(AsyncViewSetMixin, TaskViewSet):
+    """Асинхронный вариант TaskViewSet для ASGI, включается настройкой API_ASYNC_VIEWS."""
+
+    async def create(self, request, *args, **kwargs):
+        telegram_id = self.get_telegram_id()
+        if telegram_id is None:
+            return Response(
+                {"error": "X-Telegram-ID header is required"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        serializer = self.get_serializer(data=request.data)
+        await ais_valid(serializer)
+        task = await asave(serializer, telegram_id=telegram_id)
+        await sync_to_async(publish_reminder)(task)
+
+        response_serializer = TaskSerializer(task)
+        headers = self.get_success_headers(response_serializer.data)
+        return Response(
+            response_serializer.data,
+            status=status.HTTP_201_CREATED,
+            headers=headers,
+        )
+
+    async def aperform_update(self, serializer):
+        task = await asave(serializer)
+        await sync_to_async(publish_reminder)(task)
+
+    @action(detail=False, methods=["get"], renderer_classes=[NDJSONRenderer, CSVRenderer])
+    async def export(self, request):
+        if self.get_telegram_id() is None:
+            return Response(
+                {"error": "X-Telegram-ID header is required"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        queryset = self.filter_queryset(self.get_queryset())
+        return self.export_response(astream_export(queryset, request.accepted_renderer.format))
+
+    async def _aset_completed(self, is_completed: bool) -> Response:
+        task = await self.aget_object()
+        task.is_completed = is_completed
+        await task.asave(update_fields=["is_completed", "updated_at"])
+        await sync_to_async(publish_reminder)(task)
+        return Response(TaskSerializer(task).data)
+
+    @action(detail=True, methods=["post"])
+    async def complete(self, request, pk=None):
+        return await self._aset_completed(True)
+
+    @action(detail=True, methods=["post"])
+    async def uncomplete(self, request, pk=None):
+        return await self._aset_completed(False)
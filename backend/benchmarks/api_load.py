@@ -0,0 +1,153 @@
+"""
+Нагрузочный тест API задач: задержки p50/p95/p99 и запросов в секунду при высокой конкурентности.
+
+Бенчмарк работает с уже запущенным сервером, поэтому синхронный и асинхронный варианты
+сравниваются двумя прогонами против разных развёртываний, например:
+
+    # WSGI и синхронные ViewSet
+    gunicorn --workers 2 --threads 8 config.wsgi:application
+    # ASGI и асинхронные ViewSet
+    API_ASYNC_VIEWS=True gunicorn --workers 2 -k uvicorn_worker.UvicornWorker config.asgi:application
+
+    python -m benchmarks.api_load --base-url http://localhost:8000/api/v1 --concurrency 50 200
+
+Смесь запросов близка к боту: список последних задач, карточка задачи и отметка о выполнении.
+Чтобы мерить сами ViewSet, а не кеш ответов, запускайте сервер с API_CACHE_ENABLED=False.
+Созданные задачи удаляются в конце прогона.
+"""
+
+import argparse
+import asyncio
+import random
+import statistics
+import time
+
+import httpx
+
+BENCH_TELEGRAM_ID = 9_200_000_000
+BULK_SIZE = 500
+
+
+async def seed(client: httpx.AsyncClient, users: int, tasks_per_user: int) -> dict[int, list[str]]:
+    task_ids: dict[int, list[str]] = {}
+    for user in range(users):
+        telegram_id = BENCH_TELEGRAM_ID + user
+        operations = [
+            {"op": "create", "title": f"Нагрузочная задача #{i}"} for i in range(tasks_per_user)
+        ]
+        task_ids[telegram_id] = []
+        for start in range(0, len(operations), BULK_SIZE):
+            response = await client.post(
+                "/tasks/bulk/",
+                json={"operations": operations[start : start + BULK_SIZE]},
+                headers={"X-Telegram-ID": str(telegram_id)},
+            )
+            response.raise_for_status()
+            task_ids[telegram_id].extend(item["id"] for item in response.json()["results"])
+    return task_ids
+
+
+async def cleanup(client: httpx.AsyncClient, task_ids: dict[int, list[str]]) -> None:
+    for telegram_id, ids in task_ids.items():
+        for start in range(0, len(ids), BULK_SIZE):
+            await client.post(
+                "/tasks/bulk/",
+                json={
+                    "operations": [
+                        {"op": "delete", "id": i} for i in ids[start : start + BULK_SIZE]
+                    ]
+                },
+                headers={"X-Telegram-ID": str(telegram_id)},
+            )
+
+
+async def one_request(client: httpx.AsyncClient, task_ids: dict[int, list[str]]) -> bool:
+    telegram_id = random.choice(list(task_ids))
+    headers = {"X-Telegram-ID": str(telegram_id)}
+    roll = random.random()
+    if roll < 0.7:
+        response = await client.get(
+            "/tasks/",
+            params={"limit": 10, "ordering": "is_completed,-created_at"},
+            headers=headers,
+        )
+    elif roll < 0.9:
+        response = await client.get(
+            f"/tasks/{random.choice(task_ids[telegram_id])}/", headers=headers
+        )
+    else:
+        action = random.choice(("complete", "uncomplete"))
+        response = await client.post(
+            f"/tasks/{random.choice(task_ids[telegram_id])}/{action}/", headers=headers
+        )
+    return response.is_success
+
+
+async def run_level(
+    client: httpx.AsyncClient,
+    task_ids: dict[int, list[str]],
+    concurrency: int,
+    total: int,
+) -> dict:
+    latencies: list[float] = []
+    errors = 0
+    remaining = total
+
+    async def worker():
+        nonlocal remaining, errors
+        while remaining > 0:
+            remaining -= 1
+            started = time.perf_counter()
+            try:
+                ok = await one_request(client, task_ids)
+            except httpx.HTTPError:
+                ok = False
+            latencies.append(time.perf_counter() - started)
+            errors += not ok
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    percentiles = statistics.quantiles(latencies, n=100)
+    return {
+        "rps": len(latencies) / elapsed,
+        "p50": percentiles[49] * 1000,
+        "p95": percentiles[94] * 1000,
+        "p99": percentiles[98] * 1000,
+        "errors": errors,
+    }
+
+
+async def main_async(args) -> None:
+    limits = httpx.Limits(max_connections=max(args.concurrency), max_keepalive_connections=None)
+    async with httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=60) as client:
+        task_ids = await seed(client, args.users, args.tasks_per_user)
+        try:
+            # Прогрев: соединения, кеши планов запросов и версии данных пользователей
+            await run_level(client, task_ids, min(args.concurrency), min(args.requests, 200))
+            label = f"{args.label} " if args.label else ""
+            for concurrency in args.concurrency:
+                result = await run_level(client, task_ids, concurrency, args.requests)
+                print(
+                    f"{label}x{concurrency}: {result['rps']:8.1f} req/s  "
+                    f"p50 {result['p50']:7.1f} ms  p95 {result['p95']:7.1f} ms  "
+                    f"p99 {result['p99']:7.1f} ms  errors {result['errors']}"
+                )
+        finally:
+            await cleanup(client, task_ids)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--base-url", default="http://localhost:8000/api/v1")
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--tasks-per-user", type=int, default=50)
+    parser.add_argument("--requests", type=int, default=5000, help="запросов на уровень")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[50, 200])
+    parser.add_argument("--label", default="", help="подпись строк вывода, например wsgi/asgi")
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
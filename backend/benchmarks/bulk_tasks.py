@@ -0,0 +1,142 @@
+"""
+Бенчмарк массовых операций: по запросу на задачу против одного POST /tasks/bulk/.
+
+Запуск из каталога backend (нужна настроенная база данных):
+    python -m benchmarks.bulk_tasks --sizes 1 10 100 500
+
+Для каждого размера пачки создаёт задачи, затем выполняет над ними complete,
+move и delete отдельными запросами к TaskViewSet и одним bulk-запросом и
+выводит число SQL-запросов и время. Во bulk-варианте число запросов не зависит
+от размера пачки. Все изменения откатываются.
+"""
+
+import argparse
+import os
+import time
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings.development")
+
+import django  # noqa: E402
+
+django.setup()
+
+from api.v1.tasks.views import TaskViewSet  # noqa: E402
+from categories.models import Category  # noqa: E402
+from django.db import connection, transaction  # noqa: E402
+from django.test.utils import CaptureQueriesContext  # noqa: E402
+from rest_framework.test import APIRequestFactory  # noqa: E402
+
+BENCH_TELEGRAM_ID = 9_100_000_000
+
+factory = APIRequestFactory()
+headers = {"HTTP_X_TELEGRAM_ID": str(BENCH_TELEGRAM_ID)}
+create_view = TaskViewSet.as_view({"post": "create"})
+complete_view = TaskViewSet.as_view({"post": "complete"})
+update_view = TaskViewSet.as_view({"patch": "partial_update"})
+destroy_view = TaskViewSet.as_view({"delete": "destroy"})
+bulk_view = TaskViewSet.as_view({"post": "bulk"})
+
+
+def bulk(operations: list[dict]) -> list[dict]:
+    request = factory.post("/tasks/bulk/", {"operations": operations}, format="json", **headers)
+    response = bulk_view(request)
+    assert response.status_code == 200, response.data
+    return response.data["results"]
+
+
+def measure(fn) -> tuple[int, float]:
+    with CaptureQueriesContext(connection) as queries:
+        started = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - started
+    return len(queries.captured_queries), elapsed * 1000
+
+
+def per_task(size: int, category_id: str) -> list[tuple[str, int, float]]:
+    task_ids = []
+
+    def create():
+        for i in range(size):
+            request = factory.post(
+                "/tasks/",
+                {"title": f"bench {i}", "category": category_id},
+                format="json",
+                **headers,
+            )
+            task_ids.append(create_view(request).data["id"])
+
+    def complete():
+        for task_id in task_ids:
+            complete_view(factory.post(f"/tasks/{task_id}/complete/", **headers), pk=task_id)
+
+    def move():
+        for task_id in task_ids:
+            request = factory.patch(
+                f"/tasks/{task_id}/", {"category": None}, format="json", **headers
+            )
+            update_view(request, pk=task_id)
+
+    def delete():
+        for task_id in task_ids:
+            destroy_view(factory.delete(f"/tasks/{task_id}/", **headers), pk=task_id)
+
+    return [
+        (name, *measure(fn))
+        for name, fn in [
+            ("create", create),
+            ("complete", complete),
+            ("move", move),
+            ("delete", delete),
+        ]
+    ]
+
+
+def batched(size: int, category_id: str) -> list[tuple[str, int, float]]:
+    task_ids = []
+
+    def create():
+        results = bulk(
+            [{"op": "create", "title": f"bench {i}", "category": category_id} for i in range(size)]
+        )
+        task_ids.extend(result["id"] for result in results)
+
+    def run(op: str, **extra):
+        return lambda: bulk([{"op": op, "id": task_id, **extra} for task_id in task_ids])
+
+    return [
+        (name, *measure(fn))
+        for name, fn in [
+            ("create", create),
+            ("complete", run("complete")),
+            ("move", run("move", category=None)),
+            ("delete", run("delete")),
+        ]
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 10, 100, 500])
+    args = parser.parse_args()
+
+    print(
+        f"{'size':>5} {'operation':10} {'per-task queries':>17} {'ms':>9} {'bulk queries':>13} {'ms':>9}"
+    )
+    for size in args.sizes:
+        with transaction.atomic():
+            category = Category.objects.create(telegram_id=BENCH_TELEGRAM_ID, name="bench")
+            single = per_task(size, str(category.id))
+            batch = batched(size, str(category.id))
+            transaction.set_rollback(True)
+
+        for (name, single_queries, single_ms), (_, bulk_queries, bulk_ms) in zip(
+            single, batch, strict=True
+        ):
+            print(
+                f"{size:>5} {name:10} {single_queries:>17} {single_ms:>9.1f} "
+                f"{bulk_queries:>13} {bulk_ms:>9.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""
+Бенчмарк подключений к базе: запрос API с новым соединением, с постоянным и из пула.
+
+Запуск из каталога backend (нужен PostgreSQL):
+    python -m benchmarks.db_pool --requests 2000 --threads 1 8
+
+Каждый режим запускается в отдельном процессе со своими настройками базы:
+    connect    — DB_POOL_ENABLED=False, DB_CONN_MAX_AGE=0 (соединение на каждый запрос)
+    persistent — DB_POOL_ENABLED=False, DB_CONN_MAX_AGE=60
+    pool       — DB_POOL_ENABLED=True
+
+Запросы идут через WSGIHandler, как под gunicorn, поэтому соединения закрываются или
+возвращаются в пул сигналом request_finished. В качестве тривиального запроса
+используется GET /api/v1/tasks/stats/: он не кешируется и делает два коротких запроса к базе.
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+MODES = {
+    "connect": {"DB_POOL_ENABLED": "False", "DB_CONN_MAX_AGE": "0"},
+    "persistent": {"DB_POOL_ENABLED": "False", "DB_CONN_MAX_AGE": "60"},
+    "pool": {"DB_POOL_ENABLED": "True"},
+}
+BENCH_TELEGRAM_ID = 9_300_000_000
+
+
+def run_mode(requests: int, threads: int) -> None:
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings.development")
+    import django
+
+    django.setup()
+
+    from django.conf import settings
+    from django.core.handlers.wsgi import WSGIHandler
+    from django.db.backends.signals import connection_created
+    from django.test import RequestFactory
+
+    if "testserver" not in settings.ALLOWED_HOSTS:
+        settings.ALLOWED_HOSTS = [*settings.ALLOWED_HOSTS, "testserver"]
+
+    # connection_created срабатывает и на выдачу соединения из пула, поэтому
+    # физические подключения считаются по PID серверного процесса
+    backend_pids: set[int] = set()
+
+    def count_connection(connection, **kwargs):
+        backend_pids.add(connection.connection.info.backend_pid)
+
+    connection_created.connect(count_connection)
+
+    handler = WSGIHandler()
+    environ = RequestFactory()._base_environ(
+        PATH_INFO="/api/v1/tasks/stats/",
+        REQUEST_METHOD="GET",
+        HTTP_X_TELEGRAM_ID=str(BENCH_TELEGRAM_ID),
+    )
+
+    def one_request() -> None:
+        response = handler(dict(environ), lambda status, headers: None)
+        # close() отправляет request_finished, как это делает WSGI-сервер
+        response.close()
+
+    def worker(count: int) -> list[float]:
+        latencies = []
+        for _ in range(count):
+            started = time.perf_counter()
+            one_request()
+            latencies.append(time.perf_counter() - started)
+        return latencies
+
+    # Прогрев: импорты, открытие пула, кеши планов
+    worker(20)
+    backend_pids.clear()
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(threads) as executor:
+        results = list(executor.map(worker, [requests // threads] * threads))
+    elapsed = time.perf_counter() - started
+
+    latencies = sorted(latency for result in results for latency in result)
+    p50 = latencies[len(latencies) // 2] * 1000
+    p99 = latencies[int(len(latencies) * 0.99)] * 1000
+    print(
+        f"{len(latencies) / elapsed:9.1f} req/s  p50 {p50:6.2f} ms  p99 {p99:6.2f} ms  "
+        f"connections {len(backend_pids)}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 8])
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=list(MODES))
+    parser.add_argument("--run-mode", choices=MODES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_mode:
+        run_mode(args.requests, args.threads[0])
+        return
+
+    for threads in args.threads:
+        for mode in args.modes:
+            print(f"{mode:>10} x{threads}: ", end="", flush=True)
+            subprocess.run(
+                [
+                    sys.executable,
+                    "-m",
+                    "benchmarks.db_pool",
+                    "--run-mode",
+                    mode,
+                    "--requests",
+                    str(args.requests),
+                    "--threads",
+                    str(threads),
+                ],
+                env={**os.environ, **MODES[mode]},
+                check=True,
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+"""
+Бенчмарк запроса свипа check_due_tasks на большой таблице Task (только PostgreSQL).
+
+Запуск из каталога backend:
+    python -m benchmarks.due_sweep --rows 2000000 --due 500
+    python -m benchmarks.due_sweep --cleanup
+
+Засеивает историю (выполненные и уже напомненные задачи), немного будущих и
+просроченных задач, затем замеряет запрос захвата пачки и подсчёт бэклога
+со старым составным индексом (due_date, notification_sent) и с частичным
+task_due_pending_idx. Старое состояние воспроизводится внутри транзакции,
+которая потом откатывается.
+"""
+
+import argparse
+import os
+import statistics
+import time
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings.development")
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.conf import settings  # noqa: E402
+from django.db import connection, transaction  # noqa: E402
+from django.utils import timezone  # noqa: E402
+from tasks.tasks import due_batch_queryset, due_tasks_queryset  # noqa: E402
+
+BENCH_TELEGRAM_ID_BASE = 9_000_000_000
+SEED_CHUNK = 250_000
+
+SEED_SQL = """
+INSERT INTO tasks_task (
+    id, created_at, updated_at, telegram_id, title, description, due_date,
+    is_completed, notification_sent, notification_attempts, notification_failed,
+    notification_error
+)
+SELECT
+    gen_random_uuid(), ts, ts, %(base)s + (n %% %(users)s), 'bench task ' || n, '',
+    CASE WHEN n %% 4 = 0 THEN NULL ELSE ts + interval '1 day' END,
+    n %% 10 <> 0, n %% 4 <> 0, 0, false, ''
+FROM (
+    SELECT n, now() - interval '2 days' - (n * interval '15 seconds') AS ts
+    FROM generate_series(%(start)s, %(stop)s) AS n
+) AS seed
+"""
+
+PENDING_SQL = """
+INSERT INTO tasks_task (
+    id, created_at, updated_at, telegram_id, title, description, due_date,
+    is_completed, notification_sent, notification_attempts, notification_failed,
+    notification_error
+)
+SELECT
+    gen_random_uuid(), now(), now(), %(base)s + (n %% %(users)s), 'bench pending ' || n, '',
+    now() + %(offset)s * (n * interval '1 second'),
+    false, false, 0, false, ''
+FROM generate_series(1, %(count)s) AS n
+"""
+
+
+def seed(rows: int, due: int, upcoming: int, users: int) -> None:
+    params = {"base": BENCH_TELEGRAM_ID_BASE, "users": users}
+    with connection.cursor() as cursor:
+        for start in range(1, rows + 1, SEED_CHUNK):
+            stop = min(start + SEED_CHUNK - 1, rows)
+            cursor.execute(SEED_SQL, {**params, "start": start, "stop": stop})
+            print(f"seeded {stop}/{rows} historical rows")
+        cursor.execute(PENDING_SQL, {**params, "count": due, "offset": -1})
+        cursor.execute(PENDING_SQL, {**params, "count": upcoming, "offset": 60})
+        cursor.execute("ANALYZE tasks_task")
+
+
+def cleanup() -> None:
+    with connection.cursor() as cursor:
+        cursor.execute("DELETE FROM tasks_task WHERE telegram_id >= %s", [BENCH_TELEGRAM_ID_BASE])
+        print(f"deleted {cursor.rowcount} rows")
+        cursor.execute("ANALYZE tasks_task")
+
+
+def timed(fn, runs: int) -> float:
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def measure(label: str, runs: int) -> None:
+    batch_size = settings.NOTIFICATION_BATCH_SIZE
+
+    def claim():
+        with transaction.atomic():
+            list(due_batch_queryset(timezone.now(), batch_size))
+
+    def backlog():
+        due_tasks_queryset(timezone.now()).count()
+
+    claim_ms = timed(claim, runs)
+    backlog_ms = timed(backlog, runs)
+    with transaction.atomic():
+        plan = due_batch_queryset(timezone.now(), batch_size).explain(analyze=True, buffers=True)
+
+    print(f"\n=== {label}")
+    print(f"claim batch ({batch_size}): p50 {claim_ms:.2f} ms")
+    print(f"backlog count:       p50 {backlog_ms:.2f} ms")
+    print(plan)
+
+
+def index_sizes() -> None:
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT indexrelname, pg_size_pretty(pg_relation_size(indexrelid))
+            FROM pg_stat_user_indexes WHERE relname = 'tasks_task' ORDER BY indexrelname
+            """
+        )
+        for name, size in cursor.fetchall():
+            print(f"{name:40} {size}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=2_000_000, help="historical rows to seed")
+    parser.add_argument("--due", type=int, default=500, help="overdue pending rows")
+    parser.add_argument("--upcoming", type=int, default=20_000, help="future pending rows")
+    parser.add_argument("--users", type=int, default=50_000)
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--no-seed", action="store_true", help="reuse previously seeded rows")
+    parser.add_argument("--cleanup", action="store_true", help="delete seeded rows and exit")
+    args = parser.parse_args()
+
+    if connection.vendor != "postgresql":
+        parser.error("this benchmark requires PostgreSQL")
+
+    if args.cleanup:
+        cleanup()
+        return
+
+    if not args.no_seed:
+        seed(args.rows, args.due, args.upcoming, args.users)
+
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            cursor.execute("DROP INDEX task_due_pending_idx")
+            cursor.execute(
+                "CREATE INDEX tasks_task_due_dat_ff6af5_idx "
+                "ON tasks_task (due_date, notification_sent)"
+            )
+        measure("before: composite (due_date, notification_sent)", args.runs)
+        index_sizes()
+        transaction.set_rollback(True)
+
+    measure("after: partial task_due_pending_idx", args.runs)
+    index_sizes()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: "_Server"
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        payload = json.loads(self.rfile.read(length) or b"{}")
+
+        if self.server.latency:
+            time.sleep(self.server.latency)
+
+        with self.server.lock:
+            self.server.requests += 1
+            message_id = self.server.requests
+            throttled = self.server.random.random() < self.server.throttle_ratio
+            self.server.throttled += throttled
+
+        method = self.path.rsplit("/", 1)[-1]
+        if method != "sendMessage":
+            self._reply(404, {"ok": False, "error_code": 404, "description": "Not Found"})
+            return
+
+        if throttled:
+            retry_after = self.server.retry_after
+            self._reply(
+                429,
+                {
+                    "ok": False,
+                    "error_code": 429,
+                    "description": f"Too Many Requests: retry after {retry_after}",
+                    "parameters": {"retry_after": retry_after},
+                },
+            )
+            return
+
+        self._reply(
+            200,
+            {
+                "ok": True,
+                "result": {
+                    "message_id": message_id,
+                    "chat": {"id": payload.get("chat_id")},
+                    "text": payload.get("text", ""),
+                },
+            },
+        )
+
+    def _reply(self, status: int, body: dict):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 1024
+
+    def __init__(self, address, latency: float, throttle_ratio: float, retry_after: int, seed):
+        super().__init__(address, _Handler)
+        self.latency = latency
+        self.throttle_ratio = throttle_ratio
+        self.retry_after = retry_after
+        self.random = random.Random(seed)
+        self.requests = 0
+        self.throttled = 0
+        self.lock = threading.Lock()
+
+
+class FakeBotAPI:
+    """
+    Локальная заглушка api.telegram.org для бенчмарков.
+
+    latency — задержка каждого ответа в секундах, throttle_ratio — доля запросов, на которые
+    заглушка отвечает 429 с parameters.retry_after, как Telegram при превышении лимитов.
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency: float = 0.0,
+        throttle_ratio: float = 0.0,
+        retry_after: int = 1,
+        seed: int | None = None,
+    ):
+        self._server = _Server((host, port), latency, throttle_ratio, retry_after, seed)
+        self._thread: threading.Thread | None = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def requests(self) -> int:
+        return self._server.requests
+
+    @property
+    def throttled(self) -> int:
+        return self._server.throttled
+
+    def start(self) -> "FakeBotAPI":
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "FakeBotAPI":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
@@ -0,0 +1,106 @@
+"""
+Бенчмарк сериализации списков задач: стандартный JSONRenderer DRF против orjson и MessagePack.
+
+Запуск из каталога backend (база данных не нужна):
+    python -m benchmarks.renderers --items 20 100 1000
+
+Для каждого размера списка сравнивает время рендера готовых данных сериализатора,
+полный цикл serializer + render и размер ответа, а также проверяет, что после
+декодирования все форматы дают одинаковые данные.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import time
+from datetime import timedelta
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings.development")
+
+import django  # noqa: E402
+
+django.setup()
+
+import msgpack  # noqa: E402
+import orjson  # noqa: E402
+from api.v1.renderers import MessagePackRenderer, ORJSONRenderer  # noqa: E402
+from api.v1.tasks.serializers import TaskListSerializer, TaskSerializer  # noqa: E402
+from categories.models import Category  # noqa: E402
+from django.utils import timezone  # noqa: E402
+from rest_framework.renderers import JSONRenderer  # noqa: E402
+from tasks.models import Task  # noqa: E402
+
+RENDERERS = {
+    "json (stdlib)": (JSONRenderer(), json.loads),
+    "orjson": (ORJSONRenderer(), orjson.loads),
+    "msgpack": (MessagePackRenderer(), lambda data: msgpack.unpackb(data, raw=False)),
+}
+
+
+def build_tasks(count: int) -> list[Task]:
+    now = timezone.now()
+    categories = [
+        Category(telegram_id=1, name=f"Категория {i}", created_at=now, updated_at=now)
+        for i in range(5)
+    ]
+    return [
+        Task(
+            telegram_id=1,
+            title=f"Задача {i}: подготовить отчёт",
+            description="Подробное описание задачи " * 4,
+            category=categories[i % 5] if i % 3 else None,
+            due_date=now + timedelta(hours=i),
+            is_completed=i % 2 == 0,
+            created_at=now - timedelta(minutes=i),
+            updated_at=now,
+        )
+        for i in range(count)
+    ]
+
+
+def timed(fn, runs: int) -> float:
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings)
+
+
+def bench(serializer_class, tasks: list[Task], runs: int) -> None:
+    payload = {"next": None, "previous": None, "results": serializer_class(tasks, many=True).data}
+    reference = json.loads(JSONRenderer().render(payload))
+
+    print(f"\n{serializer_class.__name__}, {len(tasks)} items")
+    for name, (renderer, decode) in RENDERERS.items():
+        body = renderer.render(payload)
+        assert decode(body) == reference, f"{name} output differs from stdlib JSON"
+
+        render_time = timed(lambda: renderer.render(payload), runs)
+
+        def full_cycle():
+            data = serializer_class(tasks, many=True).data
+            renderer.render({"next": None, "previous": None, "results": data})
+
+        full_time = timed(full_cycle, runs)
+        print(
+            f"  {name:14} render {1 / render_time:9.0f} lists/s   "
+            f"serialize+render {1 / full_time:8.0f} lists/s   {len(body):8} bytes"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--items", type=int, nargs="+", default=[20, 100, 1000])
+    parser.add_argument("--runs", type=int, default=50)
+    args = parser.parse_args()
+
+    for count in args.items:
+        tasks = build_tasks(count)
+        bench(TaskListSerializer, tasks, args.runs)
+        bench(TaskSerializer, tasks, args.runs)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+"""
+Бенчмарк профилей настроек на списке задач: development против production.
+
+Запуск из каталога backend (нужен PostgreSQL):
+    python -m benchmarks.settings_profiles --requests 3000
+    python -m benchmarks.settings_profiles --requests 3000 --conditional
+    python -m benchmarks.settings_profiles --cleanup
+
+Каждый профиль запускается в отдельном процессе:
+    development — DEBUG=True и полный набор middleware (как было по умолчанию)
+    base        — config.settings.base с DJANGO_DEBUG=False: полный набор middleware без DEBUG
+    production  — config.settings.production: /api/ идёт мимо сессий, CSRF, auth и messages
+
+Запросы идут через WSGIHandler, как под gunicorn, на GET /api/v1/tasks/?limit=10 с кешем
+ответов API_CACHE_ENABLED=False, чтобы каждый запрос проходил весь стек до базы. Кроме
+req/s выводится процессорное время на запрос: ожидание базы и Redis в него не входит, и
+именно оно ограничивает пропускную способность воркера под нагрузкой. С --conditional
+запросы идут с If-None-Match и получают 304 без базы и сериализации — на таком лёгком
+запросе доля middleware в цене запроса заметнее всего.
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+PROFILES = {
+    "development": {"DJANGO_SETTINGS_MODULE": "config.settings.development"},
+    "base": {"DJANGO_SETTINGS_MODULE": "config.settings.base", "DJANGO_DEBUG": "False"},
+    "production": {"DJANGO_SETTINGS_MODULE": "config.settings.production"},
+}
+BENCH_TELEGRAM_ID = 9_400_000_000
+SEED_TASKS = 50
+PATH = "/api/v1/tasks/"
+QUERY_STRING = "limit=10&ordering=is_completed,-created_at"
+
+
+def setup_django():
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings.development")
+    import django
+
+    django.setup()
+
+
+def seed() -> None:
+    from tasks.models import Task
+
+    existing = Task.objects.filter(telegram_id=BENCH_TELEGRAM_ID).count()
+    Task.objects.bulk_create(
+        Task(telegram_id=BENCH_TELEGRAM_ID, title=f"Профиль настроек #{i}", is_completed=i % 3 == 0)
+        for i in range(existing, SEED_TASKS)
+    )
+
+
+def cleanup() -> None:
+    from tasks.models import Task
+
+    deleted, _ = Task.objects.filter(telegram_id=BENCH_TELEGRAM_ID).delete()
+    print(f"deleted {deleted} rows")
+
+
+def run_profile(requests: int, conditional: bool) -> None:
+    setup_django()
+
+    from django.conf import settings
+    from django.core.handlers.wsgi import WSGIHandler
+    from django.test import RequestFactory
+
+    if "testserver" not in settings.ALLOWED_HOSTS:
+        settings.ALLOWED_HOSTS = [*settings.ALLOWED_HOSTS, "testserver"]
+
+    seed()
+    handler = WSGIHandler()
+    environ = RequestFactory()._base_environ(
+        PATH_INFO=PATH,
+        QUERY_STRING=QUERY_STRING,
+        REQUEST_METHOD="GET",
+        HTTP_X_TELEGRAM_ID=str(BENCH_TELEGRAM_ID),
+    )
+
+    expected_status = "200"
+    if conditional:
+        response = handler(dict(environ), lambda status, headers: None)
+        response.close()
+        environ["HTTP_IF_NONE_MATCH"] = response["ETag"]
+        expected_status = "304"
+
+    def one_request() -> None:
+        statuses = []
+        response = handler(dict(environ), lambda status, headers: statuses.append(status))
+        response.close()
+        if not statuses[0].startswith(expected_status):
+            raise RuntimeError(f"GET {PATH} returned {statuses[0]}")
+
+    # Прогрев: импорты, пул соединений, кеши планов
+    for _ in range(50):
+        one_request()
+
+    latencies = []
+    started = time.perf_counter()
+    cpu_started = time.process_time()
+    for _ in range(requests):
+        request_started = time.perf_counter()
+        one_request()
+        latencies.append(time.perf_counter() - request_started)
+    elapsed = time.perf_counter() - started
+    cpu = (time.process_time() - cpu_started) / requests * 1000
+
+    latencies.sort()
+    p50 = latencies[len(latencies) // 2] * 1000
+    p99 = latencies[int(len(latencies) * 0.99)] * 1000
+    print(
+        f"{requests / elapsed:9.1f} req/s  p50 {p50:6.2f} ms  p99 {p99:6.2f} ms  "
+        f"cpu {cpu:5.2f} ms/req"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=3000)
+    parser.add_argument("--profiles", nargs="+", choices=PROFILES, default=list(PROFILES))
+    parser.add_argument("--conditional", action="store_true", help="GET с If-None-Match (304)")
+    parser.add_argument("--cleanup", action="store_true", help="delete seeded rows and exit")
+    parser.add_argument("--run-profile", choices=PROFILES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.cleanup:
+        setup_django()
+        cleanup()
+        return
+
+    if args.run_profile:
+        run_profile(args.requests, args.conditional)
+        return
+
+    env = {
+        **os.environ,
+        "API_CACHE_ENABLED": "False",
+        # production отказывается запускаться без ключа
+        "DJANGO_SECRET_KEY": os.environ.get("DJANGO_SECRET_KEY", "benchmark-secret-key"),
+    }
+    for profile in args.profiles:
+        print(f"{profile:>12}: ", end="", flush=True)
+        subprocess.run(
+            [
+                sys.executable,
+                "-m",
+                "benchmarks.settings_profiles",
+                "--run-profile",
+                profile,
+                "--requests",
+                str(args.requests),
+                *(["--conditional"] if args.conditional else []),
+            ],
+            env={**env, **PROFILES[profile]},
+            check=True,
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,406 @@
+"""
+Набор бенчмарков бэкенда для отслеживания регрессий: API задач и категорий и свип напоминаний.
+
+Запуск из каталога backend (нужны PostgreSQL и Redis, доступ в интернет не нужен):
+    python -m benchmarks.suite --concurrency 1 8 32 --requests 500 --output results.json
+    python -m benchmarks.suite --output new.json --compare results.json
+
+Засеивает пользователей, категории и задачи и на каждом уровне конкурентности гоняет
+list, detail, create, complete и delete задач и list, detail, create и delete категорий
+через WSGIHandler в потоках, как gunicorn с --threads. Для каждого сценария выводит
+p50/p95/p99, запросы в секунду и SQL-запросы на запрос. Кеш ответов по умолчанию
+выключен (API_CACHE_ENABLED=False), чтобы мерить сами представления.
+
+Затем засеивает просроченные задачи и запускает check_due_tasks против локальной заглушки
+Bot API с заданной задержкой и долей ответов 429. Свип обрабатывает все просроченные задачи
+в базе, поэтому он пропускается, если в ней есть чужие просроченные задачи.
+
+Засеянные данные удаляются в конце. --output пишет результаты в JSON, --compare печатает
+изменение p95, req/s и числа запросов относительно предыдущего файла.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import threading
+import time
+import uuid
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings.development")
+os.environ.setdefault("API_CACHE_ENABLED", "False")
+
+import django  # noqa: E402
+
+django.setup()
+
+from categories.models import Category  # noqa: E402
+from django.conf import settings  # noqa: E402
+from django.core.handlers.wsgi import WSGIHandler  # noqa: E402
+from django.db import connection  # noqa: E402
+from django.test import RequestFactory  # noqa: E402
+from django.test.utils import CaptureQueriesContext  # noqa: E402
+from django.utils import timezone  # noqa: E402
+from tasks import telegram  # noqa: E402
+from tasks.models import Task  # noqa: E402
+from tasks.tasks import check_due_tasks, due_tasks_queryset  # noqa: E402
+
+from benchmarks.fake_bot_api import FakeBotAPI  # noqa: E402
+
+BENCH_TELEGRAM_ID = 9_500_000_000
+DUE_TELEGRAM_ID = 9_600_000_000
+BOT_TOKEN = "123456:bench"
+API = "/api/v1"
+
+factory = RequestFactory()
+
+
+class Seed:
+    """Засеянные объекты и созданные сценариями create, которые удалят сценарии delete."""
+
+    def __init__(self):
+        self.users: list[int] = []
+        self.tasks: dict[int, list[str]] = {}
+        self.categories: dict[int, list[str]] = {}
+        self.created = {"tasks": deque(), "categories": deque()}
+
+    def user(self, i: int) -> int:
+        return self.users[i % len(self.users)]
+
+
+def seed(users: int, categories_per_user: int, tasks_per_user: int) -> Seed:
+    state = Seed()
+    for n in range(users):
+        telegram_id = BENCH_TELEGRAM_ID + n
+        categories = Category.objects.bulk_create(
+            Category(telegram_id=telegram_id, name=f"Категория {i}")
+            for i in range(categories_per_user)
+        )
+        tasks = Task.objects.bulk_create(
+            (
+                Task(
+                    telegram_id=telegram_id,
+                    title=f"Задача бенчмарка #{i}",
+                    description="Описание" if i % 2 else "",
+                    category=categories[i % len(categories)] if categories and i % 4 else None,
+                    is_completed=i % 3 == 0,
+                    # Будущий срок, чтобы свип не трогал эти задачи
+                    due_date=timezone.now() + timedelta(days=7) if i % 5 == 0 else None,
+                )
+                for i in range(tasks_per_user)
+            ),
+            batch_size=1000,
+        )
+        state.users.append(telegram_id)
+        state.tasks[telegram_id] = [str(task.id) for task in tasks]
+        state.categories[telegram_id] = [str(category.id) for category in categories]
+    return state
+
+
+def cleanup() -> None:
+    for base in (BENCH_TELEGRAM_ID, DUE_TELEGRAM_ID):
+        users = {"telegram_id__gte": base, "telegram_id__lt": base + 100_000_000}
+        Task.objects.filter(**users).delete()
+        Category.objects.filter(**users).delete()
+
+
+def build_scenarios(state: Seed) -> dict:
+    """Сценарий по номеру запроса возвращает (метод, путь, тело, telegram_id)."""
+
+    def pick(ids: dict[int, list[str]], i: int) -> tuple[int, str]:
+        telegram_id = state.user(i)
+        return telegram_id, ids[telegram_id][i * 7919 % len(ids[telegram_id])]
+
+    def task_detail(i):
+        telegram_id, task_id = pick(state.tasks, i)
+        return "GET", f"{API}/tasks/{task_id}/", None, telegram_id
+
+    def task_create(i):
+        telegram_id, category_id = pick(state.categories, i)
+        body = {"title": f"Новая задача #{i}", "category": category_id}
+        return "POST", f"{API}/tasks/", body, telegram_id
+
+    def task_complete(i):
+        telegram_id, task_id = pick(state.tasks, i)
+        action = "complete" if i % 2 else "uncomplete"
+        return "POST", f"{API}/tasks/{task_id}/{action}/", None, telegram_id
+
+    def category_detail(i):
+        telegram_id, category_id = pick(state.categories, i)
+        return "GET", f"{API}/categories/{category_id}/", None, telegram_id
+
+    def category_create(i):
+        body = {"name": f"Новая категория {uuid.uuid4().hex[:12]}"}
+        return "POST", f"{API}/categories/", body, state.user(i)
+
+    def delete(kind: str):
+        def scenario(i):
+            telegram_id, object_id = state.created[kind].popleft()
+            return "DELETE", f"{API}/{kind}/{object_id}/", None, telegram_id
+
+        return scenario
+
+    return {
+        "tasks.list": lambda i: (
+            "GET",
+            f"{API}/tasks/?limit=10&ordering=is_completed,-created_at",
+            None,
+            state.user(i),
+        ),
+        "tasks.detail": task_detail,
+        "tasks.create": task_create,
+        "tasks.complete": task_complete,
+        "tasks.delete": delete("tasks"),
+        "categories.list": lambda i: ("GET", f"{API}/categories/", None, state.user(i)),
+        "categories.detail": category_detail,
+        "categories.create": category_create,
+        "categories.delete": delete("categories"),
+    }
+
+
+def percentile(values: list[float], p: int) -> float:
+    return statistics.quantiles(values, n=100)[p - 1] if len(values) > 1 else values[0]
+
+
+def run_scenario(name: str, scenario, state: Seed, concurrency: int, requests: int) -> dict:
+    handler = WSGIHandler()
+    kind = name.split(".")[0]
+    next_index = iter(range(requests))
+    index_lock = threading.Lock()
+
+    def worker() -> list[tuple[float, int, bool]]:
+        local = threading.local()
+        local.queries = 0
+
+        def count_query(execute, sql, params, many, context):
+            local.queries += 1
+            return execute(sql, params, many, context)
+
+        results = []
+        # Обёртка висит на соединении этого потока, которое живёт между запросами
+        with connection.execute_wrapper(count_query):
+            while True:
+                with index_lock:
+                    i = next(next_index, None)
+                if i is None:
+                    return results
+
+                method, path, body, telegram_id = scenario(i)
+                environ = factory.generic(
+                    method,
+                    path,
+                    json.dumps(body) if body is not None else "",
+                    content_type="application/json",
+                    headers={"X-Telegram-ID": str(telegram_id)},
+                ).environ
+                statuses = []
+                queries_before = local.queries
+                started = time.perf_counter()
+                response = handler(environ, lambda status, headers: statuses.append(status))
+                response.close()
+                elapsed = time.perf_counter() - started
+
+                ok = statuses[0][0] == "2"
+                if ok and method == "POST" and name.endswith(".create"):
+                    state.created[kind].append((telegram_id, json.loads(response.content)["id"]))
+                results.append((elapsed, local.queries - queries_before, ok))
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as executor:
+        futures = [executor.submit(worker) for _ in range(concurrency)]
+        results = [result for future in futures for result in future.result()]
+    elapsed = time.perf_counter() - started
+
+    latencies = [result[0] * 1000 for result in results]
+    return {
+        "scenario": name,
+        "concurrency": concurrency,
+        "requests": len(results),
+        "errors": sum(1 for result in results if not result[2]),
+        "rps": round(len(results) / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 50), 2),
+        "p95_ms": round(percentile(latencies, 95), 2),
+        "p99_ms": round(percentile(latencies, 99), 2),
+        "queries_per_request": round(statistics.mean(result[1] for result in results), 2),
+    }
+
+
+def run_api(state: Seed, levels: list[int], requests: int) -> list[dict]:
+    if "testserver" not in settings.ALLOWED_HOSTS:
+        settings.ALLOWED_HOSTS = [*settings.ALLOWED_HOSTS, "testserver"]
+
+    scenarios = build_scenarios(state)
+    # Прогрев: импорты, пул соединений, кеши планов и версии данных пользователей
+    for name, scenario in scenarios.items():
+        run_scenario(name, scenario, state, 1, min(requests, 20))
+
+    results = []
+    for concurrency in levels:
+        for name, scenario in scenarios.items():
+            result = run_scenario(name, scenario, state, concurrency, requests)
+            results.append(result)
+            print(
+                f"{name:>18} x{concurrency:<3} {result['rps']:8.1f} req/s  "
+                f"p50 {result['p50_ms']:7.2f}  p95 {result['p95_ms']:7.2f}  "
+                f"p99 {result['p99_ms']:7.2f} ms  "
+                f"queries {result['queries_per_request']:5.2f}  errors {result['errors']}"
+            )
+    return results
+
+
+def run_due_sweep(args) -> dict | None:
+    now = timezone.now()
+    foreign = due_tasks_queryset(now).exclude(
+        telegram_id__gte=DUE_TELEGRAM_ID, telegram_id__lt=DUE_TELEGRAM_ID + 100_000_000
+    )
+    if foreign.exists():
+        print("check_due_tasks skipped: the database has due tasks outside the benchmark")
+        return None
+
+    Task.objects.bulk_create(
+        (
+            Task(
+                telegram_id=DUE_TELEGRAM_ID + i % args.due_chats,
+                title=f"Просроченная задача #{i}",
+                due_date=now - timedelta(minutes=1 + i % 60),
+            )
+            for i in range(args.due_tasks)
+        ),
+        batch_size=1000,
+    )
+
+    settings.TELEGRAM_BOT_TOKEN = BOT_TOKEN
+    settings.TELEGRAM_GLOBAL_RATE_LIMIT = args.global_rate
+    settings.TELEGRAM_PER_CHAT_RATE_LIMIT = args.per_chat_rate
+    with FakeBotAPI(
+        latency=args.latency_ms / 1000, throttle_ratio=args.throttle_ratio, seed=0
+    ) as api:
+        settings.TELEGRAM_API_URL = api.url
+        # Отправитель создаётся один раз на процесс, пересоздаём его под заглушку
+        telegram._sender = None
+
+        with CaptureQueriesContext(connection) as queries:
+            started = time.perf_counter()
+            check_due_tasks()
+            elapsed = time.perf_counter() - started
+
+    due = Task.objects.filter(
+        telegram_id__gte=DUE_TELEGRAM_ID, telegram_id__lt=DUE_TELEGRAM_ID + args.due_chats
+    )
+    notified = due.filter(notification_sent=True).count()
+    result = {
+        "tasks": args.due_tasks,
+        "chats": args.due_chats,
+        "latency_ms": args.latency_ms,
+        "throttle_ratio": args.throttle_ratio,
+        "seconds": round(elapsed, 3),
+        "tasks_per_second": round(args.due_tasks / elapsed, 1),
+        "messages": api.requests,
+        "throttled": api.throttled,
+        "notified": notified,
+        "retry_scheduled": due.filter(notification_next_attempt_at__isnull=False).count(),
+        "queries": len(queries.captured_queries),
+    }
+    print(
+        f"check_due_tasks: {result['tasks']} tasks in {result['seconds']:.2f}s "
+        f"({result['tasks_per_second']:.1f} tasks/s), messages {result['messages']}, "
+        f"429 {result['throttled']}, notified {notified}, "
+        f"retry {result['retry_scheduled']}, queries {result['queries']}"
+    )
+    return result
+
+
+def compare(results: dict, previous_path: str) -> None:
+    with open(previous_path) as f:
+        previous = json.load(f)
+    before = {(row["scenario"], row["concurrency"]): row for row in previous.get("api", [])}
+
+    def change(old: float, new: float) -> str:
+        return f"{(new - old) / old * 100:+6.1f}%" if old else "   n/a"
+
+    print(f"\nСравнение с {previous_path} ({previous.get('git_commit') or 'без коммита'}):")
+    for row in results["api"]:
+        old = before.get((row["scenario"], row["concurrency"]))
+        if old is None:
+            continue
+        queries = ""
+        if old["queries_per_request"] != row["queries_per_request"]:
+            queries = f"  queries {old['queries_per_request']} -> {row['queries_per_request']}"
+        print(
+            f"{row['scenario']:>18} x{row['concurrency']:<3} "
+            f"p95 {old['p95_ms']:7.2f} -> {row['p95_ms']:7.2f} ms {change(old['p95_ms'], row['p95_ms'])}  "
+            f"{old['rps']:8.1f} -> {row['rps']:8.1f} req/s {change(old['rps'], row['rps'])}"
+            f"{queries}"
+        )
+
+    old_sweep, sweep = previous.get("due_sweep"), results.get("due_sweep")
+    if old_sweep and sweep:
+        print(
+            f"{'check_due_tasks':>18}      {old_sweep['tasks_per_second']:.1f} -> "
+            f"{sweep['tasks_per_second']:.1f} tasks/s "
+            f"{change(old_sweep['tasks_per_second'], sweep['tasks_per_second'])}"
+        )
+
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--categories-per-user", type=int, default=5)
+    parser.add_argument("--tasks-per-user", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--requests", type=int, default=500, help="запросов на сценарий")
+    parser.add_argument("--due-tasks", type=int, default=2000)
+    parser.add_argument("--due-chats", type=int, default=500)
+    parser.add_argument("--latency-ms", type=float, default=20.0, help="задержка заглушки Bot API")
+    parser.add_argument("--throttle-ratio", type=float, default=0.05, help="доля ответов 429")
+    parser.add_argument("--global-rate", type=float, default=0.0, help="0 — без ограничения")
+    parser.add_argument("--per-chat-rate", type=float, default=0.0, help="0 — без ограничения")
+    parser.add_argument("--skip-api", action="store_true")
+    parser.add_argument("--skip-sweep", action="store_true")
+    parser.add_argument("--output", help="файл для результатов в JSON")
+    parser.add_argument("--compare", help="JSON предыдущего прогона для сравнения")
+    args = parser.parse_args()
+
+    results = {
+        "started_at": timezone.now().isoformat(),
+        "git_commit": git_commit(),
+        "settings_module": os.environ["DJANGO_SETTINGS_MODULE"],
+        "api_cache_enabled": settings.API_CACHE_ENABLED,
+        "args": vars(args),
+        "api": [],
+        "due_sweep": None,
+    }
+
+    cleanup()
+    try:
+        if not args.skip_api:
+            state = seed(args.users, args.categories_per_user, args.tasks_per_user)
+            results["api"] = run_api(state, args.concurrency, args.requests)
+        if not args.skip_sweep:
+            results["due_sweep"] = run_due_sweep(args)
+    finally:
+        cleanup()
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+        print(f"\nРезультаты записаны в {args.output}")
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
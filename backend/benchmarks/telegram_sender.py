@@ -0,0 +1,94 @@
+"""
+Бенчмарк отправки уведомлений против локального фейкового Bot API.
+
+Запуск из каталога backend:
+    python -m benchmarks.telegram_sender --messages 2000 --chats 500 --latency-ms 50
+"""
+
+import argparse
+import asyncio
+import time
+
+import httpx
+from tasks.telegram import OutboundMessage, TelegramSender
+
+from benchmarks.fake_bot_api import FakeBotAPI
+
+TOKEN = "123456:bench"
+
+
+def bench_sequential(api_url: str, messages: list[OutboundMessage]) -> float:
+    # Прежнее поведение: новый httpx.Client и TCP-соединение на каждое сообщение
+    started = time.perf_counter()
+    for message in messages:
+        with httpx.Client() as client:
+            response = client.post(
+                f"{api_url}/bot{TOKEN}/sendMessage",
+                json={"chat_id": message.chat_id, "text": message.text, "parse_mode": "HTML"},
+                timeout=10,
+            )
+            response.raise_for_status()
+    return time.perf_counter() - started
+
+
+async def bench_pooled(
+    api_url: str,
+    messages: list[OutboundMessage],
+    concurrency: int,
+    global_rate: float,
+    per_chat_rate: float,
+) -> tuple[float, int]:
+    sender = TelegramSender(
+        bot_token=TOKEN,
+        api_url=api_url,
+        concurrency=concurrency,
+        global_rate=global_rate,
+        per_chat_rate=per_chat_rate,
+    )
+    try:
+        started = time.perf_counter()
+        results = await sender.send_many(messages)
+        elapsed = time.perf_counter() - started
+    finally:
+        await sender.aclose()
+    return elapsed, sum(1 for result in results if not result.ok)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--messages", type=int, default=2000)
+    parser.add_argument("--chats", type=int, default=500)
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--global-rate", type=float, default=0.0, help="0 — без ограничения")
+    parser.add_argument("--per-chat-rate", type=float, default=0.0, help="0 — без ограничения")
+    parser.add_argument("--skip-sequential", action="store_true")
+    args = parser.parse_args()
+
+    messages = [
+        OutboundMessage(chat_id=1000 + i % args.chats, text=f"Напоминание #{i}", key=i)
+        for i in range(args.messages)
+    ]
+
+    with FakeBotAPI(latency=args.latency_ms / 1000) as api:
+        if not args.skip_sequential:
+            elapsed = bench_sequential(api.url, messages)
+            print(f"sequential: {len(messages) / elapsed:9.1f} msg/s ({elapsed:.2f}s)")
+
+        elapsed, failed = asyncio.run(
+            bench_pooled(
+                api.url,
+                messages,
+                concurrency=args.concurrency,
+                global_rate=args.global_rate,
+                per_chat_rate=args.per_chat_rate,
+            )
+        )
+        print(
+            f"pooled x{args.concurrency}: {len(messages) / elapsed:9.1f} msg/s "
+            f"({elapsed:.2f}s, failed: {failed})"
+        )
+
+
+if __name__ == "__main__":
+    main()
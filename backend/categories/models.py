@@ -16,6 +16,12 @@ class Category(BaseModel):
         verbose_name = "Category"
         verbose_name_plural = "Categories"
         ordering = ["name"]
+        indexes = [
+            models.Index(
+                fields=["telegram_id", "created_at", "id"],
+                name="category_user_created_idx",
+            ),
+        ]
         constraints = [
             models.UniqueConstraint(
                 fields=["telegram_id", "name"],
@@ -0,0 +1,10 @@
+from core.versioning import bump_user_version
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from categories.models import Category
+
+
+@receiver([post_save, post_delete], sender=Category)
+def bump_category_owner_version(sender, instance, **kwargs):
+    bump_user_version(instance.telegram_id)
@@ -1,6 +1,7 @@
 import os
 
 from celery import Celery
+from celery.signals import worker_init, worker_process_shutdown
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings.development")
 
@@ -9,3 +10,20 @@ app = Celery("todo")
 app.config_from_object("django.conf:settings", namespace="CELERY")
 
 app.autodiscover_tasks()
+
+
+@worker_init.connect
+def start_metrics_server(**kwargs):
+    from django.conf import settings
+
+    if settings.NOTIFICATION_METRICS_PORT:
+        from tasks.metrics import start_metrics_server
+
+        start_metrics_server(settings.NOTIFICATION_METRICS_PORT)
+
+
+@worker_process_shutdown.connect
+def mark_metrics_process_dead(pid=None, **kwargs):
+    from tasks.metrics import mark_process_dead
+
+    mark_process_dead(pid or os.getpid())
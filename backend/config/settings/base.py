@@ -16,6 +16,7 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
     "rest_framework",
     "corsheaders",
     "django_celery_beat",
@@ -63,9 +64,43 @@ DATABASES = {
         "PASSWORD": os.environ.get("POSTGRES_PASSWORD", "todo_password"),
         "HOST": os.environ.get("POSTGRES_HOST", "localhost"),
         "PORT": os.environ.get("POSTGRES_PORT", "5432"),
+        # Перед выдачей соединение проверяется, обрывы после рестарта Postgres не долетают до кода
+        "CONN_HEALTH_CHECKS": True,
     }
 }
 
+# Пул соединений psycopg: запросы API и задачи Celery берут готовое соединение
+# вместо нового подключения. Пул свой у каждого процесса, поэтому API, воркеры
+# и beat задают размер отдельно. Без пула соединения живут DB_CONN_MAX_AGE секунд.
+DB_POOL_ENABLED = os.environ.get("DB_POOL_ENABLED", "True").lower() in ("true", "1", "yes")
+if DB_POOL_ENABLED:
+    DATABASES["default"]["OPTIONS"] = {
+        "pool": {
+            "min_size": int(os.environ.get("DB_POOL_MIN_SIZE", "2")),
+            "max_size": int(os.environ.get("DB_POOL_MAX_SIZE", "10")),
+            # Сколько ждать свободного соединения, прежде чем запрос упадёт с ошибкой
+            "timeout": float(os.environ.get("DB_POOL_TIMEOUT", "10")),
+            "max_idle": float(os.environ.get("DB_POOL_MAX_IDLE", "300")),
+            "max_lifetime": float(os.environ.get("DB_POOL_MAX_LIFETIME", "1800")),
+        }
+    }
+else:
+    DATABASES["default"]["CONN_MAX_AGE"] = int(os.environ.get("DB_CONN_MAX_AGE", "60"))
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": os.environ.get("CACHE_URL", "redis://localhost:6379/1"),
+    }
+}
+
+API_CACHE_ENABLED = os.environ.get("API_CACHE_ENABLED", "True").lower() in ("true", "1", "yes")
+API_CACHE_TTL = int(os.environ.get("API_CACHE_TTL", "300"))
+# Сколько хранится первый ответ на Idempotency-Key
+API_IDEMPOTENCY_TTL = int(os.environ.get("API_IDEMPOTENCY_TTL", "3600"))
+# Асинхронные ViewSet задач и категорий; имеет смысл только под ASGI-сервером
+API_ASYNC_VIEWS = os.environ.get("API_ASYNC_VIEWS", "False").lower() in ("true", "1", "yes")
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         "NAME": "django.contrib.auth.password_validation.UserAttributeSimilarityValidator",
@@ -92,13 +127,24 @@ USE_TZ = True
 STATIC_URL = "static/"
 STATIC_ROOT = BASE_DIR / "staticfiles"
 
+# Файлы загрузки задач (POST /tasks/import/) ждут здесь воркер Celery, поэтому у API
+# и воркеров должно быть общее хранилище (том или STORAGES с S3)
+MEDIA_ROOT = os.environ.get("MEDIA_ROOT", BASE_DIR / "media")
+
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
 REST_FRAMEWORK = {
-    "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.PageNumberPagination",
+    "DEFAULT_PAGINATION_CLASS": "api.v1.pagination.CreatedAtCursorPagination",
     "PAGE_SIZE": 20,
     "DEFAULT_RENDERER_CLASSES": [
-        "rest_framework.renderers.JSONRenderer",
+        "api.v1.renderers.ORJSONRenderer",
+        "api.v1.renderers.MessagePackRenderer",
+    ],
+    "DEFAULT_PARSER_CLASSES": [
+        "api.v1.parsers.ORJSONParser",
+        "api.v1.parsers.MessagePackParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
     ],
 }
 
@@ -112,4 +158,46 @@ CELERY_RESULT_SERIALIZER = "json"
 CELERY_TIMEZONE = TIME_ZONE
 CELERY_BEAT_SCHEDULER = "django_celery_beat.schedulers:DatabaseScheduler"
 
+NOTIFICATION_METRICS_PORT = int(os.environ.get("NOTIFICATION_METRICS_PORT", "0"))
+NOTIFICATION_BATCH_SIZE = int(os.environ.get("NOTIFICATION_BATCH_SIZE", "500"))
+# Запас в секундах к аренде пачки: забранная на отправку пачка недоступна другим свипам
+# на время её отправки с лимитами Telegram (по числу задач) плюс этот запас
+NOTIFICATION_CLAIM_LEASE = int(os.environ.get("NOTIFICATION_CLAIM_LEASE", "300"))
+NOTIFICATION_DIGEST_ENABLED = os.environ.get("NOTIFICATION_DIGEST_ENABLED", "True").lower() in (
+    "true",
+    "1",
+    "yes",
+)
+NOTIFICATION_DIGEST_MIN_TASKS = int(os.environ.get("NOTIFICATION_DIGEST_MIN_TASKS", "2"))
+NOTIFICATION_MAX_ATTEMPTS = int(os.environ.get("NOTIFICATION_MAX_ATTEMPTS", "5"))
+NOTIFICATION_RETRY_BASE_DELAY = int(os.environ.get("NOTIFICATION_RETRY_BASE_DELAY", "60"))
+NOTIFICATION_RETRY_MAX_DELAY = int(os.environ.get("NOTIFICATION_RETRY_MAX_DELAY", "3600"))
+
+# Выполненные задачи, не менявшиеся TASK_ARCHIVE_AFTER_DAYS дней, периодически переносятся
+# в архив пачками по TASK_ARCHIVE_BATCH_SIZE, не больше TASK_ARCHIVE_MAX_BATCHES за запуск
+TASK_ARCHIVE_AFTER_DAYS = int(os.environ.get("TASK_ARCHIVE_AFTER_DAYS", "30"))
+TASK_ARCHIVE_BATCH_SIZE = int(os.environ.get("TASK_ARCHIVE_BATCH_SIZE", "1000"))
+TASK_ARCHIVE_MAX_BATCHES = int(os.environ.get("TASK_ARCHIVE_MAX_BATCHES", "100"))
+
+REMINDER_SCHEDULER_ENABLED = os.environ.get("REMINDER_SCHEDULER_ENABLED", "False").lower() in (
+    "true",
+    "1",
+    "yes",
+)
+REMINDER_SCHEDULER_REDIS_URL = os.environ.get("REMINDER_SCHEDULER_REDIS_URL", CELERY_BROKER_URL)
+REMINDER_SCHEDULER_CHANNEL = os.environ.get("REMINDER_SCHEDULER_CHANNEL", "reminders")
+REMINDER_SCHEDULER_LOOKAHEAD = int(os.environ.get("REMINDER_SCHEDULER_LOOKAHEAD", "900"))
+REMINDER_SCHEDULER_REFRESH_INTERVAL = int(
+    os.environ.get("REMINDER_SCHEDULER_REFRESH_INTERVAL", "300")
+)
+
 TELEGRAM_BOT_TOKEN = os.environ.get("TELEGRAM_BOT_TOKEN", "")
+TELEGRAM_API_URL = os.environ.get("TELEGRAM_API_URL", "https://api.telegram.org")
+TELEGRAM_SEND_CONCURRENCY = int(os.environ.get("TELEGRAM_SEND_CONCURRENCY", "16"))
+TELEGRAM_GLOBAL_RATE_LIMIT = float(os.environ.get("TELEGRAM_GLOBAL_RATE_LIMIT", "30"))
+TELEGRAM_PER_CHAT_RATE_LIMIT = float(os.environ.get("TELEGRAM_PER_CHAT_RATE_LIMIT", "1"))
+TELEGRAM_SEND_TIMEOUT = float(os.environ.get("TELEGRAM_SEND_TIMEOUT", "10"))
+# Лимиты выше Telegram считает на бота, а отправляют все процессы воркеров, поэтому ведра
+# хранятся в Redis. С пустым значением каждый процесс ограничивает себя сам, и суммарная
+# скорость растёт с числом процессов (concurrency воркера Celery).
+TELEGRAM_RATE_LIMIT_REDIS_URL = os.environ.get("TELEGRAM_RATE_LIMIT_REDIS_URL", CELERY_BROKER_URL)
@@ -4,6 +4,7 @@ from config.settings.base import *
 DEBUG = True
 
 REST_FRAMEWORK["DEFAULT_RENDERER_CLASSES"] = [
-    "rest_framework.renderers.JSONRenderer",
+    "api.v1.renderers.ORJSONRenderer",
+    "api.v1.renderers.MessagePackRenderer",
     "rest_framework.renderers.BrowsableAPIRenderer",
 ]
@@ -0,0 +1,83 @@
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+
+class SkipForAPIMiddleware:
+    """
+    Запускает BROWSER_MIDDLEWARE (сессии, CSRF, аутентификация, сообщения) только вне
+    API_PATH_PREFIX. API авторизуется заголовком X-Telegram-ID и не использует ни cookie,
+    ни форм, поэтому его запросы идут мимо этих middleware, а админка получает их целиком.
+
+    Вложенные middleware собираются в свою цепочку, а их process_view, process_exception и
+    process_template_response вызываются отсюда: сам Django о них не знает.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.api_prefix = settings.API_PATH_PREFIX
+
+        handler = get_response
+        middlewares = []
+        for path in reversed(settings.BROWSER_MIDDLEWARE):
+            handler = import_string(path)(handler)
+            middlewares.append(handler)
+        self.browser_handler = handler
+        # Порядок как у Django: process_view сверху вниз, остальные хуки снизу вверх
+        self.view_hooks = [
+            m.process_view for m in reversed(middlewares) if hasattr(m, "process_view")
+        ]
+        self.exception_hooks = [
+            m.process_exception for m in middlewares if hasattr(m, "process_exception")
+        ]
+        self.template_response_hooks = [
+            m.process_template_response
+            for m in middlewares
+            if hasattr(m, "process_template_response")
+        ]
+
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def is_api(self, request) -> bool:
+        return request.path_info.startswith(self.api_prefix)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if self.is_api(request):
+            return self.get_response(request)
+        return self.browser_handler(request)
+
+    async def __acall__(self, request):
+        if self.is_api(request):
+            return await self.get_response(request)
+        return await self.browser_handler(request)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if self.is_api(request):
+            return None
+        for hook in self.view_hooks:
+            response = hook(request, view_func, view_args, view_kwargs)
+            if response is not None:
+                return response
+        return None
+
+    def process_exception(self, request, exception):
+        if self.is_api(request):
+            return None
+        for hook in self.exception_hooks:
+            response = hook(request, exception)
+            if response is not None:
+                return response
+        return None
+
+    def process_template_response(self, request, response):
+        if self.is_api(request):
+            return response
+        for hook in self.template_response_hooks:
+            response = hook(request, response)
+        return response
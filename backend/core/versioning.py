@@ -0,0 +1,54 @@
+import logging
+import uuid
+from collections.abc import Iterable
+
+from django.core.cache import cache
+from django.db import transaction
+
+logger = logging.getLogger(__name__)
+
+# Токен версии данных пользователя: меняется при любой записи его задач или категорий.
+# Значения случайные, а не счётчик, поэтому после вытеснения ключа из кеша
+# старый ETag не может случайно совпасть с новым.
+USER_VERSION_TIMEOUT = 24 * 60 * 60
+
+
+def _version_key(telegram_id: int) -> str:
+    return f"user-version:{telegram_id}"
+
+
+def get_user_version(telegram_id: int) -> str | None:
+    key = _version_key(telegram_id)
+    try:
+        version = cache.get(key)
+        if version is None:
+            version = uuid.uuid4().hex
+            if not cache.add(key, version, USER_VERSION_TIMEOUT):
+                version = cache.get(key)
+        return version
+    except Exception as e:
+        logger.warning(f"Failed to read data version for user {telegram_id}: {e}")
+        return None
+
+
+def bump_user_versions(telegram_ids: Iterable[int]) -> None:
+    telegram_ids = set(telegram_ids)
+    if not telegram_ids:
+        return
+
+    def bump():
+        try:
+            cache.set_many(
+                {_version_key(telegram_id): uuid.uuid4().hex for telegram_id in telegram_ids},
+                USER_VERSION_TIMEOUT,
+            )
+        except Exception as e:
+            logger.warning(f"Failed to bump data version for users {telegram_ids}: {e}")
+
+    # Версия меняется только после коммита, иначе параллельное чтение могло бы
+    # закешировать старые данные под новым ETag.
+    transaction.on_commit(bump)
+
+
+def bump_user_version(telegram_id: int) -> None:
+    bump_user_versions([telegram_id])
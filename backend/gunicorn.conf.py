@@ -0,0 +1,41 @@
+# Настройки gunicorn (читаются из рабочего каталога автоматически).
+# Метрики API отдаются не через публичный порт 8000, а отдельным HTTP-сервером мастера
+# на внутреннем порту API_METRICS_PORT, как у Celery-воркера. Счётчики воркеров
+# собираются из файлов в PROMETHEUS_MULTIPROC_DIR.
+import os
+
+API_METRICS_PORT = int(os.environ.get("API_METRICS_PORT", "0"))
+
+if API_METRICS_PORT:
+    # Задаётся до форка, чтобы prometheus_client в воркерах писал значения в файлы
+    os.environ.setdefault("PROMETHEUS_MULTIPROC_DIR", "/tmp/prometheus-api")
+
+
+def on_starting(server):
+    if not API_METRICS_PORT:
+        return
+
+    # Файлы прошлого запуска удаляются, иначе счётчики продолжат старые значения
+    multiproc_dir = os.environ["PROMETHEUS_MULTIPROC_DIR"]
+    os.makedirs(multiproc_dir, exist_ok=True)
+    for name in os.listdir(multiproc_dir):
+        os.remove(os.path.join(multiproc_dir, name))
+
+
+def when_ready(server):
+    if not API_METRICS_PORT:
+        return
+
+    from prometheus_client import CollectorRegistry, multiprocess, start_http_server
+
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    start_http_server(API_METRICS_PORT, registry=registry)
+    server.log.info(f"API metrics on port {API_METRICS_PORT}")
+
+
+def child_exit(server, worker):
+    if API_METRICS_PORT:
+        from prometheus_client import multiprocess
+
+        multiprocess.mark_process_dead(worker.pid)
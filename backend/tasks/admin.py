@@ -1,6 +1,8 @@
+from core.versioning import bump_user_versions
 from django.contrib import admin
 
-from tasks.models import Task
+from tasks.models import ArchivedTask, Task, TaskImportJob
+from tasks.scheduler import publish_reminders
 
 
 @admin.register(Task)
@@ -15,12 +17,26 @@ class TaskAdmin(admin.ModelAdmin):
         "notification_sent",
         "created_at",
     ]
-    list_filter = ["is_completed", "notification_sent", "created_at", "due_date"]
+    list_filter = [
+        "is_completed",
+        "notification_sent",
+        "notification_failed",
+        "created_at",
+        "due_date",
+    ]
     search_fields = ["title", "description", "telegram_id"]
-    readonly_fields = ["id", "created_at", "updated_at"]
+    readonly_fields = [
+        "id",
+        "notification_attempts",
+        "notification_next_attempt_at",
+        "notification_error",
+        "created_at",
+        "updated_at",
+    ]
     ordering = ["-created_at"]
     raw_id_fields = ["category"]
     list_editable = ["is_completed"]
+    actions = ["retry_notifications"]
 
     fieldsets = [
         (None, {"fields": ["id", "title", "description", "telegram_id"]}),
@@ -29,8 +45,64 @@ class TaskAdmin(admin.ModelAdmin):
             "Status",
             {"fields": ["is_completed", "due_date", "notification_sent"]},
         ),
+        (
+            "Notification retries",
+            {
+                "fields": [
+                    "notification_failed",
+                    "notification_attempts",
+                    "notification_next_attempt_at",
+                    "notification_error",
+                ],
+                "classes": ["collapse"],
+            },
+        ),
         ("Timestamps", {"fields": ["created_at", "updated_at"], "classes": ["collapse"]}),
     ]
 
     def get_queryset(self, request):
         return super().get_queryset(request).select_related("category")
+
+    @admin.action(description="Retry failed notifications")
+    def retry_notifications(self, request, queryset):
+        queryset = queryset.filter(notification_sent=False)
+        updated = queryset.update(
+            notification_failed=False,
+            notification_attempts=0,
+            notification_next_attempt_at=None,
+            notification_error="",
+        )
+        publish_reminders(queryset)
+        bump_user_versions(queryset.values_list("telegram_id", flat=True).distinct())
+        self.message_user(request, f"{updated} notification(s) queued for retry")
+
+
+@admin.register(ArchivedTask)
+class ArchivedTaskAdmin(admin.ModelAdmin):
+    list_display = ["id", "title", "telegram_id", "category", "due_date", "archived_at"]
+    list_filter = ["archived_at"]
+    search_fields = ["title", "description", "telegram_id"]
+    ordering = ["-archived_at"]
+    raw_id_fields = ["category"]
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related("category")
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(TaskImportJob)
+class TaskImportJobAdmin(admin.ModelAdmin):
+    list_display = ["id", "telegram_id", "status", "created_at", "finished_at"]
+    list_filter = ["status"]
+    search_fields = ["telegram_id"]
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
@@ -0,0 +1,80 @@
+from datetime import timedelta
+
+from core.versioning import bump_user_versions
+from django.conf import settings
+from django.db import connection
+from django.utils import timezone
+
+# Колонки, которые переносятся из tasks_task в tasks_archivedtask как есть
+ARCHIVED_COLUMNS = (
+    "id",
+    "created_at",
+    "updated_at",
+    "telegram_id",
+    "title",
+    "description",
+    "category_id",
+    "due_date",
+    "is_completed",
+    "notification_sent",
+)
+
+# Пачка выбирается по частичному индексу task_completed_updated_idx и переносится одним
+# оператором: DELETE ... RETURNING отдаёт строки прямо в INSERT архива. Строки, которые
+# сейчас меняет API, пропускаются (SKIP LOCKED) и уйдут в следующий раз.
+ARCHIVE_BATCH_SQL = f"""
+WITH batch AS (
+    SELECT id FROM tasks_task
+    WHERE is_completed AND updated_at < %(cutoff)s
+    ORDER BY updated_at, id
+    LIMIT %(limit)s
+    FOR UPDATE SKIP LOCKED
+), moved AS (
+    DELETE FROM tasks_task AS task USING batch
+    WHERE task.id = batch.id
+    RETURNING {", ".join(f"task.{column}" for column in ARCHIVED_COLUMNS)}
+), archived AS (
+    INSERT INTO tasks_archivedtask ({", ".join(ARCHIVED_COLUMNS)}, archived_at)
+    SELECT {", ".join(ARCHIVED_COLUMNS)}, %(now)s FROM moved
+    RETURNING telegram_id
+)
+SELECT telegram_id, count(*) FROM archived GROUP BY telegram_id
+"""
+
+
+def archive_completed_batch(cutoff, batch_size: int) -> dict[int, int]:
+    """Переносит в архив до batch_size задач, выполненных до cutoff; возвращает число по пользователям."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            ARCHIVE_BATCH_SQL, {"cutoff": cutoff, "limit": batch_size, "now": timezone.now()}
+        )
+        return dict(cursor.fetchall())
+
+
+def archive_completed_tasks(
+    after_days: int | None = None,
+    batch_size: int | None = None,
+    max_batches: int | None = None,
+) -> int:
+    """
+    Переносит в архив выполненные задачи, не менявшиеся after_days дней. Каждая пачка —
+    отдельная короткая транзакция, а за один запуск переносится не больше max_batches
+    пачек (0 — без ограничения), остаток заберёт следующий запуск.
+    """
+    after_days = settings.TASK_ARCHIVE_AFTER_DAYS if after_days is None else after_days
+    batch_size = batch_size or settings.TASK_ARCHIVE_BATCH_SIZE
+    max_batches = settings.TASK_ARCHIVE_MAX_BATCHES if max_batches is None else max_batches
+    cutoff = timezone.now() - timedelta(days=after_days)
+
+    archived = 0
+    batches = 0
+    while not max_batches or batches < max_batches:
+        counts = archive_completed_batch(cutoff, batch_size)
+        batches += 1
+        moved = sum(counts.values())
+        archived += moved
+        # Задачи пропали из обычного списка, поэтому старые ETag пользователей недействительны
+        bump_user_versions(counts)
+        if moved < batch_size:
+            break
+    return archived
@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+
+from tasks.archive import archive_completed_tasks
+
+
+class Command(BaseCommand):
+    help = "Move completed tasks older than TASK_ARCHIVE_AFTER_DAYS to the archive table"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=None,
+            help="Archive tasks completed more than this many days ago",
+        )
+        parser.add_argument("--batch-size", type=int, default=None, help="Tasks per batch")
+        parser.add_argument(
+            "--max-batches",
+            type=int,
+            default=0,
+            help="Stop after this many batches (default: 0, until nothing is left)",
+        )
+
+    def handle(self, *args, **options):
+        count = archive_completed_tasks(
+            after_days=options["days"],
+            batch_size=options["batch_size"],
+            max_batches=options["max_batches"],
+        )
+        self.stdout.write(self.style.SUCCESS(f"Archived {count} task(s)"))
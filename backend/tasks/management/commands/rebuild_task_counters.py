@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from tasks.stats import rebuild_task_counters
+
+
+class Command(BaseCommand):
+    help = "Rebuild per-user task counters used by /tasks/stats/ from the tasks table"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--telegram-id",
+            type=int,
+            default=None,
+            help="Rebuild counters of a single user only",
+        )
+
+    def handle(self, *args, **options):
+        count = rebuild_task_counters(options["telegram_id"])
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {count} task counter(s)"))
@@ -0,0 +1,39 @@
+import asyncio
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from tasks.scheduler import ReminderScheduler
+
+
+class Command(BaseCommand):
+    help = "Run the precise-time reminder scheduler (in-memory timer heap)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--lookahead",
+            type=int,
+            default=settings.REMINDER_SCHEDULER_LOOKAHEAD,
+            help="Seconds of upcoming due dates kept in memory",
+        )
+        parser.add_argument(
+            "--refresh",
+            type=int,
+            default=settings.REMINDER_SCHEDULER_REFRESH_INTERVAL,
+            help="Seconds between full reloads of the look-ahead window",
+        )
+
+    def handle(self, *args, **options):
+        if options["refresh"] >= options["lookahead"]:
+            # Ненулевой код выхода, чтобы сервис в compose не «работал», ничего не делая
+            raise CommandError("--refresh must be shorter than --lookahead")
+
+        scheduler = ReminderScheduler(
+            lookahead=timedelta(seconds=options["lookahead"]),
+            refresh_interval=timedelta(seconds=options["refresh"]),
+            redis_url=settings.REMINDER_SCHEDULER_REDIS_URL,
+            channel=settings.REMINDER_SCHEDULER_CHANNEL,
+        )
+        self.stdout.write(self.style.SUCCESS("Reminder scheduler started"))
+        asyncio.run(scheduler.run())
@@ -5,14 +5,32 @@ from django_celery_beat.models import IntervalSchedule, PeriodicTask
 class Command(BaseCommand):
     help = "Set up periodic tasks for checking due tasks"
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--every",
+            type=int,
+            default=1,
+            help="Sweep interval in minutes (use a longer fallback interval "
+            "when run_reminder_scheduler is deployed)",
+        )
+        parser.add_argument(
+            "--archive-every",
+            type=int,
+            default=1,
+            help="Interval in hours between runs of archive_completed_tasks",
+        )
+
     def handle(self, *args, **options):
+        every = options["every"]
         schedule, created = IntervalSchedule.objects.get_or_create(
-            every=1,
+            every=every,
             period=IntervalSchedule.MINUTES,
         )
 
         if created:
-            self.stdout.write(self.style.SUCCESS("Created interval schedule: every 1 minute"))
+            self.stdout.write(
+                self.style.SUCCESS(f"Created interval schedule: every {every} minute(s)")
+            )
 
         task, created = PeriodicTask.objects.update_or_create(
             name="Check due tasks",
@@ -28,4 +46,22 @@ class Command(BaseCommand):
         else:
             self.stdout.write(self.style.SUCCESS("Updated periodic task: Check due tasks"))
 
+        archive_schedule, _ = IntervalSchedule.objects.get_or_create(
+            every=options["archive_every"],
+            period=IntervalSchedule.HOURS,
+        )
+        task, created = PeriodicTask.objects.update_or_create(
+            name="Archive completed tasks",
+            defaults={
+                "interval": archive_schedule,
+                "task": "tasks.tasks.archive_completed_tasks",
+                "enabled": True,
+            },
+        )
+
+        if created:
+            self.stdout.write(self.style.SUCCESS("Created periodic task: Archive completed tasks"))
+        else:
+            self.stdout.write(self.style.SUCCESS("Updated periodic task: Archive completed tasks"))
+
         self.stdout.write(self.style.SUCCESS("Periodic tasks setup completed!"))
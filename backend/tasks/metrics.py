@@ -0,0 +1,63 @@
+import os
+
+from prometheus_client import (
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    multiprocess,
+    start_http_server,
+)
+
+DELIVERY_LAG = Histogram(
+    "todo_reminder_delivery_lag_seconds",
+    "Time between task due_date and reminder delivery",
+    buckets=(0.5, 1, 2, 5, 10, 30, 60, 120, 300, 600, 1800, 3600, 3 * 3600, 24 * 3600),
+)
+SEND_LATENCY = Histogram(
+    "todo_telegram_send_latency_seconds",
+    "Telegram sendMessage request latency",
+    buckets=(0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+SEND_RESULTS = Counter(
+    "todo_telegram_send",
+    "Telegram sendMessage calls by outcome",
+    ["outcome"],
+)
+REMINDER_RESULTS = Counter(
+    "todo_reminders",
+    "Task reminders by outcome (sent, retry, failed)",
+    ["outcome"],
+)
+SWEEP_DURATION = Histogram(
+    "todo_notification_sweep_duration_seconds",
+    "Duration of a check_due_tasks sweep",
+    buckets=(0.1, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300),
+)
+BACKLOG = Gauge(
+    "todo_notification_backlog",
+    "Due tasks still waiting for a reminder after the last sweep",
+    multiprocess_mode="livemostrecent",
+)
+
+
+def start_metrics_server(port: int) -> None:
+    # В prefork-воркере метрики пишут дочерние процессы, поэтому при заданном
+    # PROMETHEUS_MULTIPROC_DIR они собираются из файлов всех процессов.
+    multiproc_dir = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+    if not multiproc_dir:
+        start_http_server(port)
+        return
+
+    os.makedirs(multiproc_dir, exist_ok=True)
+    for name in os.listdir(multiproc_dir):
+        os.remove(os.path.join(multiproc_dir, name))
+
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    start_http_server(port, registry=registry)
+
+
+def mark_process_dead(pid: int) -> None:
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        multiprocess.mark_process_dead(pid)
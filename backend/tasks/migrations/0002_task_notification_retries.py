@@ -0,0 +1,39 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("tasks", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="task",
+            name="notification_attempts",
+            field=models.PositiveSmallIntegerField(
+                default=0, help_text="Number of failed notification attempts"
+            ),
+        ),
+        migrations.AddField(
+            model_name="task",
+            name="notification_next_attempt_at",
+            field=models.DateTimeField(
+                blank=True, help_text="Earliest time of the next notification attempt", null=True
+            ),
+        ),
+        migrations.AddField(
+            model_name="task",
+            name="notification_failed",
+            field=models.BooleanField(
+                default=False,
+                help_text="Whether notification permanently failed and will not be retried",
+            ),
+        ),
+        migrations.AddField(
+            model_name="task",
+            name="notification_error",
+            field=models.CharField(
+                blank=True, default="", help_text="Last notification error", max_length=255
+            ),
+        ),
+    ]
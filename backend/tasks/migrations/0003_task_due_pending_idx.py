@@ -0,0 +1,30 @@
+from django.contrib.postgres.operations import AddIndexConcurrently, RemoveIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ("tasks", "0002_task_notification_retries"),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name="task",
+            index=models.Index(
+                condition=models.Q(
+                    ("due_date__isnull", False),
+                    ("is_completed", False),
+                    ("notification_failed", False),
+                    ("notification_sent", False),
+                ),
+                fields=["due_date", "id"],
+                name="task_due_pending_idx",
+            ),
+        ),
+        RemoveIndexConcurrently(
+            model_name="task",
+            name="tasks_task_due_dat_ff6af5_idx",
+        ),
+    ]
@@ -0,0 +1,25 @@
+from django.contrib.postgres.operations import AddIndexConcurrently, RemoveIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ("tasks", "0004_task_user_created_idx"),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name="task",
+            index=models.Index(
+                fields=["telegram_id", "is_completed", "-created_at", "-id"],
+                include=["title", "due_date", "category"],
+                name="task_user_status_idx",
+            ),
+        ),
+        RemoveIndexConcurrently(
+            model_name="task",
+            name="tasks_task_telegra_2facc3_idx",
+        ),
+    ]
@@ -0,0 +1,126 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+# Дельта счётчиков из transition tables оператора: +1 за строку в new_rows, -1 за строку
+# в old_rows. Нулевые дельты отбрасываются, поэтому UPDATE, не меняющий telegram_id,
+# category_id или is_completed (например, отметки об уведомлениях), ничего не пишет.
+# Опустевшие счётчики удаляются, в том числе счётчик удаляемой категории после того,
+# как Django обнулил category у её задач (SET_NULL).
+APPLY_DELTA_SQL = """
+    INSERT INTO tasks_taskcounter (telegram_id, category_id, total, completed)
+    SELECT telegram_id, category_id, sum(total), sum(completed)
+    FROM ({rows}) AS delta
+    GROUP BY telegram_id, category_id
+    HAVING sum(total) <> 0 OR sum(completed) <> 0
+    ORDER BY telegram_id, category_id
+    ON CONFLICT (telegram_id, category_id) DO UPDATE
+    SET total = tasks_taskcounter.total + EXCLUDED.total,
+        completed = tasks_taskcounter.completed + EXCLUDED.completed;
+"""
+CLEANUP_SQL = """
+    DELETE FROM tasks_taskcounter
+    WHERE total = 0 AND telegram_id IN (SELECT telegram_id FROM old_rows);
+"""
+NEW_ROWS = (
+    "SELECT telegram_id, category_id, 1 AS total, is_completed::int AS completed FROM new_rows"
+)
+OLD_ROWS = (
+    "SELECT telegram_id, category_id, -1 AS total, -is_completed::int AS completed FROM old_rows"
+)
+
+TRIGGERS = {
+    "insert": ("INSERT", "NEW TABLE AS new_rows", APPLY_DELTA_SQL.format(rows=NEW_ROWS)),
+    "update": (
+        "UPDATE",
+        "OLD TABLE AS old_rows NEW TABLE AS new_rows",
+        APPLY_DELTA_SQL.format(rows=f"{NEW_ROWS} UNION ALL {OLD_ROWS}") + CLEANUP_SQL,
+    ),
+    "delete": (
+        "DELETE",
+        "OLD TABLE AS old_rows",
+        APPLY_DELTA_SQL.format(rows=OLD_ROWS) + CLEANUP_SQL,
+    ),
+}
+
+CREATE_TRIGGERS_SQL = [
+    f"""
+    CREATE FUNCTION tasks_task_counters_{name}() RETURNS trigger LANGUAGE plpgsql AS $$
+    BEGIN
+        {body}
+        RETURN NULL;
+    END;
+    $$;
+    CREATE TRIGGER tasks_task_counters_{name}
+    AFTER {event} ON tasks_task REFERENCING {transition}
+    FOR EACH STATEMENT EXECUTE FUNCTION tasks_task_counters_{name}();
+    """
+    for name, (event, transition, body) in TRIGGERS.items()
+]
+DROP_TRIGGERS_SQL = [
+    f"""
+    DROP TRIGGER IF EXISTS tasks_task_counters_{name} ON tasks_task;
+    DROP FUNCTION IF EXISTS tasks_task_counters_{name}();
+    """
+    for name in TRIGGERS
+]
+
+# CREATE TRIGGER блокирует запись в tasks_task до конца миграции,
+# поэтому заполнение ниже видит все строки и не пересекается с триггерами.
+BACKFILL_SQL = """
+INSERT INTO tasks_taskcounter (telegram_id, category_id, total, completed)
+SELECT telegram_id, category_id, count(*), count(*) FILTER (WHERE is_completed)
+FROM tasks_task
+GROUP BY telegram_id, category_id;
+"""
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("categories", "0002_category_user_created_idx"),
+        ("tasks", "0005_task_user_status_idx"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TaskCounter",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True, primary_key=True, serialize=False, verbose_name="ID"
+                    ),
+                ),
+                (
+                    "telegram_id",
+                    models.BigIntegerField(help_text="Telegram user ID who owns the tasks"),
+                ),
+                ("total", models.IntegerField(default=0)),
+                ("completed", models.IntegerField(default=0)),
+                (
+                    "category",
+                    models.ForeignKey(
+                        blank=True,
+                        help_text="Category of the counted tasks, empty for tasks without category",
+                        db_constraint=False,
+                        null=True,
+                        on_delete=django.db.models.deletion.DO_NOTHING,
+                        related_name="+",
+                        to="categories.category",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Task counter",
+                "verbose_name_plural": "Task counters",
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("telegram_id", "category"),
+                        name="task_counter_user_category_uniq",
+                        nulls_distinct=False,
+                    )
+                ],
+            },
+        ),
+        migrations.RunSQL(CREATE_TRIGGERS_SQL, reverse_sql=DROP_TRIGGERS_SQL),
+        migrations.RunSQL(BACKFILL_SQL, reverse_sql=migrations.RunSQL.noop),
+    ]
@@ -0,0 +1,21 @@
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ("tasks", "0006_taskcounter"),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name="task",
+            index=models.Index(
+                condition=models.Q(("due_date__isnull", False), ("is_completed", False)),
+                fields=["telegram_id", "due_date"],
+                name="task_user_open_due_idx",
+            ),
+        ),
+    ]
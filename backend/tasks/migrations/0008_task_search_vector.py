@@ -0,0 +1,46 @@
+import django.contrib.postgres.search
+from django.contrib.postgres.operations import BtreeGinExtension, TrigramExtension
+from django.db import migrations
+
+# Вектор пишет триггер BEFORE INSERT/UPDATE, поэтому он верен при любой записи, включая
+# bulk_create и update(). Обычная колонка с NULL добавляется без перезаписи таблицы,
+# в отличие от хранимой генерируемой, которая держит ACCESS EXCLUSIVE на всё время
+# пересчёта. Существующие строки заполняются пачками в 0009.
+SEARCH_VECTOR_SQL = (
+    "setweight(to_tsvector('russian', coalesce({row}.title, '')), 'A')"
+    " || setweight(to_tsvector('russian', coalesce({row}.description, '')), 'B')"
+)
+
+CREATE_TRIGGER_SQL = f"""
+CREATE FUNCTION tasks_task_search_vector() RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    NEW.search_vector := {SEARCH_VECTOR_SQL.format(row="NEW")};
+    RETURN NEW;
+END;
+$$;
+CREATE TRIGGER tasks_task_search_vector
+BEFORE INSERT OR UPDATE OF title, description, search_vector ON tasks_task
+FOR EACH ROW EXECUTE FUNCTION tasks_task_search_vector();
+"""
+DROP_TRIGGER_SQL = """
+DROP TRIGGER IF EXISTS tasks_task_search_vector ON tasks_task;
+DROP FUNCTION IF EXISTS tasks_task_search_vector();
+"""
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("tasks", "0007_task_user_open_due_idx"),
+    ]
+
+    operations = [
+        # btree_gin нужен для telegram_id в GIN-индексах поиска, pg_trgm — для триграмм
+        BtreeGinExtension(),
+        TrigramExtension(),
+        migrations.AddField(
+            model_name="task",
+            name="search_vector",
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunSQL(CREATE_TRIGGER_SQL, DROP_TRIGGER_SQL),
+    ]
@@ -0,0 +1,51 @@
+import django.contrib.postgres.indexes
+import django.db.models.functions.text
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models, transaction
+
+BACKFILL_BATCH_SIZE = 5000
+
+
+def backfill_search_vector(apps, schema_editor):
+    # Пачки по первичному ключу, каждая в своей короткой транзакции: блокируются только
+    # строки пачки. Значение вектора подставляет триггер из 0008 (UPDATE OF search_vector).
+    Task = apps.get_model("tasks", "Task")
+    using = schema_editor.connection.alias
+    queryset = Task.objects.using(using).order_by("pk")
+    last_pk = None
+    while True:
+        batch = queryset.filter(pk__gt=last_pk) if last_pk is not None else queryset
+        pks = list(batch.values_list("pk", flat=True)[:BACKFILL_BATCH_SIZE])
+        if not pks:
+            return
+        with transaction.atomic(using=using):
+            Task.objects.using(using).filter(pk__in=pks).update(search_vector=None)
+        last_pk = pks[-1]
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ("tasks", "0008_task_search_vector"),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_search_vector, migrations.RunPython.noop, elidable=True),
+        AddIndexConcurrently(
+            model_name="task",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["telegram_id", "search_vector"], name="task_user_search_idx"
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="task",
+            index=django.contrib.postgres.indexes.GinIndex(
+                models.F("telegram_id"),
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Upper("title"), name="gin_trgm_ops"
+                ),
+                name="task_user_title_trgm_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,103 @@
+import django.db.models.deletion
+import django_ulid.models
+import ulid.api.api
+from django.db import migrations, models
+
+# Архив ведётся теми же функциями счётчиков, что и tasks_task (миграция 0006): перенос
+# задачи в архив вычитает её из счётчиков и тут же добавляет обратно, а удаление категории
+# (SET_NULL) или задачи из архива меняет их так же, как для обычных задач.
+TRIGGERS = {"insert": "INSERT", "update": "UPDATE", "delete": "DELETE"}
+TRANSITIONS = {
+    "insert": "NEW TABLE AS new_rows",
+    "update": "OLD TABLE AS old_rows NEW TABLE AS new_rows",
+    "delete": "OLD TABLE AS old_rows",
+}
+
+CREATE_TRIGGERS_SQL = [
+    f"""
+    CREATE TRIGGER tasks_archivedtask_counters_{name}
+    AFTER {event} ON tasks_archivedtask REFERENCING {TRANSITIONS[name]}
+    FOR EACH STATEMENT EXECUTE FUNCTION tasks_task_counters_{name}();
+    """
+    for name, event in TRIGGERS.items()
+]
+DROP_TRIGGERS_SQL = [
+    f"DROP TRIGGER IF EXISTS tasks_archivedtask_counters_{name} ON tasks_archivedtask;"
+    for name in TRIGGERS
+]
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("categories", "0002_category_user_created_idx"),
+        ("tasks", "0009_task_search_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ArchivedTask",
+            fields=[
+                (
+                    "id",
+                    django_ulid.models.ULIDField(
+                        default=ulid.api.api.Api.new,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "telegram_id",
+                    models.BigIntegerField(help_text="Telegram user ID who owns this task"),
+                ),
+                ("title", models.CharField(help_text="Task title", max_length=255)),
+                (
+                    "description",
+                    models.TextField(blank=True, default="", help_text="Task description"),
+                ),
+                (
+                    "due_date",
+                    models.DateTimeField(blank=True, help_text="Due date for the task", null=True),
+                ),
+                (
+                    "is_completed",
+                    models.BooleanField(default=True, help_text="Whether the task is completed"),
+                ),
+                (
+                    "notification_sent",
+                    models.BooleanField(
+                        default=False, help_text="Whether notification was sent for due date"
+                    ),
+                ),
+                (
+                    "archived_at",
+                    models.DateTimeField(help_text="When the task was moved to the archive"),
+                ),
+                (
+                    "category",
+                    models.ForeignKey(
+                        blank=True,
+                        help_text="Optional category for this task",
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="archived_tasks",
+                        to="categories.category",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Archived task",
+                "verbose_name_plural": "Archived tasks",
+                "ordering": ["-created_at"],
+                "indexes": [
+                    models.Index(
+                        fields=["telegram_id", "created_at", "id"],
+                        name="archived_user_created_idx",
+                    )
+                ],
+            },
+        ),
+        migrations.RunSQL(CREATE_TRIGGERS_SQL, reverse_sql=DROP_TRIGGERS_SQL),
+    ]
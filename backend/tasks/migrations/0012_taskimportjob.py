@@ -0,0 +1,67 @@
+import django_ulid.models
+import ulid.api.api
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("tasks", "0011_task_completed_updated_idx"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TaskImportJob",
+            fields=[
+                (
+                    "id",
+                    django_ulid.models.ULIDField(
+                        default=ulid.api.api.Api.new,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "telegram_id",
+                    models.BigIntegerField(help_text="Telegram user ID who started the import"),
+                ),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("pending", "Pending"),
+                            ("running", "Running"),
+                            ("done", "Done"),
+                            ("failed", "Failed"),
+                        ],
+                        default="pending",
+                        help_text="Import job state",
+                        max_length=16,
+                    ),
+                ),
+                (
+                    "file",
+                    models.FileField(
+                        blank=True,
+                        help_text="Uploaded NDJSON, removed after the import",
+                        upload_to="task_imports/",
+                    ),
+                ),
+                (
+                    "result",
+                    models.JSONField(blank=True, help_text="Import summary or error", null=True),
+                ),
+                (
+                    "finished_at",
+                    models.DateTimeField(blank=True, help_text="When the job finished", null=True),
+                ),
+            ],
+            options={
+                "verbose_name": "Task import job",
+                "verbose_name_plural": "Task import jobs",
+                "ordering": ["-created_at"],
+            },
+        ),
+    ]
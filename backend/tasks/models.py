@@ -1,6 +1,13 @@
 from categories.models import Category
 from core.models import BaseModel
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
+from django.db.models import F
+from django.db.models.functions import Upper
+
+# Конфигурация полнотекстового поиска: русская морфология, латиница стеммится как английская
+SEARCH_CONFIG = "russian"
 
 
 class Task(BaseModel):
@@ -40,16 +47,194 @@ class Task(BaseModel):
         default=False,
         help_text="Whether notification was sent for due date",
     )
+    notification_attempts = models.PositiveSmallIntegerField(
+        default=0,
+        help_text="Number of failed notification attempts",
+    )
+    notification_next_attempt_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text="Earliest time of the next notification attempt",
+    )
+    notification_failed = models.BooleanField(
+        default=False,
+        help_text="Whether notification permanently failed and will not be retried",
+    )
+    notification_error = models.CharField(
+        max_length=255,
+        blank=True,
+        default="",
+        help_text="Last notification error",
+    )
+    # Поисковый вектор (title с весом A, description с весом B, конфигурация SEARCH_CONFIG)
+    # пишет триггер tasks_task_search_vector из миграции 0008 при любой записи, включая
+    # bulk_create и update(); значение, переданное Django, он заменяет.
+    search_vector = SearchVectorField(null=True, editable=False)
 
     class Meta:
         verbose_name = "Task"
         verbose_name_plural = "Tasks"
         ordering = ["-created_at"]
         indexes = [
-            models.Index(fields=["telegram_id", "is_completed"]),
-            models.Index(fields=["due_date", "notification_sent"]),
+            # Покрывающий индекс списка задач: фильтр по пользователю и статусу, порядок
+            # is_completed, -created_at, а колонки списка в INCLUDE дают index-only scan.
+            models.Index(
+                fields=["telegram_id", "is_completed", "-created_at", "-id"],
+                include=["title", "due_date", "category"],
+                name="task_user_status_idx",
+            ),
+            models.Index(fields=["telegram_id", "created_at", "id"], name="task_user_created_idx"),
+            # Частичный индекс для свипа уведомлений: в нём только ожидающие напоминания,
+            # поэтому он не растёт вместе с историей выполненных и уже отправленных задач.
+            models.Index(
+                fields=["due_date", "id"],
+                condition=models.Q(
+                    due_date__isnull=False,
+                    is_completed=False,
+                    notification_sent=False,
+                    notification_failed=False,
+                ),
+                name="task_due_pending_idx",
+            ),
+            # Просроченные задачи пользователя для /tasks/stats/: диапазон по due_date
+            # среди невыполненных, без обхода всей истории.
+            models.Index(
+                fields=["telegram_id", "due_date"],
+                condition=models.Q(due_date__isnull=False, is_completed=False),
+                name="task_user_open_due_idx",
+            ),
+            # Поиск ?q= по задачам пользователя. telegram_id входит в GIN-индексы (btree_gin),
+            # чтобы слово, частое у других пользователей, не раздувало выборку.
+            GinIndex(fields=["telegram_id", "search_vector"], name="task_user_search_idx"),
+            # Триграммы для частей слов: title__icontains сравнивает UPPER(title)
+            GinIndex(
+                F("telegram_id"),
+                OpClass(Upper("title"), name="gin_trgm_ops"),
+                name="task_user_title_trgm_idx",
+            ),
+            # Кандидаты в архив: выполненные задачи по давности последнего изменения
+            models.Index(
+                fields=["updated_at", "id"],
+                condition=models.Q(is_completed=True),
+                name="task_completed_updated_idx",
+            ),
         ]
 
     def __str__(self):
         status = "✓" if self.is_completed else "○"
         return f"{status} {self.title} (user: {self.telegram_id})"
+
+
+class ArchivedTask(BaseModel):
+    """
+    Выполненные задачи старше TASK_ARCHIVE_AFTER_DAYS, перенесённые из tasks_task
+    (см. tasks.archive). Горячая таблица и её индексы содержат только открытые и недавние
+    задачи, а архив читается API только по явному ?archived=true. Счётчики TaskCounter
+    ведутся теми же триггерами, что и у tasks_task, поэтому перенос их не меняет.
+    """
+
+    telegram_id = models.BigIntegerField(help_text="Telegram user ID who owns this task")
+    title = models.CharField(max_length=255, help_text="Task title")
+    description = models.TextField(blank=True, default="", help_text="Task description")
+    category = models.ForeignKey(
+        Category,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="archived_tasks",
+        help_text="Optional category for this task",
+    )
+    due_date = models.DateTimeField(null=True, blank=True, help_text="Due date for the task")
+    is_completed = models.BooleanField(default=True, help_text="Whether the task is completed")
+    notification_sent = models.BooleanField(
+        default=False,
+        help_text="Whether notification was sent for due date",
+    )
+    archived_at = models.DateTimeField(help_text="When the task was moved to the archive")
+
+    class Meta:
+        verbose_name = "Archived task"
+        verbose_name_plural = "Archived tasks"
+        ordering = ["-created_at"]
+        indexes = [
+            models.Index(
+                fields=["telegram_id", "created_at", "id"], name="archived_user_created_idx"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.title} (user: {self.telegram_id}, archived)"
+
+
+class TaskImportJob(BaseModel):
+    """
+    Загрузка задач из NDJSON (POST /tasks/import/). Тело запроса сохраняется в хранилище
+    файлов, а разбирает его задача Celery import_tasks_job, так что длинная загрузка не
+    занимает воркер API. Итог ({"created", "skipped", "failed", "errors"}) пишется в result.
+    """
+
+    class Status(models.TextChoices):
+        PENDING = "pending", "Pending"
+        RUNNING = "running", "Running"
+        DONE = "done", "Done"
+        FAILED = "failed", "Failed"
+
+    telegram_id = models.BigIntegerField(help_text="Telegram user ID who started the import")
+    status = models.CharField(
+        max_length=16,
+        choices=Status.choices,
+        default=Status.PENDING,
+        help_text="Import job state",
+    )
+    file = models.FileField(
+        upload_to="task_imports/",
+        blank=True,
+        help_text="Uploaded NDJSON, removed after the import",
+    )
+    result = models.JSONField(null=True, blank=True, help_text="Import summary or error")
+    finished_at = models.DateTimeField(null=True, blank=True, help_text="When the job finished")
+
+    class Meta:
+        verbose_name = "Task import job"
+        verbose_name_plural = "Task import jobs"
+        ordering = ["-created_at"]
+
+    def __str__(self):
+        return f"Import {self.id} ({self.status}, user: {self.telegram_id})"
+
+
+class TaskCounter(models.Model):
+    """
+    Счётчики задач пользователя по категориям. Обновляются триггером PostgreSQL
+    в той же транзакции, что и запись в tasks_task (см. миграцию 0006), поэтому
+    учитывают и queryset.update()/bulk_create, которые не шлют сигналы.
+    """
+
+    telegram_id = models.BigIntegerField(help_text="Telegram user ID who owns the tasks")
+    # Без каскада и FK-ограничения: при удалении категории Django сначала удалил бы счётчик,
+    # а затем SET_NULL у задач заставил бы триггер создать его заново.
+    category = models.ForeignKey(
+        Category,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        null=True,
+        blank=True,
+        related_name="+",
+        help_text="Category of the counted tasks, empty for tasks without category",
+    )
+    total = models.IntegerField(default=0)
+    completed = models.IntegerField(default=0)
+
+    class Meta:
+        verbose_name = "Task counter"
+        verbose_name_plural = "Task counters"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["telegram_id", "category"],
+                nulls_distinct=False,
+                name="task_counter_user_category_uniq",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.telegram_id}/{self.category_id}: {self.completed}/{self.total}"
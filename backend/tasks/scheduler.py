@@ -0,0 +1,191 @@
+import asyncio
+import heapq
+import json
+import logging
+from datetime import datetime, timedelta
+
+import redis
+import redis.asyncio as aioredis
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+logger = logging.getLogger(__name__)
+
+_publisher: redis.Redis | None = None
+
+
+def _get_publisher() -> redis.Redis:
+    global _publisher
+    if _publisher is None:
+        _publisher = redis.Redis.from_url(settings.REMINDER_SCHEDULER_REDIS_URL)
+    return _publisher
+
+
+def notification_fire_at(
+    due_date: datetime | None, next_attempt_at: datetime | None
+) -> datetime | None:
+    if due_date is None or next_attempt_at is None:
+        return due_date
+    return max(due_date, next_attempt_at)
+
+
+def _reminder_payload(task) -> str:
+    fire_at = notification_fire_at(task.due_date, task.notification_next_attempt_at)
+    pending = not (task.is_completed or task.notification_sent or task.notification_failed)
+    return json.dumps(
+        {
+            "id": str(task.id),
+            "due_date": fire_at.isoformat() if pending and fire_at else None,
+        }
+    )
+
+
+def publish_reminders(tasks) -> None:
+    if not settings.REMINDER_SCHEDULER_ENABLED:
+        return
+
+    try:
+        with _get_publisher().pipeline(transaction=False) as pipe:
+            for task in tasks:
+                pipe.publish(settings.REMINDER_SCHEDULER_CHANNEL, _reminder_payload(task))
+            pipe.execute()
+    except redis.RedisError as e:
+        # Планировщик подхватит задачи при следующей полной перезагрузке окна
+        logger.warning(f"Failed to publish reminders: {e}")
+
+
+def publish_reminder(task) -> None:
+    publish_reminders([task])
+
+
+class ReminderScheduler:
+    def __init__(
+        self,
+        lookahead: timedelta,
+        refresh_interval: timedelta,
+        redis_url: str,
+        channel: str,
+    ):
+        self.lookahead = lookahead
+        self.refresh_interval = refresh_interval
+        self.redis_url = redis_url
+        self.channel = channel
+        self._heap: list[tuple[datetime, str]] = []
+        self._scheduled: dict[str, datetime] = {}
+        self._window_end = timezone.now()
+        self._wakeup = asyncio.Event()
+
+    def schedule(self, task_id: str, due_date: datetime | None) -> None:
+        # Старые записи в куче не удаляются: они отбрасываются при извлечении,
+        # если не совпадают с актуальным значением в self._scheduled.
+        if due_date is None or due_date > self._window_end:
+            self._scheduled.pop(task_id, None)
+            return
+
+        self._scheduled[task_id] = due_date
+        heapq.heappush(self._heap, (due_date, task_id))
+        if self._heap[0] == (due_date, task_id):
+            self._wakeup.set()
+
+    async def reload(self) -> None:
+        from tasks.tasks import pending_notifications_queryset
+
+        window_end = timezone.now() + self.lookahead
+        queryset = (
+            pending_notifications_queryset()
+            .filter(due_date__lte=window_end)
+            .exclude(notification_next_attempt_at__gt=window_end)
+            .values_list("id", "due_date", "notification_next_attempt_at")
+        )
+        rows = [
+            (str(task_id), notification_fire_at(due_date, next_attempt_at))
+            async for task_id, due_date, next_attempt_at in queryset
+        ]
+
+        self._window_end = window_end
+        self._scheduled = dict(rows)
+        self._heap = [(due_date, task_id) for task_id, due_date in rows]
+        heapq.heapify(self._heap)
+        self._wakeup.set()
+        logger.info(f"Loaded {len(rows)} reminders until {window_end.isoformat()}")
+
+    async def _safe_reload(self) -> None:
+        try:
+            await self.reload()
+        except Exception:
+            logger.exception("Failed to reload reminders")
+            await sync_to_async(close_old_connections)()
+
+    def _pop_due(self, now: datetime) -> list[str]:
+        due_ids = []
+        while self._heap and self._heap[0][0] <= now:
+            due_date, task_id = heapq.heappop(self._heap)
+            if self._scheduled.get(task_id) == due_date:
+                del self._scheduled[task_id]
+                due_ids.append(task_id)
+        return due_ids
+
+    async def _dispatch(self, task_ids: list[str]) -> None:
+        from tasks.tasks import send_due_notifications
+
+        batch_size = settings.NOTIFICATION_BATCH_SIZE
+        for i in range(0, len(task_ids), batch_size):
+            await asyncio.to_thread(send_due_notifications.delay, task_ids[i : i + batch_size])
+        logger.info(f"Dispatched {len(task_ids)} reminders")
+
+    async def _run_timers(self) -> None:
+        while True:
+            self._wakeup.clear()
+            now = timezone.now()
+            due_ids = self._pop_due(now)
+            if due_ids:
+                try:
+                    await self._dispatch(due_ids)
+                except Exception:
+                    logger.exception("Failed to dispatch reminders")
+
+            timeout = (self._heap[0][0] - timezone.now()).total_seconds() if self._heap else None
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except TimeoutError:
+                pass
+
+    async def _refresh_periodically(self) -> None:
+        while True:
+            await asyncio.sleep(self.refresh_interval.total_seconds())
+            await self._safe_reload()
+
+    async def _listen(self) -> None:
+        while True:
+            client = aioredis.Redis.from_url(self.redis_url)
+            try:
+                async with client.pubsub() as pubsub:
+                    await pubsub.subscribe(self.channel)
+                    # Пока подписки не было, обновления могли потеряться
+                    await self._safe_reload()
+                    async for message in pubsub.listen():
+                        if message["type"] != "message":
+                            continue
+                        # Битое сообщение пропускается, иначе оно роняет весь планировщик
+                        try:
+                            data = json.loads(message["data"])
+                            due_date = (
+                                parse_datetime(data["due_date"]) if data["due_date"] else None
+                            )
+                            task_id = data["id"]
+                        except (ValueError, KeyError, TypeError) as e:
+                            logger.warning(f"Skipping malformed reminder {message['data']!r}: {e}")
+                            continue
+                        self.schedule(task_id, due_date)
+            except (redis.RedisError, OSError) as e:
+                logger.warning(f"Reminder channel disconnected: {e}")
+                await asyncio.sleep(1)
+            finally:
+                await client.aclose()
+
+    async def run(self) -> None:
+        await self.reload()
+        await asyncio.gather(self._run_timers(), self._refresh_periodically(), self._listen())
@@ -0,0 +1,89 @@
+from collections import defaultdict
+
+from django.db import connection, transaction
+from django.db.models import Count, F, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from tasks.models import ArchivedTask, Task, TaskCounter
+
+
+def _counts(total: int, completed: int) -> dict:
+    return {"total": total, "open": total - completed, "completed": completed}
+
+
+def get_task_stats(telegram_id: int, now=None) -> dict:
+    # Итоги складываются из счётчиков (по строке на категорию), а не из COUNT(*) по задачам.
+    # Просрочка зависит от времени, поэтому считается по частичному индексу
+    # task_user_open_due_idx: читаются только невыполненные задачи со сроком в прошлом.
+    now = now or timezone.now()
+    counters = (
+        TaskCounter.objects.filter(telegram_id=telegram_id)
+        .exclude(total=0)
+        .select_related("category")
+        .order_by("category__name")
+    )
+    overdue = Task.objects.filter(
+        telegram_id=telegram_id, is_completed=False, due_date__lt=now
+    ).count()
+
+    total = completed = 0
+    categories = []
+    for counter in counters:
+        total += counter.total
+        completed += counter.completed
+        categories.append(
+            {
+                "id": str(counter.category_id) if counter.category_id else None,
+                "name": counter.category.name if counter.category else None,
+                **_counts(counter.total, counter.completed),
+            }
+        )
+
+    return {**_counts(total, completed), "overdue": overdue, "categories": categories}
+
+
+def annotate_task_counts(categories):
+    """Добавляет к категориям task_count и open_task_count из TaskCounter тем же запросом."""
+    # Счётчик ищется по уникальному индексу (telegram_id, category), по строке на категорию
+    counter = TaskCounter.objects.filter(
+        telegram_id=OuterRef("telegram_id"), category=OuterRef("pk")
+    )
+    return categories.annotate(
+        task_count=Coalesce(Subquery(counter.values("total")[:1]), Value(0)),
+        open_task_count=Coalesce(
+            Subquery(counter.annotate(open=F("total") - F("completed")).values("open")[:1]),
+            Value(0),
+        ),
+    )
+
+
+def rebuild_task_counters(telegram_id: int | None = None) -> int:
+    counters = TaskCounter.objects.all()
+    # Счётчики ведутся и по архиву (триггеры из миграции 0010), поэтому считаются обе таблицы
+    sources = [Task.objects.order_by(), ArchivedTask.objects.order_by()]
+    if telegram_id is not None:
+        counters = counters.filter(telegram_id=telegram_id)
+        sources = [tasks.filter(telegram_id=telegram_id) for tasks in sources]
+
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            # SHARE не даёт писать в задачи, пока счётчики пересчитываются, чтение не блокирует
+            cursor.execute("LOCK TABLE tasks_task, tasks_archivedtask IN SHARE MODE")
+        counters.delete()
+        totals = defaultdict(lambda: [0, 0])
+        for tasks in sources:
+            rows = tasks.values_list("telegram_id", "category_id").annotate(
+                total=Count("id"), completed=Count("id", filter=Q(is_completed=True))
+            )
+            for user, category_id, total, completed in rows.iterator():
+                totals[user, category_id][0] += total
+                totals[user, category_id][1] += completed
+        created = TaskCounter.objects.bulk_create(
+            (
+                TaskCounter(telegram_id=user, category_id=category_id, total=total, completed=done)
+                for (user, category_id), (total, done) in totals.items()
+            ),
+            batch_size=1000,
+        )
+    return len(created)
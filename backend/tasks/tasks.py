@@ -1,71 +1,327 @@
+import html
 import logging
+from collections import Counter, defaultdict
+from datetime import timedelta
 
-import httpx
 from celery import shared_task
+from core.versioning import bump_user_versions
 from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
 from django.utils import timezone
 
+from tasks import metrics
+from tasks.archive import archive_completed_tasks as archive_completed
+from tasks.scheduler import publish_reminders
+from tasks.telegram import OutboundMessage, TelegramAPIError, get_sender, run_async
+
 logger = logging.getLogger(__name__)
 
+TELEGRAM_MESSAGE_LIMIT = 4096
+
+
+def pending_notifications_queryset():
+    from tasks.models import Task
+
+    return Task.objects.filter(
+        is_completed=False,
+        notification_sent=False,
+        notification_failed=False,
+    )
+
+
+def due_tasks_queryset(now):
+    return pending_notifications_queryset().filter(
+        Q(notification_next_attempt_at__isnull=True) | Q(notification_next_attempt_at__lte=now),
+        due_date__lte=now,
+    )
+
+
+def _for_claim(queryset):
+    return queryset.select_related("category").select_for_update(skip_locked=True, of=("self",))
+
+
+def due_batch_queryset(now, batch_size: int, after: tuple | None = None):
+    # Параллельные свипы пропускают занятые строки (SKIP LOCKED) и арендованные задачи
+    # и забирают следующую пачку, поэтому одна задача не уходит двум воркерам сразу.
+    queryset = due_tasks_queryset(now)
+    if after is not None:
+        due_date, task_id = after
+        queryset = queryset.filter(Q(due_date__gt=due_date) | Q(due_date=due_date, id__gt=task_id))
+    return _for_claim(queryset).order_by("due_date", "id")[:batch_size]
+
+
+def claim_lease_seconds(tasks) -> float:
+    """
+    Длительность аренды пачки: время отправки её задач по одной с лимитами Telegram плюс
+    запас NOTIFICATION_CLAIM_LEASE на сеть и ответы 429. Дайджесты и ведра без ограничения
+    отправку только ускоряют, так что оценка сверху.
+    """
+    send_time = 0.0
+    if settings.TELEGRAM_GLOBAL_RATE_LIMIT > 0:
+        send_time = len(tasks) / settings.TELEGRAM_GLOBAL_RATE_LIMIT
+    if settings.TELEGRAM_PER_CHAT_RATE_LIMIT > 0:
+        # 500 задач одного чата при 1 сообщении в секунду отправляются 500 секунд
+        per_chat = max(Counter(task.telegram_id for task in tasks).values())
+        send_time = max(send_time, per_chat / settings.TELEGRAM_PER_CHAT_RATE_LIMIT)
+    return settings.NOTIFICATION_CLAIM_LEASE + send_time
+
+
+def lease_tasks(queryset) -> list:
+    """
+    Забирает задачи на отправку. Строки блокируются только на время короткой транзакции,
+    в которой им ставится аренда: notification_next_attempt_at сдвигается вперёд на
+    claim_lease_seconds, и до её конца due_tasks_queryset их не выбирает.
+    Отправка в Telegram идёт уже без блокировок и открытой транзакции, так что запись задач
+    через API её не ждёт; если воркер упал, задачи снова станут due после аренды.
+    """
+    from tasks.models import Task
+
+    with transaction.atomic():
+        tasks = list(queryset)
+        if tasks:
+            lease_until = timezone.now() + timedelta(seconds=claim_lease_seconds(tasks))
+            Task.objects.filter(id__in=[task.id for task in tasks]).update(
+                notification_next_attempt_at=lease_until
+            )
+    return tasks
+
+
+def claim_due_batch(now, batch_size: int, after: tuple | None = None) -> list:
+    return lease_tasks(due_batch_queryset(now, batch_size, after=after))
+
+
+def schedule_retry(task, error: Exception, now) -> None:
+    task.notification_attempts += 1
+    task.notification_error = str(error)[:255]
+
+    permanent = isinstance(error, TelegramAPIError) and error.is_permanent
+    if permanent or task.notification_attempts >= settings.NOTIFICATION_MAX_ATTEMPTS:
+        task.notification_failed = True
+        task.notification_next_attempt_at = None
+        return
+
+    delay = min(
+        settings.NOTIFICATION_RETRY_BASE_DELAY * 2 ** (task.notification_attempts - 1),
+        settings.NOTIFICATION_RETRY_MAX_DELAY,
+    )
+    if isinstance(error, TelegramAPIError) and error.retry_after:
+        delay = max(delay, error.retry_after)
+    task.notification_next_attempt_at = now + timedelta(seconds=delay)
+
+
+def resend_rejected_digests(results, tasks_by_id) -> list:
+    """
+    400 на дайджест вызывает одна из задач (например, разметка в названии), поэтому
+    задачи такого дайджеста переотправляются по одной, и постоянной ошибкой
+    помечается только та, что не проходит и отдельно.
+    """
+    kept = []
+    split_messages = []
+    for result in results:
+        error = result.error
+        if (
+            isinstance(error, TelegramAPIError)
+            and error.status_code == 400
+            and len(result.message.key) > 1
+        ):
+            split_messages.extend(
+                OutboundMessage(
+                    chat_id=result.message.chat_id,
+                    text=render_task_notification(tasks_by_id[task_id]),
+                    key=[task_id],
+                )
+                for task_id in result.message.key
+            )
+        else:
+            kept.append(result)
+
+    if not split_messages:
+        return results
+    logger.warning(f"Digest rejected, resending {len(split_messages)} tasks one by one")
+    return kept + run_async(get_sender().send_many(split_messages))
+
+
+def send_claimed_tasks(tasks) -> int:
+    from tasks.models import Task
+
+    tasks_by_id = {task.id: task for task in tasks}
+    messages = build_notification_messages(tasks_by_id.values())
+    if not messages:
+        return 0
+
+    results = run_async(get_sender().send_many(messages))
+    results = resend_rejected_digests(results, tasks_by_id)
+
+    now = timezone.now()
+    sent_ids = []
+    failed_tasks = []
+    for result in results:
+        if result.ok:
+            for task_id in result.message.key:
+                sent_ids.append(task_id)
+                metrics.DELIVERY_LAG.observe(
+                    max((now - tasks_by_id[task_id].due_date).total_seconds(), 0)
+                )
+            continue
+
+        for task_id in result.message.key:
+            task = tasks_by_id[task_id]
+            schedule_retry(task, result.error, now)
+            failed_tasks.append(task)
+            logger.error(f"Failed to send notification for task {task.id}: {result.error}")
+
+    metrics.REMINDER_RESULTS.labels(outcome="sent").inc(len(sent_ids))
+    for task in failed_tasks:
+        metrics.REMINDER_RESULTS.labels(
+            outcome="failed" if task.notification_failed else "retry"
+        ).inc()
+
+    # Результаты пишутся отдельной короткой транзакцией, аренда заменяется итогом
+    with transaction.atomic():
+        if sent_ids:
+            Task.objects.filter(id__in=sent_ids).update(
+                notification_sent=True, notification_next_attempt_at=None
+            )
+        if failed_tasks:
+            Task.objects.bulk_update(
+                failed_tasks,
+                [
+                    "notification_attempts",
+                    "notification_next_attempt_at",
+                    "notification_failed",
+                    "notification_error",
+                ],
+            )
+            transaction.on_commit(lambda: publish_reminders(failed_tasks))
+    # update/bulk_update не шлют сигналы, поэтому версию данных меняем явно
+    bump_user_versions(task.telegram_id for task in tasks_by_id.values())
+    return len(sent_ids)
+
 
 @shared_task
 def check_due_tasks():
-    from tasks.models import Task
+    with metrics.SWEEP_DURATION.time():
+        result = sweep_due_tasks()
+    metrics.BACKLOG.set(due_tasks_queryset(timezone.now()).count())
+    return result
+
+
+def sweep_due_tasks():
+    bot_token = settings.TELEGRAM_BOT_TOKEN
+    if not bot_token:
+        logger.error("TELEGRAM_BOT_TOKEN not configured")
+        return "Bot token not configured"
 
     now = timezone.now()
+    batch_size = settings.NOTIFICATION_BATCH_SIZE
 
-    due_tasks = Task.objects.filter(
-        due_date__lte=now,
-        is_completed=False,
-        notification_sent=False,
-    ).select_related("category")
+    claimed_count = 0
+    sent_count = 0
+    cursor = None
+    while True:
+        batch = claim_due_batch(now, batch_size, after=cursor)
+        if not batch:
+            break
+        sent_count += send_claimed_tasks(batch)
 
-    if not due_tasks.exists():
+        claimed_count += len(batch)
+        cursor = (batch[-1].due_date, batch[-1].id)
+        if len(batch) < batch_size:
+            break
+
+    if not claimed_count:
         logger.info("No due tasks found")
         return "No due tasks"
 
+    logger.info(f"Sent {sent_count} notifications")
+    return f"Sent {sent_count} notifications"
+
+
+@shared_task
+def send_due_notifications(task_ids: list[str]):
     bot_token = settings.TELEGRAM_BOT_TOKEN
     if not bot_token:
         logger.error("TELEGRAM_BOT_TOKEN not configured")
         return "Bot token not configured"
 
-    sent_count = 0
-    for task in due_tasks:
-        try:
-            send_task_notification(task, bot_token)
-            task.notification_sent = True
-            task.save(update_fields=["notification_sent"])
-            sent_count += 1
-        except Exception as e:
-            logger.error(f"Failed to send notification for task {task.id}: {e}")
+    batch = lease_tasks(_for_claim(due_tasks_queryset(timezone.now()).filter(id__in=task_ids)))
+    sent_count = send_claimed_tasks(batch)
 
-    logger.info(f"Sent {sent_count} notifications")
     return f"Sent {sent_count} notifications"
 
 
-def send_task_notification(task, bot_token: str):
-    category_text = f"\n📁 Категория: {task.category.name}" if task.category else ""
+def render_task_notification(task) -> str:
+    # Сообщения уходят с parse_mode=HTML, поэтому пользовательский текст экранируется
+    category_text = f"\n📁 Категория: {html.escape(task.category.name)}" if task.category else ""
     due_text = task.due_date.strftime("%d.%m.%Y %H:%M") if task.due_date else "Не указана"
 
-    message = (
+    return (
         f"⏰ <b>Напоминание о задаче!</b>\n\n"
-        f"📌 <b>{task.title}</b>\n"
+        f"📌 <b>{html.escape(task.title)}</b>\n"
         f"{category_text}\n"
         f"📅 Срок: {due_text}\n\n"
-        f"{'📝 ' + task.description if task.description else ''}"
+        f"{'📝 ' + html.escape(task.description) if task.description else ''}"
     )
 
-    url = f"https://api.telegram.org/bot{bot_token}/sendMessage"
-    payload = {
-        "chat_id": task.telegram_id,
-        "text": message,
-        "parse_mode": "HTML",
-    }
 
-    with httpx.Client() as client:
-        response = client.post(url, json=payload, timeout=10)
-        response.raise_for_status()
+def _telegram_length(text: str) -> int:
+    # Telegram считает длину сообщения в UTF-16 code units
+    return len(text.encode("utf-16-le")) // 2
+
+
+def render_digest_item(task) -> str:
+    due_text = task.due_date.strftime("%d.%m.%Y %H:%M") if task.due_date else "Не указана"
+    category_text = f" · 📁 {html.escape(task.category.name)}" if task.category else ""
+    return f"📌 <b>{html.escape(task.title)}</b>\n📅 {due_text}{category_text}\n"
 
+
+def render_digest(tasks) -> list[tuple[str, list]]:
+    header = f"⏰ <b>Напоминание о задачах ({len(tasks)})</b>\n"
+    header_length = _telegram_length(header)
+
+    chunks = []
+    items, task_ids, length = [], [], header_length
+    for task in tasks:
+        item = "\n" + render_digest_item(task)
+        item_length = _telegram_length(item)
+        if task_ids and length + item_length > TELEGRAM_MESSAGE_LIMIT:
+            chunks.append((header + "".join(items), task_ids))
+            items, task_ids, length = [], [], header_length
+        items.append(item)
+        task_ids.append(task.id)
+        length += item_length
+
+    if task_ids:
+        chunks.append((header + "".join(items), task_ids))
+    return chunks
+
+
+def build_notification_messages(tasks) -> list[OutboundMessage]:
+    tasks_by_chat = defaultdict(list)
+    for task in tasks:
+        tasks_by_chat[task.telegram_id].append(task)
+
+    messages = []
+    for chat_id, chat_tasks in tasks_by_chat.items():
+        if (
+            settings.NOTIFICATION_DIGEST_ENABLED
+            and len(chat_tasks) >= settings.NOTIFICATION_DIGEST_MIN_TASKS
+        ):
+            messages.extend(
+                OutboundMessage(chat_id=chat_id, text=text, key=task_ids)
+                for text, task_ids in render_digest(chat_tasks)
+            )
+        else:
+            messages.extend(
+                OutboundMessage(chat_id=chat_id, text=render_task_notification(task), key=[task.id])
+                for task in chat_tasks
+            )
+    return messages
+
+
+def send_task_notification(task):
+    run_async(get_sender().send_message(task.telegram_id, render_task_notification(task)))
     logger.info(f"Sent notification for task {task.id} to user {task.telegram_id}")
 
 
@@ -85,10 +341,48 @@ def send_immediate_notification(task_id: str):
         return "Bot token not configured"
 
     try:
-        send_task_notification(task, bot_token)
+        send_task_notification(task)
         task.notification_sent = True
         task.save(update_fields=["notification_sent"])
         return f"Notification sent for task {task_id}"
     except Exception as e:
         logger.error(f"Failed to send notification for task {task_id}: {e}")
         return f"Failed: {e}"
+
+
+@shared_task
+def archive_completed_tasks():
+    archived = archive_completed()
+    logger.info(f"Archived {archived} completed tasks")
+    return f"Archived {archived} tasks"
+
+
+@shared_task
+def import_tasks_job(job_id: str):
+    # Разбор и проверка строк живут в API (сериализатор строки импорта)
+    from api.v1.tasks.transfer import import_tasks
+
+    from tasks.models import TaskImportJob
+
+    # Задачу забирает один воркер, даже если брокер доставил её дважды
+    claimed = TaskImportJob.objects.filter(id=job_id, status=TaskImportJob.Status.PENDING).update(
+        status=TaskImportJob.Status.RUNNING, updated_at=timezone.now()
+    )
+    if not claimed:
+        logger.warning(f"Import job {job_id} not found or already started")
+        return f"Import job {job_id} skipped"
+
+    job = TaskImportJob.objects.get(id=job_id)
+    try:
+        with job.file.open("rb") as stream:
+            job.result = import_tasks(job.telegram_id, stream)
+        job.status = TaskImportJob.Status.DONE
+    except Exception as e:
+        logger.exception(f"Import job {job_id} failed")
+        job.result = {"error": str(e)}
+        job.status = TaskImportJob.Status.FAILED
+
+    job.file.delete(save=False)
+    job.finished_at = timezone.now()
+    job.save(update_fields=["status", "result", "file", "finished_at", "updated_at"])
+    return f"Import job {job_id}: {job.status}"
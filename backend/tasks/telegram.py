@@ -0,0 +1,342 @@
+import asyncio
+import logging
+import os
+import time
+from collections.abc import Coroutine, Iterable
+from dataclasses import dataclass
+from typing import Any
+
+import httpx
+import redis
+import redis.asyncio as aioredis
+from django.conf import settings
+
+from tasks import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    def __init__(self, rate: float, capacity: float | None = None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(rate, 1.0)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    @property
+    def is_full(self) -> bool:
+        self._refill()
+        return self._tokens >= self.capacity
+
+    def pause(self, seconds: float) -> None:
+        # Следующий токен появится не раньше чем через seconds
+        self._refill()
+        self._tokens = min(self._tokens, 1.0 - seconds * self.rate)
+
+    async def acquire(self) -> None:
+        # Лок держится во время ожидания, поэтому токены выдаются строго по очереди
+        async with self._lock:
+            while True:
+                self._refill()
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+# Общее для всех процессов ведро (GCRA): в ключе хранится время, с которого свободна
+# следующая отправка. Скрипт занимает ближайшую отправку и возвращает ожидание до неё в мс,
+# а с ARGV[3] > 0 вместо этого откладывает все отправки на ARGV[3] мс (ответ 429).
+SHARED_BUCKET_SCRIPT = """
+local time = redis.call('TIME')
+local now = tonumber(time[1]) * 1000 + math.floor(tonumber(time[2]) / 1000)
+local interval = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local pause = tonumber(ARGV[3])
+local tat = math.max(tonumber(redis.call('GET', KEYS[1]) or now), now)
+local wait = 0
+if pause > 0 then
+    tat = math.max(tat, now + pause + burst)
+else
+    wait = math.max(0, tat - burst - now)
+    tat = tat + interval
+end
+redis.call('SET', KEYS[1], string.format('%d', tat), 'PX', string.format('%d', tat - now + 1000))
+return wait
+"""
+
+
+class TelegramAPIError(Exception):
+    # 400 — чат не найден или некорректное сообщение, 403 — пользователь заблокировал бота
+    PERMANENT_STATUS_CODES = (400, 403)
+
+    def __init__(self, status_code: int, description: str, retry_after: int | None = None):
+        super().__init__(f"Telegram API error {status_code}: {description}")
+        self.status_code = status_code
+        self.description = description
+        self.retry_after = retry_after
+
+    @property
+    def is_permanent(self) -> bool:
+        return self.status_code in self.PERMANENT_STATUS_CODES
+
+    @classmethod
+    def from_response(cls, response: httpx.Response) -> "TelegramAPIError":
+        try:
+            data = response.json()
+        except ValueError:
+            data = {}
+        if not isinstance(data, dict):
+            data = {}
+        parameters = data.get("parameters") or {}
+        return cls(
+            status_code=response.status_code,
+            description=data.get("description") or response.reason_phrase,
+            retry_after=parameters.get("retry_after"),
+        )
+
+
+def classify_error(error: Exception) -> str:
+    if isinstance(error, TelegramAPIError):
+        if error.status_code == 429:
+            return "rate_limited"
+        if error.status_code == 403:
+            return "forbidden"
+        if error.status_code == 400:
+            return "bad_request"
+        if error.status_code >= 500:
+            return "server_error"
+        return f"http_{error.status_code}"
+    if isinstance(error, httpx.TimeoutException):
+        return "timeout"
+    if isinstance(error, httpx.TransportError):
+        return "network"
+    return "other"
+
+
+@dataclass
+class OutboundMessage:
+    chat_id: int
+    text: str
+    key: Any = None
+
+
+@dataclass
+class SendResult:
+    message: OutboundMessage
+    error: Exception | None = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+class TelegramSender:
+    """
+    Отправка сообщений Bot API с пулом соединений и ограничением скорости.
+
+    Telegram считает лимиты на токен бота, а отправляют все процессы Celery, поэтому с
+    redis_url ведра общие и хранятся в Redis. Локальные ведра остаются запасными, если
+    Redis недоступен, и тогда лимиты действуют в пределах процесса. Ответ 429 приостанавливает
+    отправку в этот чат и всю отправку на retry_after секунд.
+    """
+
+    MAX_IDLE_CHAT_BUCKETS = 10_000
+    SHARED_BUCKET_PREFIX = "telegram:rate"
+    # После ошибки Redis общие ведра не опрашиваются столько секунд
+    SHARED_BUCKET_RETRY_INTERVAL = 30.0
+
+    def __init__(
+        self,
+        bot_token: str,
+        api_url: str = "https://api.telegram.org",
+        concurrency: int = 16,
+        global_rate: float = 30.0,
+        per_chat_rate: float = 1.0,
+        timeout: float = 10.0,
+        redis_url: str = "",
+    ):
+        self.bot_token = bot_token
+        self.api_url = api_url.rstrip("/")
+        self.concurrency = concurrency
+        self.per_chat_rate = per_chat_rate
+        self.timeout = timeout
+        self._client: httpx.AsyncClient | None = None
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._global_bucket = TokenBucket(global_rate) if global_rate > 0 else None
+        self._chat_buckets: dict[int, TokenBucket] = {}
+        self.redis_url = redis_url
+        self._redis: aioredis.Redis | None = None
+        self._shared_bucket_script = None
+        self._shared_retry_at = 0.0
+        # Лимиты считаются на бота: ключи различаются по его id из токена
+        self._shared_key_prefix = f"{self.SHARED_BUCKET_PREFIX}:{bot_token.split(':')[0]}"
+
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                base_url=f"{self.api_url}/bot{self.bot_token}",
+                timeout=self.timeout,
+                limits=httpx.Limits(
+                    max_connections=self.concurrency,
+                    max_keepalive_connections=self.concurrency,
+                ),
+            )
+        return self._client
+
+    def _get_chat_bucket(self, chat_id: int) -> TokenBucket | None:
+        if self.per_chat_rate <= 0:
+            return None
+
+        bucket = self._chat_buckets.get(chat_id)
+        if bucket is None:
+            if len(self._chat_buckets) >= self.MAX_IDLE_CHAT_BUCKETS:
+                self._chat_buckets = {
+                    key: value for key, value in self._chat_buckets.items() if not value.is_full
+                }
+            bucket = TokenBucket(self.per_chat_rate, capacity=1.0)
+            self._chat_buckets[chat_id] = bucket
+        return bucket
+
+    async def _run_shared_bucket(self, key: str, bucket: TokenBucket, pause_ms: int) -> int:
+        if self._redis is None:
+            # Очередь за соединением вместо ошибки, когда все отправки ждут ведро разом
+            pool = aioredis.BlockingConnectionPool.from_url(
+                self.redis_url, max_connections=self.concurrency, timeout=self.timeout
+            )
+            self._redis = aioredis.Redis(connection_pool=pool)
+            self._shared_bucket_script = self._redis.register_script(SHARED_BUCKET_SCRIPT)
+        interval_ms = 1000 / bucket.rate
+        burst_ms = (bucket.capacity - 1) * interval_ms
+        return await self._shared_bucket_script(
+            keys=[f"{self._shared_key_prefix}:{key}"],
+            args=[round(interval_ms), round(burst_ms), pause_ms],
+        )
+
+    def _use_shared_buckets(self) -> bool:
+        return bool(self.redis_url) and time.monotonic() >= self._shared_retry_at
+
+    def _shared_buckets_failed(self, error: Exception) -> None:
+        # Ошибку получают все отправки, ждавшие Redis одновременно, а пишется она один раз
+        if self._use_shared_buckets():
+            logger.warning(f"Shared rate limit is unavailable, using a local one: {error}")
+        self._shared_retry_at = time.monotonic() + self.SHARED_BUCKET_RETRY_INTERVAL
+
+    async def _acquire(self, key: str, bucket: TokenBucket | None) -> None:
+        if bucket is None:
+            return
+        if self._use_shared_buckets():
+            try:
+                wait_ms = await self._run_shared_bucket(key, bucket, 0)
+            except redis.RedisError as e:
+                self._shared_buckets_failed(e)
+            else:
+                if wait_ms > 0:
+                    await asyncio.sleep(wait_ms / 1000)
+                return
+        await bucket.acquire()
+
+    async def _pause(self, key: str, bucket: TokenBucket | None, seconds: float) -> None:
+        if bucket is None:
+            return
+        bucket.pause(seconds)
+        if self._use_shared_buckets():
+            try:
+                await self._run_shared_bucket(key, bucket, round(seconds * 1000))
+            except redis.RedisError as e:
+                self._shared_buckets_failed(e)
+
+    async def send_message(self, chat_id: int, text: str) -> dict[str, Any]:
+        chat_bucket = self._get_chat_bucket(chat_id)
+        await self._acquire(f"chat:{chat_id}", chat_bucket)
+
+        async with self._semaphore:
+            await self._acquire("global", self._global_bucket)
+
+            started = time.perf_counter()
+            try:
+                response = await self._get_client().post(
+                    "/sendMessage",
+                    json={"chat_id": chat_id, "text": text, "parse_mode": "HTML"},
+                )
+                if response.status_code != 200:
+                    raise TelegramAPIError.from_response(response)
+            except TelegramAPIError as e:
+                metrics.SEND_RESULTS.labels(outcome=classify_error(e)).inc()
+                if e.status_code == 429 and e.retry_after:
+                    # Пока идёт flood wait, остальные отправки тоже ждут, иначе Telegram
+                    # продлевает ограничение
+                    await self._pause(f"chat:{chat_id}", chat_bucket, e.retry_after)
+                    await self._pause("global", self._global_bucket, e.retry_after)
+                raise
+            except Exception as e:
+                metrics.SEND_RESULTS.labels(outcome=classify_error(e)).inc()
+                raise
+            finally:
+                metrics.SEND_LATENCY.observe(time.perf_counter() - started)
+
+            metrics.SEND_RESULTS.labels(outcome="ok").inc()
+            return response.json()
+
+    async def _deliver(self, message: OutboundMessage) -> SendResult:
+        try:
+            await self.send_message(message.chat_id, message.text)
+        except Exception as e:
+            return SendResult(message, error=e)
+        return SendResult(message)
+
+    async def send_many(self, messages: Iterable[OutboundMessage]) -> list[SendResult]:
+        return await asyncio.gather(*(self._deliver(message) for message in messages))
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+        if self._redis is not None:
+            await self._redis.aclose(close_connection_pool=True)
+            self._redis = None
+
+
+# Один event loop и один пул соединений на процесс воркера: клиент httpx привязан к loop,
+# поэтому loop живёт между вызовами задач, а не создаётся заново через asyncio.run().
+_runner: asyncio.Runner | None = None
+_sender: TelegramSender | None = None
+_owner_pid: int | None = None
+
+
+def _reset_after_fork() -> None:
+    global _runner, _sender, _owner_pid
+    if _owner_pid != os.getpid():
+        _runner = None
+        _sender = None
+        _owner_pid = os.getpid()
+
+
+def run_async(coro: Coroutine[Any, Any, Any]) -> Any:
+    global _runner
+    _reset_after_fork()
+    if _runner is None:
+        _runner = asyncio.Runner()
+    return _runner.run(coro)
+
+
+def get_sender() -> TelegramSender:
+    global _sender
+    _reset_after_fork()
+    if _sender is None:
+        _sender = TelegramSender(
+            bot_token=settings.TELEGRAM_BOT_TOKEN,
+            api_url=settings.TELEGRAM_API_URL,
+            concurrency=settings.TELEGRAM_SEND_CONCURRENCY,
+            global_rate=settings.TELEGRAM_GLOBAL_RATE_LIMIT,
+            per_chat_rate=settings.TELEGRAM_PER_CHAT_RATE_LIMIT,
+            timeout=settings.TELEGRAM_SEND_TIMEOUT,
+            redis_url=settings.TELEGRAM_RATE_LIMIT_REDIS_URL,
+        )
+    return _sender
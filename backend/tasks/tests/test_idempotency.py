@@ -0,0 +1,107 @@
+"""Заголовок Idempotency-Key на запись задач (api.v1.idempotency.IdempotencyMixin)."""
+
+import threading
+from unittest import mock
+
+from api.v1.tasks.views import AsyncTaskViewSet, TaskViewSet
+from asgiref.sync import async_to_sync
+from django.core.cache import cache
+from django.test import TestCase
+from django.test.utils import override_settings
+from rest_framework.test import APIRequestFactory
+
+from tasks.models import Task
+
+TELEGRAM_ID = 9_720_000_000
+
+factory = APIRequestFactory()
+
+
+@override_settings(
+    API_CACHE_ENABLED=False,
+    CACHES={
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": "idempotency-tests",
+        }
+    },
+)
+class IdempotencyTests(TestCase):
+    viewset = TaskViewSet
+
+    def setUp(self):
+        cache.clear()
+
+    def post(self, key: str, data: dict):
+        view = self.viewset.as_view({"post": "create"}, basename="task")
+        request = factory.post(
+            "/tasks/",
+            data,
+            format="json",
+            HTTP_X_TELEGRAM_ID=str(TELEGRAM_ID),
+            HTTP_IDEMPOTENCY_KEY=key,
+        )
+        if self.viewset.view_is_async:
+            response = async_to_sync(view)(request)
+        else:
+            response = view(request)
+        # Ответ сохраняется под ключом при рендеринге, как в обработчике Django
+        if hasattr(response, "render"):
+            response.render()
+        return response
+
+    def task_count(self) -> int:
+        return Task.objects.filter(telegram_id=TELEGRAM_ID).count()
+
+    def test_repeated_key_replays_stored_response(self):
+        first = self.post("key-1", {"title": "Купить молоко"})
+        second = self.post("key-1", {"title": "Купить молоко"})
+
+        self.assertEqual(first.status_code, 201)
+        self.assertNotIn("Idempotent-Replayed", first)
+        self.assertEqual(second.status_code, 201)
+        self.assertEqual(second["Idempotent-Replayed"], "true")
+        self.assertEqual(second.content, first.content)
+        self.assertEqual(self.task_count(), 1)
+
+    def test_duplicate_in_flight_gets_409(self):
+        duplicate = {}
+        get_serializer = self.viewset.get_serializer
+
+        def get_serializer_with_duplicate(viewset, *args, **kwargs):
+            # Дубль приходит из другого потока, пока первый запрос ещё выполняется
+            if not duplicate:
+                duplicate["started"] = True
+                thread = threading.Thread(
+                    target=lambda: duplicate.update(
+                        response=self.post("key-1", {"title": "Купить молоко"})
+                    )
+                )
+                thread.start()
+                thread.join()
+            return get_serializer(viewset, *args, **kwargs)
+
+        with mock.patch.object(self.viewset, "get_serializer", get_serializer_with_duplicate):
+            first = self.post("key-1", {"title": "Купить молоко"})
+
+        self.assertEqual(first.status_code, 201)
+        self.assertEqual(duplicate["response"].status_code, 409)
+        self.assertEqual(duplicate["response"]["Retry-After"], "1")
+        self.assertEqual(self.task_count(), 1)
+        # После первого ответа повтор получает его
+        self.assertEqual(self.post("key-1", {"title": "Купить молоко"}).status_code, 201)
+        self.assertEqual(self.task_count(), 1)
+
+    def test_same_key_with_different_body_gets_422(self):
+        first = self.post("key-1", {"title": "Купить молоко"})
+        second = self.post("key-1", {"title": "Купить хлеб"})
+
+        self.assertEqual(first.status_code, 201)
+        self.assertEqual(second.status_code, 422)
+        self.assertEqual(self.task_count(), 1)
+
+
+class AsyncIdempotencyTests(IdempotencyTests):
+    """То же для AsyncTaskViewSet (API_ASYNC_VIEWS)."""
+
+    viewset = AsyncTaskViewSet
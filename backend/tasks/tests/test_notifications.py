@@ -0,0 +1,103 @@
+"""Напоминания: аренда задач на отправку и текст сообщений."""
+
+import re
+from datetime import timedelta
+
+from categories.models import Category
+from django.test import SimpleTestCase, TestCase
+from django.test.utils import override_settings
+from django.utils import timezone
+
+from tasks import tasks as celery_tasks
+from tasks.models import Task
+
+TELEGRAM_ID = 9_710_000_000
+
+# Название, которое раньше ломало отправку с parse_mode=HTML
+UNSAFE_TITLE = "<b>& Купить молоко</i>"
+HTML_ENTITY = re.compile(r"&(?:lt|gt|amp|quot|#x27);")
+
+
+@override_settings(
+    NOTIFICATION_CLAIM_LEASE=60, TELEGRAM_GLOBAL_RATE_LIMIT=30, TELEGRAM_PER_CHAT_RATE_LIMIT=1
+)
+class ClaimLeaseTests(TestCase):
+    def make_tasks(self, count: int, chats: int = 1) -> None:
+        due_date = timezone.now() - timedelta(minutes=1)
+        Task.objects.bulk_create(
+            Task(telegram_id=TELEGRAM_ID + i % chats, title=f"Task {i}", due_date=due_date)
+            for i in range(count)
+        )
+
+    def lease_seconds(self) -> float:
+        started = timezone.now()
+        tasks = celery_tasks.claim_due_batch(timezone.now(), 500)
+        lease_until = Task.objects.filter(id=tasks[0].id).get().notification_next_attempt_at
+        return (lease_until - started).total_seconds()
+
+    def test_lease_covers_per_chat_rate(self):
+        # 500 задач одного чата при 1 сообщении в секунду отправляются 500 секунд
+        self.make_tasks(500)
+        self.assertGreaterEqual(self.lease_seconds(), 500 + 60)
+
+    def test_lease_covers_global_rate(self):
+        self.make_tasks(300, chats=300)
+        lease = self.lease_seconds()
+        self.assertGreaterEqual(lease, 300 / 30 + 60)
+        self.assertLess(lease, 300 / 30 + 60 + 5)
+
+    def test_leased_tasks_are_claimed_again_after_lease(self):
+        self.make_tasks(10)
+        self.assertEqual(len(celery_tasks.claim_due_batch(timezone.now(), 500)), 10)
+        # 10 сообщений в один чат — 10 секунд плюс запас в 60
+        during = timezone.now() + timedelta(seconds=65)
+        self.assertEqual(celery_tasks.claim_due_batch(during, 500), [])
+        after = timezone.now() + timedelta(seconds=75)
+        self.assertEqual(len(celery_tasks.claim_due_batch(after, 500)), 10)
+
+
+class RenderTests(SimpleTestCase):
+    def make_task(self, title: str, **kwargs) -> Task:
+        return Task(
+            telegram_id=TELEGRAM_ID,
+            title=title,
+            due_date=timezone.now(),
+            category=Category(telegram_id=TELEGRAM_ID, name="Дом & <сад>"),
+            **kwargs,
+        )
+
+    def assertSafeHTML(self, text: str) -> None:
+        # Кроме разметки шаблона (<b>) в тексте нет ни тегов, ни голых &
+        text = HTML_ENTITY.sub("", text.replace("<b>", "").replace("</b>", ""))
+        self.assertNotIn("<", text)
+        self.assertNotIn(">", text)
+        self.assertNotIn("&", text)
+
+    def test_task_notification_escapes_user_text(self):
+        text = celery_tasks.render_task_notification(
+            self.make_task(UNSAFE_TITLE, description="a < b && c > d")
+        )
+        self.assertIn("<b>&lt;b&gt;&amp; Купить молоко&lt;/i&gt;</b>", text)
+        self.assertIn("a &lt; b &amp;&amp; c &gt; d", text)
+        self.assertIn("Дом &amp; &lt;сад&gt;", text)
+        self.assertSafeHTML(text)
+
+    def test_digest_is_split_within_telegram_limit(self):
+        # Символы вне BMP занимают две единицы UTF-16, а len() считает их за одну
+        title = UNSAFE_TITLE + " 🎉" * 100
+        tasks = [self.make_task(title) for _ in range(60)]
+
+        chunks = celery_tasks.render_digest(tasks)
+
+        self.assertGreater(len(chunks), 1)
+        for text, _ in chunks:
+            self.assertLessEqual(
+                len(text.encode("utf-16-le")) // 2, celery_tasks.TELEGRAM_MESSAGE_LIMIT
+            )
+            self.assertSafeHTML(text)
+            self.assertIn("&lt;b&gt;&amp; Купить молоко&lt;/i&gt;", text)
+        # Каждая задача попадает ровно в одну часть и в исходном порядке
+        self.assertEqual(
+            [task_id for _, task_ids in chunks for task_id in task_ids],
+            [task.id for task in tasks],
+        )
@@ -0,0 +1,337 @@
+"""
+Бюджеты SQL-запросов для действий API и задач Celery.
+
+Каждое действие TaskViewSet/CategoryViewSet и каждая задача из tasks.tasks выполняется на
+наборах данных из 1, 50 и 500 объектов, и число запросов не должно превышать бюджет
+на любом размере. Новое поле сериализатора без select_related или запрос в цикле
+сразу выводят действие за бюджет. Запускается вместе с остальными тестами:
+manage.py test tasks.tests.test_query_budgets.
+"""
+
+import io
+import json
+import shutil
+import tempfile
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import timedelta
+from unittest import mock
+
+import ulid
+from api.v1.categories.views import AsyncCategoryViewSet, CategoryViewSet
+from api.v1.tasks.transfer import start_import
+from api.v1.tasks.views import AsyncTaskViewSet, TaskViewSet
+from asgiref.sync import async_to_sync
+from categories.models import Category
+from django.conf import settings
+from django.db import connection, transaction
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.utils import timezone
+from rest_framework.test import APIRequestFactory
+
+from tasks import tasks as celery_tasks
+from tasks.models import Task, TaskImportJob
+from tasks.telegram import SendResult
+
+SIZES = (1, 50, 500)
+
+# Точки сохранения появляются от вложенных atomic() внутри транзакции теста
+# и в обычной работе не выполняются, поэтому не считаются
+IGNORED_PREFIXES = ("SAVEPOINT", "RELEASE SAVEPOINT", "ROLLBACK TO SAVEPOINT")
+
+QUERY_BUDGETS = {
+    "tasks.list": 1,
+    "tasks.list_limit": 1,
+    "tasks.search": 1,
+    "tasks.list_archived": 1,
+    "tasks.retrieve": 1,
+    "tasks.create": 2,
+    "tasks.partial_update": 3,
+    "tasks.destroy": 2,
+    "tasks.complete": 2,
+    "tasks.uncomplete": 2,
+    "tasks.bulk": 8,
+    "tasks.stats": 2,
+    "tasks.export": 1,
+    "tasks.export_csv": 1,
+    # Загрузка только сохраняет файл и создаёт задание для Celery
+    "tasks.import": 1,
+    "tasks.import_status": 1,
+    "categories.list": 1,
+    "categories.retrieve": 1,
+    "categories.create": 1,
+    "categories.partial_update": 2,
+    # SET_NULL у задач и у архива, удаление категории
+    "categories.destroy": 4,
+    # Свип забирает задачи пачками по NOTIFICATION_BATCH_SIZE (500): выборка пачки,
+    # аренда и отметка отправленных; на 500 задачах добавляется пустая следующая пачка
+    "celery.check_due_tasks": 5,
+    "celery.send_due_notifications": 3,
+    "celery.send_immediate_notification": 2,
+    "celery.archive_completed_tasks": 1,
+    # Захват и чтение задания, словарь категорий, по проверке id и INSERT на каждые
+    # IMPORT_BATCH_SIZE (1000) строк, итог задания
+    "celery.import_tasks_job": 6,
+}
+
+BUDGET_TELEGRAM_ID = 9_700_000_000
+BOT_TOKEN = "123456:budget"
+
+factory = APIRequestFactory()
+
+
+@dataclass
+class Fixture:
+    size: int
+    telegram_id: int
+    categories: list[Category]
+    tasks: list[Task]
+    import_job: TaskImportJob | None = None
+
+    @property
+    def task(self) -> Task:
+        return self.tasks[-1]
+
+    @property
+    def category(self) -> Category:
+        return self.categories[-1]
+
+
+def make_fixture(size: int) -> Fixture:
+    """
+    size категорий и size просроченных задач пользователя, каждая в своей категории,
+    и ещё size давно выполненных задач — кандидатов в архив.
+    """
+    now = timezone.now()
+    categories = Category.objects.bulk_create(
+        Category(telegram_id=BUDGET_TELEGRAM_ID, name=f"Категория {i}") for i in range(size)
+    )
+    tasks = Task.objects.bulk_create(
+        Task(
+            telegram_id=BUDGET_TELEGRAM_ID,
+            title=f"Задача {i}",
+            description="Описание",
+            category=categories[i],
+            due_date=now - timedelta(minutes=i + 1),
+        )
+        for i in range(size)
+    )
+    completed = Task.objects.bulk_create(
+        Task(telegram_id=BUDGET_TELEGRAM_ID, title=f"Выполненная {i}", is_completed=True)
+        for i in range(size)
+    )
+    # update() не трогает auto_now, так что задачи выглядят давно выполненными
+    Task.objects.filter(pk__in=[task.pk for task in completed]).update(
+        updated_at=now - timedelta(days=settings.TASK_ARCHIVE_AFTER_DAYS + 1)
+    )
+    fixture = Fixture(size, BUDGET_TELEGRAM_ID, categories, tasks)
+    fixture.import_job = start_import(BUDGET_TELEGRAM_ID, io.BytesIO(import_payload(fixture)))
+    return fixture
+
+
+class _NullSender:
+    """Отправитель без сети: проверка считает только запросы к базе."""
+
+    async def send_many(self, messages):
+        return [SendResult(message) for message in messages]
+
+    async def send_message(self, chat_id, text):
+        return {"message_id": 1, "chat": {"id": chat_id}, "text": text}
+
+
+class Scenarios:
+    def __init__(self, async_views: bool = False):
+        self.task_viewset = AsyncTaskViewSet if async_views else TaskViewSet
+        self.category_viewset = AsyncCategoryViewSet if async_views else CategoryViewSet
+
+    def api(
+        self,
+        viewset,
+        basename,
+        action,
+        method,
+        fixture,
+        pk=None,
+        data=None,
+        query="",
+        content_type=None,
+        url_kwargs=None,
+    ):
+        # Как роутер: параметры @action (например, renderer_classes) идут в initkwargs
+        initkwargs = getattr(getattr(viewset, action), "kwargs", {})
+        view = viewset.as_view({method: action}, basename=basename, **initkwargs)
+        # Тело с content_type передаётся как есть (NDJSON импорта), остальное — JSON
+        encoding = {"content_type": content_type} if content_type else {"format": "json"}
+        request = getattr(factory, method)(
+            f"/{basename}/{query}",
+            data,
+            HTTP_X_TELEGRAM_ID=str(fixture.telegram_id),
+            **encoding,
+        )
+        kwargs = {"pk": str(pk)} if pk is not None else {}
+        kwargs.update(url_kwargs or {})
+        if viewset.view_is_async:
+            response = async_to_sync(view)(request, **kwargs)
+        else:
+            response = view(request, **kwargs)
+        if response.streaming:
+            # Запросы потокового ответа выполняются, пока он читается
+            content = b"".join(async_to_sync(_drain)(response) if response.is_async else response)
+        else:
+            content = response.render().content
+        if response.status_code >= 400:
+            raise AssertionError(
+                f"{basename}.{action} returned {response.status_code}: {content[:200]}"
+            )
+
+    def task(self, action, method, fixture, **kwargs):
+        self.api(self.task_viewset, "task", action, method, fixture, **kwargs)
+
+    def category(self, action, method, fixture, **kwargs):
+        self.api(self.category_viewset, "category", action, method, fixture, **kwargs)
+
+    def all(self) -> dict[str, Callable[[Fixture], None]]:
+        return {
+            "tasks.list": lambda f: self.task("list", "get", f, query="?page_size=100"),
+            "tasks.list_limit": lambda f: self.task(
+                "list", "get", f, query="?limit=10&ordering=is_completed,-created_at"
+            ),
+            "tasks.search": lambda f: self.task("list", "get", f, query="?q=Задача"),
+            "tasks.list_archived": lambda f: self.task(
+                "list", "get", f, query="?archived=true&q=Задача"
+            ),
+            "tasks.retrieve": lambda f: self.task("retrieve", "get", f, pk=f.task.pk),
+            "tasks.create": lambda f: self.task(
+                "create", "post", f, data={"title": "Новая", "category": str(f.category.pk)}
+            ),
+            "tasks.partial_update": lambda f: self.task(
+                "partial_update",
+                "patch",
+                f,
+                pk=f.task.pk,
+                data={"title": "Изменённая", "category": str(f.categories[0].pk)},
+            ),
+            "tasks.destroy": lambda f: self.task("destroy", "delete", f, pk=f.task.pk),
+            "tasks.complete": lambda f: self.task("complete", "post", f, pk=f.task.pk),
+            "tasks.uncomplete": lambda f: self.task("uncomplete", "post", f, pk=f.task.pk),
+            "tasks.bulk": lambda f: self.task("bulk", "post", f, data=bulk_operations(f)),
+            "tasks.stats": lambda f: self.task("stats", "get", f),
+            "tasks.export": lambda f: self.task("export", "get", f),
+            "tasks.export_csv": lambda f: self.task("export", "get", f, query="?format=csv"),
+            "tasks.import": lambda f: self.task(
+                "import_tasks",
+                "post",
+                f,
+                data=import_payload(f),
+                content_type="application/x-ndjson",
+            ),
+            "tasks.import_status": lambda f: self.task(
+                "import_status", "get", f, url_kwargs={"job_id": str(f.import_job.pk)}
+            ),
+            "categories.list": lambda f: self.category("list", "get", f, query="?page_size=100"),
+            "categories.retrieve": lambda f: self.category("retrieve", "get", f, pk=f.category.pk),
+            "categories.create": lambda f: self.category(
+                "create", "post", f, data={"name": "Новая категория"}
+            ),
+            "categories.partial_update": lambda f: self.category(
+                "partial_update", "patch", f, pk=f.category.pk, data={"name": "Переименованная"}
+            ),
+            "categories.destroy": lambda f: self.category("destroy", "delete", f, pk=f.category.pk),
+            "celery.check_due_tasks": lambda f: celery_tasks.check_due_tasks(),
+            "celery.send_due_notifications": lambda f: celery_tasks.send_due_notifications(
+                [str(task.pk) for task in f.tasks]
+            ),
+            "celery.send_immediate_notification": lambda f: (
+                celery_tasks.send_immediate_notification(str(f.task.pk))
+            ),
+            "celery.archive_completed_tasks": lambda f: celery_tasks.archive_completed_tasks(),
+            "celery.import_tasks_job": lambda f: celery_tasks.import_tasks_job(
+                str(f.import_job.pk)
+            ),
+        }
+
+
+async def _drain(response) -> list[bytes]:
+    return [chunk async for chunk in response]
+
+
+def import_payload(fixture: Fixture) -> bytes:
+    # size строк NDJSON: по категории id, по названию и без категории; у половины строк
+    # id из выгрузки — задачи самого пользователя (пропускаются) и чужие
+    lines = []
+    for i, category in enumerate(fixture.categories):
+        row = {"title": f"Импорт {i}", "due_date": "2030-01-01T09:00:00+00:00"}
+        if i % 2 == 0:
+            row["id"] = str(fixture.tasks[i].pk) if i % 4 == 0 else str(ulid.new())
+        if i % 3 == 1:
+            row["category"] = str(category.pk)
+        elif i % 3 == 2:
+            row["category_name"] = category.name
+        lines.append(json.dumps(row, ensure_ascii=False))
+    return ("\n".join(lines) + "\n").encode()
+
+
+def bulk_operations(fixture: Fixture) -> dict:
+    # Пачка размера size из всех видов операций над задачами фикстуры
+    kinds = ("create", "complete", "uncomplete", "move", "delete")
+    operations = []
+    for i, task in enumerate(fixture.tasks):
+        op = kinds[i % len(kinds)]
+        if op == "create":
+            operations.append({"op": op, "title": f"Bulk {i}", "category": str(task.category_id)})
+        elif op == "move":
+            operations.append({"op": op, "id": str(task.pk), "category": None})
+        else:
+            operations.append({"op": op, "id": str(task.pk)})
+    return {"operations": operations}
+
+
+@override_settings(
+    API_CACHE_ENABLED=False, TELEGRAM_BOT_TOKEN=BOT_TOKEN, NOTIFICATION_BATCH_SIZE=500
+)
+class QueryBudgetTests(TestCase):
+    async_views = False
+
+    def setUp(self):
+        patcher = mock.patch.object(celery_tasks, "get_sender", return_value=_NullSender())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        # Файлы заданий импорта пишутся во временный каталог
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        media = override_settings(MEDIA_ROOT=media_root)
+        media.enable()
+        self.addCleanup(media.disable)
+
+    def measure(self, scenario: Callable[[Fixture], None], size: int) -> list[str]:
+        """SQL сценария на наборе из size объектов; изменения откатываются до следующего."""
+        with transaction.atomic():
+            fixture = make_fixture(size)
+            with CaptureQueriesContext(connection) as queries:
+                scenario(fixture)
+            transaction.set_rollback(True)
+
+        return [
+            query["sql"]
+            for query in queries.captured_queries
+            if not query["sql"].startswith(IGNORED_PREFIXES)
+        ]
+
+    def test_query_budgets(self):
+        scenarios = Scenarios(async_views=self.async_views).all()
+        for name, budget in QUERY_BUDGETS.items():
+            for size in SIZES:
+                with self.subTest(scenario=name, size=size):
+                    queries = self.measure(scenarios[name], size)
+                    self.assertLessEqual(
+                        len(queries),
+                        budget,
+                        "\n".join(f"{i}. {sql}" for i, sql in enumerate(queries, 1)),
+                    )
+
+
+class AsyncQueryBudgetTests(QueryBudgetTests):
+    """Те же бюджеты для AsyncTaskViewSet/AsyncCategoryViewSet (API_ASYNC_VIEWS)."""
+
+    async_views = True
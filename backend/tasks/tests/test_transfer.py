@@ -0,0 +1,137 @@
+"""Экспорт и импорт задач (api.v1.tasks.transfer и задача Celery import_tasks_job)."""
+
+import csv
+import io
+import json
+import shutil
+import tempfile
+from datetime import timedelta
+from unittest import mock
+
+from api.v1.tasks.transfer import start_import
+from api.v1.tasks.views import TaskViewSet
+from categories.models import Category
+from django.test import TestCase
+from django.test.utils import override_settings
+from django.utils import timezone
+from rest_framework.test import APIRequestFactory
+
+from tasks import tasks as celery_tasks
+from tasks.models import Task, TaskImportJob
+from tasks.scheduler import _reminder_payload
+
+SOURCE_TELEGRAM_ID = 9_730_000_000
+TARGET_TELEGRAM_ID = 9_730_000_001
+
+# Ячейки, которые табличный редактор выполнил бы как формулу
+FORMULA_TITLES = ("=cmd|' /C calc'!A0", "+1+1", "-2+3", "@SUM(A1:A2)", "\t=1")
+
+factory = APIRequestFactory()
+
+
+@override_settings(API_CACHE_ENABLED=False)
+class TransferTests(TestCase):
+    def setUp(self):
+        # Файлы заданий импорта пишутся во временный каталог
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        media = override_settings(MEDIA_ROOT=media_root)
+        media.enable()
+        self.addCleanup(media.disable)
+
+        patcher = mock.patch("api.v1.tasks.transfer.publish_reminders")
+        self.publish_reminders = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def export(self, telegram_id: int, query: str = "") -> bytes:
+        initkwargs = TaskViewSet.export.kwargs
+        view = TaskViewSet.as_view({"get": "export"}, basename="task", **initkwargs)
+        request = factory.get(f"/tasks/export/{query}", HTTP_X_TELEGRAM_ID=str(telegram_id))
+        response = view(request)
+        self.assertEqual(response.status_code, 200)
+        return b"".join(response.streaming_content)
+
+    def run_import(self, telegram_id: int, payload: bytes) -> dict:
+        # Задание уходит в Celery после фиксации транзакции, здесь оно выполняется напрямую
+        with self.captureOnCommitCallbacks():
+            job = start_import(telegram_id, io.BytesIO(payload))
+        with self.captureOnCommitCallbacks(execute=True):
+            celery_tasks.import_tasks_job(str(job.id))
+        job.refresh_from_db()
+        self.assertEqual(job.status, TaskImportJob.Status.DONE, job.result)
+        return job.result
+
+    def published_tasks(self) -> list[Task]:
+        return [task for call in self.publish_reminders.call_args_list for task in call.args[0]]
+
+    def test_csv_export_neutralises_formulas(self):
+        Task.objects.bulk_create(
+            Task(telegram_id=SOURCE_TELEGRAM_ID, title=title)
+            for title in (*FORMULA_TITLES, "Купить молоко")
+        )
+
+        rows = list(
+            csv.DictReader(io.StringIO(self.export(SOURCE_TELEGRAM_ID, "?format=csv").decode()))
+        )
+
+        self.assertEqual(
+            sorted(row["title"] for row in rows),
+            sorted(["'" + title for title in FORMULA_TITLES] + ["Купить молоко"]),
+        )
+
+    def test_ndjson_export_keeps_titles(self):
+        Task.objects.create(telegram_id=SOURCE_TELEGRAM_ID, title=FORMULA_TITLES[0])
+
+        row = json.loads(self.export(SOURCE_TELEGRAM_ID))
+
+        self.assertEqual(row["title"], FORMULA_TITLES[0])
+
+    def test_repeated_import_skips_rows_with_source_id(self):
+        category = Category.objects.create(telegram_id=SOURCE_TELEGRAM_ID, name="Дом")
+        Category.objects.create(telegram_id=TARGET_TELEGRAM_ID, name="Дом")
+        Task.objects.bulk_create(
+            Task(telegram_id=SOURCE_TELEGRAM_ID, title=f"Задача {i}", category=category)
+            for i in range(5)
+        )
+        payload = self.export(SOURCE_TELEGRAM_ID)
+
+        first = self.run_import(TARGET_TELEGRAM_ID, payload)
+        second = self.run_import(TARGET_TELEGRAM_ID, payload)
+        own = self.run_import(SOURCE_TELEGRAM_ID, payload)
+
+        self.assertEqual((first["created"], first["skipped"], first["failed"]), (5, 0, 0))
+        self.assertEqual((second["created"], second["skipped"], second["failed"]), (0, 5, 0))
+        self.assertEqual((own["created"], own["skipped"]), (0, 5))
+        self.assertEqual(Task.objects.filter(telegram_id=TARGET_TELEGRAM_ID).count(), 5)
+        self.assertEqual(Task.objects.filter(telegram_id=SOURCE_TELEGRAM_ID).count(), 5)
+        self.assertEqual(
+            set(
+                Task.objects.filter(telegram_id=TARGET_TELEGRAM_ID).values_list(
+                    "category__name", flat=True
+                )
+            ),
+            {"Дом"},
+        )
+
+    def test_past_due_rows_do_not_queue_reminders(self):
+        now = timezone.now()
+        rows = [
+            {"title": "Просрочена", "due_date": (now - timedelta(days=1)).isoformat()},
+            {"title": "Впереди", "due_date": (now + timedelta(days=1)).isoformat()},
+        ]
+        payload = "".join(json.dumps(row, ensure_ascii=False) + "\n" for row in rows).encode()
+
+        result = self.run_import(TARGET_TELEGRAM_ID, payload)
+
+        self.assertEqual(result["created"], 2)
+        past = Task.objects.get(telegram_id=TARGET_TELEGRAM_ID, title="Просрочена")
+        future = Task.objects.get(telegram_id=TARGET_TELEGRAM_ID, title="Впереди")
+        self.assertTrue(past.notification_sent)
+        self.assertFalse(future.notification_sent)
+        # Свип не заберёт просроченную задачу, а планировщик получит её без срока
+        self.assertFalse(celery_tasks.due_tasks_queryset(now).filter(pk=past.pk).exists())
+        payloads = {
+            task.title: json.loads(_reminder_payload(task)) for task in self.published_tasks()
+        }
+        self.assertIsNone(payloads["Просрочена"]["due_date"])
+        self.assertIsNotNone(payloads["Впереди"]["due_date"])
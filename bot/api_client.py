@@ -1,8 +1,25 @@
+import asyncio
+import functools
+import json
+import random
+import uuid
+from collections import OrderedDict
 from typing import Any
 
 import httpx
+import msgpack
 from config import settings
 
+PAGE_SIZE = 100
+MSGPACK_MEDIA_TYPE = "application/msgpack"
+ETAG_CACHE_SIZE = 1024
+# 409 — запрос с тем же Idempotency-Key ещё выполняется, остальные — временная перегрузка
+RETRY_STATUSES = frozenset({409, 429, 502, 503, 504})
+
+# Последние ответы GET по ключу (telegram_id, url, params): ETag, тело и Content-Type.
+# Клиент создаётся на каждый хендлер, поэтому кеш живёт на уровне модуля.
+_etag_cache: OrderedDict[tuple, tuple[str, bytes, str]] = OrderedDict()
+
 
 class APIClient:
     def __init__(self, telegram_id: int):
@@ -14,7 +31,7 @@ class APIClient:
     def headers(self) -> dict[str, str]:
         return {
             "X-Telegram-ID": str(self.telegram_id),
-            "Content-Type": "application/json",
+            "Accept": MSGPACK_MEDIA_TYPE,
         }
 
     async def _get_client(self) -> httpx.AsyncClient:
@@ -22,7 +39,7 @@ class APIClient:
             self._client = httpx.AsyncClient(
                 base_url=self.base_url,
                 headers=self.headers,
-                timeout=30.0,
+                timeout=settings.api_timeout,
             )
         return self._client
 
@@ -31,18 +48,158 @@ class APIClient:
             await self._client.aclose()
             self._client = None
 
-    async def get_tasks(self) -> list[dict[str, Any]]:
+    @staticmethod
+    def _decode_content(content: bytes, content_type: str) -> Any:
+        if content_type.startswith(MSGPACK_MEDIA_TYPE):
+            return msgpack.unpackb(content, raw=False)
+        return json.loads(content)
+
+    @classmethod
+    def _decode(cls, response: httpx.Response) -> Any:
+        return cls._decode_content(response.content, response.headers.get("Content-Type", ""))
+
+    async def _request(
+        self,
+        method: str,
+        url: str,
+        payload: dict[str, Any] | None = None,
+        params: dict[str, Any] | None = None,
+        headers: dict[str, str] | None = None,
+    ) -> httpx.Response:
         client = await self._get_client()
-        response = await client.get("/tasks/")
-        response.raise_for_status()
-        data = response.json()
-        return data.get("results", data) if isinstance(data, dict) else data
+        content = None
+        if payload is not None:
+            content = msgpack.packb(payload, use_bin_type=True)
+            headers = {**(headers or {}), "Content-Type": MSGPACK_MEDIA_TYPE}
+        if method != "GET":
+            # Один ключ на все попытки и дубли: сервер выполнит запись один раз,
+            # а повторы получат сохранённый ответ
+            headers = {**(headers or {}), "Idempotency-Key": uuid.uuid4().hex}
+
+        send = functools.partial(
+            client.request, method, url, content=content, headers=headers, params=params
+        )
+        attempt = 0
+        while True:
+            try:
+                response = await (send() if method == "GET" else self._send_hedged(send))
+            except httpx.TransportError:
+                if attempt >= settings.api_retries:
+                    raise
+                response = None
+            else:
+                if response.status_code not in RETRY_STATUSES or attempt >= settings.api_retries:
+                    break
+            await asyncio.sleep(self._retry_delay(attempt, response))
+            attempt += 1
+
+        if response.status_code != httpx.codes.NOT_MODIFIED:
+            response.raise_for_status()
+        return response
+
+    @staticmethod
+    async def _send_hedged(send) -> httpx.Response:
+        """Если ответа нет за api_hedge_delay, шлёт дубль и берёт первый удачный ответ."""
+        if settings.api_hedge_delay <= 0:
+            return await send()
+
+        tasks = {asyncio.ensure_future(send())}
+        fallback: httpx.Response | BaseException | None = None
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=settings.api_hedge_delay)
+            if not done:
+                tasks.add(asyncio.ensure_future(send()))
+
+            pending = tasks
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is not None:
+                        fallback = fallback or task.exception()
+                    elif task.result().status_code in RETRY_STATUSES:
+                        fallback = task.result()
+                    else:
+                        return task.result()
+        finally:
+            for task in tasks:
+                task.cancel()
+
+        if isinstance(fallback, BaseException):
+            raise fallback
+        return fallback
+
+    @staticmethod
+    def _retry_delay(attempt: int, response: httpx.Response | None) -> float:
+        retry_after = response.headers.get("Retry-After") if response is not None else None
+        if retry_after and retry_after.isdigit():
+            return min(float(retry_after), settings.api_retry_backoff_max)
+        # Полный джиттер: повторы разных пользователей не приходят на сервер одной волной
+        return random.uniform(
+            0, min(settings.api_retry_backoff * 2**attempt, settings.api_retry_backoff_max)
+        )
+
+    async def _get(self, url: str, params: dict[str, Any] | None = None) -> Any:
+        key = (self.telegram_id, url, tuple(sorted((params or {}).items())))
+        cached = _etag_cache.get(key)
+        headers = {"If-None-Match": cached[0]} if cached else None
+
+        response = await self._request("GET", url, params=params, headers=headers)
+        if response.status_code == httpx.codes.NOT_MODIFIED and cached:
+            _etag_cache.move_to_end(key)
+            # Декодируем заново, чтобы вызывающий код не мог испортить закешированные данные
+            return self._decode_content(cached[1], cached[2])
+
+        etag = response.headers.get("ETag")
+        if etag:
+            _etag_cache[key] = (etag, response.content, response.headers.get("Content-Type", ""))
+            _etag_cache.move_to_end(key)
+            while len(_etag_cache) > ETAG_CACHE_SIZE:
+                _etag_cache.popitem(last=False)
+        return self._decode(response)
+
+    async def _get_all(
+        self,
+        path: str,
+        params: dict[str, Any] | None = None,
+        limit: int | None = None,
+    ) -> list[dict[str, Any]]:
+        results: list[dict[str, Any]] = []
+        url: str | None = path
+        while url:
+            data = await self._get(url, params=params)
+            if not isinstance(data, dict):
+                return data
+
+            results.extend(data.get("results", []))
+            if limit is not None and len(results) >= limit:
+                return results[:limit]
+
+            # Ссылка next уже содержит курсор и исходные параметры запроса
+            url, params = data.get("next"), None
+        return results
+
+    async def get_tasks(
+        self,
+        limit: int | None = None,
+        fields: list[str] | None = None,
+        ordering: str | None = None,
+        search: str | None = None,
+    ) -> list[dict[str, Any]]:
+        # С limit сервер отдаёт ровно первые N строк, без постраничного обхода
+        params: dict[str, Any] = {"limit": limit} if limit else {"page_size": PAGE_SIZE}
+        if search:
+            params["q"] = search
+        if fields:
+            params["fields"] = ",".join(fields)
+        if ordering:
+            params["ordering"] = ordering
+        return await self._get_all("/tasks/", params=params, limit=limit)
+
+    async def get_task_stats(self) -> dict[str, Any]:
+        return await self._get("/tasks/stats/")
 
     async def get_task(self, task_id: str) -> dict[str, Any]:
-        client = await self._get_client()
-        response = await client.get(f"/tasks/{task_id}/")
-        response.raise_for_status()
-        return response.json()
+        return await self._get(f"/tasks/{task_id}/")
 
     async def create_task(
         self,
@@ -51,7 +208,6 @@ class APIClient:
         category_id: str | None = None,
         due_date: str | None = None,
     ) -> dict[str, Any]:
-        client = await self._get_client()
         payload = {
             "title": title,
             "description": description,
@@ -61,36 +217,22 @@ class APIClient:
         if due_date:
             payload["due_date"] = due_date
 
-        response = await client.post("/tasks/", json=payload)
-        response.raise_for_status()
-        return response.json()
+        return self._decode(await self._request("POST", "/tasks/", payload))
 
     async def update_task(self, task_id: str, **data) -> dict[str, Any]:
-        client = await self._get_client()
-        response = await client.patch(f"/tasks/{task_id}/", json=data)
-        response.raise_for_status()
-        return response.json()
+        return self._decode(await self._request("PATCH", f"/tasks/{task_id}/", data))
 
     async def delete_task(self, task_id: str) -> None:
-        client = await self._get_client()
-        response = await client.delete(f"/tasks/{task_id}/")
-        response.raise_for_status()
+        await self._request("DELETE", f"/tasks/{task_id}/")
 
     async def complete_task(self, task_id: str) -> dict[str, Any]:
         return await self.update_task(task_id, is_completed=True)
 
     async def get_categories(self) -> list[dict[str, Any]]:
-        client = await self._get_client()
-        response = await client.get("/categories/")
-        response.raise_for_status()
-        data = response.json()
-        return data.get("results", data) if isinstance(data, dict) else data
+        return await self._get_all("/categories/", params={"page_size": PAGE_SIZE})
 
     async def create_category(self, name: str) -> dict[str, Any]:
-        client = await self._get_client()
-        response = await client.post("/categories/", json={"name": name})
-        response.raise_for_status()
-        return response.json()
+        return self._decode(await self._request("POST", "/categories/", {"name": name}))
 
 
 def get_api_client(telegram_id: int) -> APIClient:
@@ -4,6 +4,13 @@ from pydantic_settings import BaseSettings
 class Settings(BaseSettings):
     telegram_bot_token: str
     api_base_url: str = "http://backend:8000/api/v1"
+    api_timeout: float = 10.0
+    # Повторы при сетевых ошибках, 409/429/502/503/504, с экспоненциальной задержкой
+    api_retries: int = 3
+    api_retry_backoff: float = 0.3
+    api_retry_backoff_max: float = 5.0
+    # Через сколько секунд без ответа запись дублируется вторым запросом; 0 — не дублировать
+    api_hedge_delay: float = 2.0
 
     class Config:
         env_file = ".env"
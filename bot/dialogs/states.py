@@ -8,6 +8,8 @@ class MainMenuSG(StatesGroup):
 class TaskListSG(StatesGroup):
     list = State()
     detail = State()
+    search = State()
+    search_results = State()
 
 
 class CreateTaskSG(StatesGroup):
@@ -1,3 +1,5 @@
+import asyncio
+import html
 from typing import Any
 
 from aiogram.types import CallbackQuery, Message
@@ -18,18 +20,25 @@ from api_client import get_api_client
 
 from dialogs.states import CreateTaskSG, TaskListSG
 
+# Экран списка показывает 10 задач: сначала невыполненные, новые выше
+TASK_LIST_LIMIT = 10
+TASK_LIST_ORDERING = "is_completed,-created_at"
+TASK_LIST_FIELDS = ["id", "title", "is_completed"]
+
 
 async def get_tasks_data(dialog_manager: DialogManager, **kwargs) -> dict[str, Any]:
     telegram_id = dialog_manager.event.from_user.id
     client = get_api_client(telegram_id)
 
     try:
-        tasks = await client.get_tasks()
-        tasks.sort(key=lambda x: x.get("created_at", ""), reverse=True)
-        tasks.sort(key=lambda x: x.get("is_completed", False), reverse=False)
-        tasks = tasks[:10]
+        tasks, stats = await asyncio.gather(
+            client.get_tasks(
+                limit=TASK_LIST_LIMIT, fields=TASK_LIST_FIELDS, ordering=TASK_LIST_ORDERING
+            ),
+            client.get_task_stats(),
+        )
     except Exception as e:
-        tasks = []
+        tasks, stats = [], {}
         dialog_manager.dialog_data["error"] = str(e)
     finally:
         await client.close()
@@ -40,7 +49,53 @@ async def get_tasks_data(dialog_manager: DialogManager, **kwargs) -> dict[str, A
     return {
         "tasks": tasks,
         "has_tasks": len(tasks) > 0,
-        "task_count": len(tasks),
+        "task_count": stats.get("total", len(tasks)),
+        "open_count": stats.get("open", 0),
+    }
+
+
+def get_search_query(dialog_manager: DialogManager) -> str:
+    # Запрос приходит из поля ввода или из аргумента команды /search
+    query = dialog_manager.dialog_data.get("search_query")
+    if query is None:
+        query = (dialog_manager.start_data or {}).get("search_query", "")
+    return query
+
+
+async def on_search_input(
+    message: Message,
+    widget: MessageInput,
+    dialog_manager: DialogManager,
+):
+    dialog_manager.dialog_data["search_query"] = (message.text or "").strip()
+    await dialog_manager.switch_to(TaskListSG.search_results)
+
+
+async def get_search_results_data(dialog_manager: DialogManager, **kwargs) -> dict[str, Any]:
+    query = get_search_query(dialog_manager)
+
+    tasks = []
+    if query:
+        client = get_api_client(dialog_manager.event.from_user.id)
+        try:
+            tasks = await client.get_tasks(
+                limit=TASK_LIST_LIMIT,
+                fields=TASK_LIST_FIELDS,
+                ordering=TASK_LIST_ORDERING,
+                search=query,
+            )
+        except Exception as e:
+            dialog_manager.dialog_data["error"] = str(e)
+        finally:
+            await client.close()
+
+    for task in tasks:
+        task["status_icon"] = "✅" if task.get("is_completed") else "⏳"
+
+    return {
+        "query": html.escape(query),
+        "tasks": tasks,
+        "has_tasks": len(tasks) > 0,
     }
 
 
@@ -161,7 +216,7 @@ async def on_delete_task(
 task_list_dialog = Dialog(
     Window(
         Const("📋 <b>Мои задачи</b>\n"),
-        Format("Всего задач: {task_count}\n", when="has_tasks"),
+        Format("Всего задач: {task_count}, открытых: {open_count}\n", when="has_tasks"),
         Const("У вас пока нет задач.", when=lambda data, *args: not data.get("has_tasks")),
         Column(
             Select(
@@ -172,6 +227,7 @@ task_list_dialog = Dialog(
                 on_click=on_task_selected,
             ),
         ),
+        SwitchTo(Const("🔍 Поиск"), id="search", state=TaskListSG.search),
         Row(
             Start(
                 Const("➕ Новая задача"),
@@ -183,6 +239,32 @@ task_list_dialog = Dialog(
         state=TaskListSG.list,
         getter=get_tasks_data,
     ),
+    Window(
+        Const("🔍 <b>Поиск задач</b>\n\n"),
+        Const("Введите слово или часть названия:"),
+        MessageInput(on_search_input),
+        SwitchTo(Const("🔙 К списку"), id="back_to_list_from_search", state=TaskListSG.list),
+        state=TaskListSG.search,
+    ),
+    Window(
+        Format("🔍 <b>Поиск:</b> {query}\n"),
+        Const("Ничего не найдено.", when=lambda data, *args: not data.get("has_tasks")),
+        Column(
+            Select(
+                Format("{item[status_icon]} {item[title]}"),
+                id="search_select",
+                item_id_getter=lambda item: item["id"],
+                items="tasks",
+                on_click=on_task_selected,
+            ),
+        ),
+        Row(
+            SwitchTo(Const("🔍 Новый поиск"), id="search_again", state=TaskListSG.search),
+            SwitchTo(Const("🔙 К списку"), id="back_to_list_from_results", state=TaskListSG.list),
+        ),
+        state=TaskListSG.search_results,
+        getter=get_search_results_data,
+    ),
     Window(
         Format("<b>{title}</b>\n"),
         Format("{status_emoji} Статус: {status_text}\n"),
@@ -243,11 +325,14 @@ async def get_categories_data(dialog_manager: DialogManager, **kwargs) -> dict[s
 
     try:
         categories = await client.get_categories()
+        categories.sort(key=lambda x: x.get("name", "").lower())
     except Exception:
         categories = []
     finally:
         await client.close()
 
+    # Имена показанных категорий нужны при выборе, чтобы не запрашивать список повторно
+    dialog_manager.dialog_data["category_names"] = {cat["id"]: cat["name"] for cat in categories}
     return {
         "categories": categories,
         "has_categories": len(categories) > 0,
@@ -261,12 +346,8 @@ async def on_category_selected(
     item_id: str,
 ):
     dialog_manager.dialog_data["category_id"] = item_id
-
-    categories = await get_categories_data(dialog_manager)
-    for cat in categories.get("categories", []):
-        if cat["id"] == item_id:
-            dialog_manager.dialog_data["category_name"] = cat["name"]
-            break
+    category_names = dialog_manager.dialog_data.get("category_names", {})
+    dialog_manager.dialog_data["category_name"] = category_names.get(item_id, "Без категории")
 
     await dialog_manager.switch_to(CreateTaskSG.due_date)
 
@@ -399,14 +480,14 @@ create_task_dialog = Dialog(
     ),
     Window(
         Const("📁 <b>Категория</b>\n\n"),
-        Const("Выберите категорию:", when="has_categories"),
+        Const("Выберите категорию (открытые/всего задач):", when="has_categories"),
         Const(
             "У вас нет категорий. Создайте новую или пропустите.",
             when=lambda data, *args: not data.get("has_categories"),
         ),
         Column(
             Select(
-                Format("{item[name]}"),
+                Format("{item[name]} ({item[open_task_count]}/{item[task_count]})"),
                 id="category_select",
                 item_id_getter=lambda item: item["id"],
                 items="categories",
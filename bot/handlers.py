@@ -1,5 +1,5 @@
 from aiogram import Dispatcher
-from aiogram.filters import Command
+from aiogram.filters import Command, CommandObject
 from aiogram.types import Message
 from aiogram_dialog import DialogManager, StartMode
 from dialogs.states import CreateTaskSG, MainMenuSG, TaskListSG
@@ -13,6 +13,18 @@ async def cmd_tasks(message: Message, dialog_manager: DialogManager):
     await dialog_manager.start(TaskListSG.list, mode=StartMode.RESET_STACK)
 
 
+async def cmd_search(message: Message, command: CommandObject, dialog_manager: DialogManager):
+    # /search текст сразу показывает результаты, /search без текста спрашивает запрос
+    if command.args:
+        await dialog_manager.start(
+            TaskListSG.search_results,
+            mode=StartMode.RESET_STACK,
+            data={"search_query": command.args.strip()},
+        )
+    else:
+        await dialog_manager.start(TaskListSG.search, mode=StartMode.RESET_STACK)
+
+
 async def cmd_new(message: Message, dialog_manager: DialogManager):
     await dialog_manager.start(CreateTaskSG.title, mode=StartMode.RESET_STACK)
 
@@ -21,3 +33,4 @@ def register_handlers(dp: Dispatcher):
     dp.message.register(cmd_start, Command("start"))
     dp.message.register(cmd_tasks, Command("tasks"))
     dp.message.register(cmd_new, Command("new"))
+    dp.message.register(cmd_search, Command("search"))